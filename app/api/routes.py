@@ -1,14 +1,22 @@
 import traceback
 from fastapi import APIRouter, HTTPException, UploadFile, File, Request
-from fastapi.responses import HTMLResponse, Response, JSONResponse
+from fastapi.responses import HTMLResponse, Response, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+import io
+import json
 import logging
+import tempfile
 from pathlib import Path
+from typing import List, Optional
 
 from app.config import config
-from app.services.cv_processor import cv_processor
-from app.services.job_description_service import job_description_service
-from app.services.analysis_service import analysis_service
+from app.services.cv_processor import get_cv_processor
+from app.services.job_description_service import get_job_description_service
+from app.services.analysis_service import get_analysis_service
+from app.services.bulk_import import get_bulk_import_service, IMPORT_KINDS
+from app.services.bulk_upload import get_bulk_upload_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -38,23 +46,41 @@ async def get_component(component_name: str):
 
 # CV Management
 @router.post("/api/cv/upload")
-async def upload_cv(file: UploadFile = File(...)):
-    """Upload and parse CV"""
-    result = await cv_processor.process_cv_upload(file)
+async def upload_cv(file: UploadFile = File(...), link_duplicates: bool = False):
+    """Upload and parse CV (near-duplicates are flagged, or linked when link_duplicates is set)"""
+    result = await get_cv_processor().process_cv_upload(file, link_duplicates=link_duplicates)
     return {"success": True, "data": result}
 
+@router.post("/api/cv/upload/bulk")
+async def upload_cvs_bulk(files: List[UploadFile] = File(...), link_duplicates: bool = False):
+    """
+    Upload and parse a batch of CVs, given as several files and/or ZIP archives
+    
+    Streams one NDJSON result per file as it finishes (status parsed, linked or
+    failed), then a summary line with "done": true.
+    """
+    async def result_lines():
+        async for result in get_bulk_upload_service().upload_stream(files, link_duplicates=link_duplicates):
+            yield json.dumps(result) + "\n"
+    
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
 @router.get("/api/cv/recent")
-async def get_recent_cvs(limit: int = 10):
-    """Get recent CVs"""
-    cvs = cv_processor.get_recent_cvs(limit)
-    return {"success": True, "data": cvs}
+async def get_recent_cvs(limit: int = 10, cursor: str = None):
+    """Get recent CVs (pass next_cursor back as cursor for the next page)"""
+    page = await get_cv_processor().get_recent_cvs_async(limit, cursor)
+    return {"success": True, "data": page["items"], "next_cursor": page["next_cursor"]}
+
+@router.get("/api/cv/search")
+async def search_cvs(q: str, limit: int = 10):
+    """Full-text CV search over names, skills, positions and summaries (BM25 ranked)"""
+    results = await get_cv_processor().search_cvs_async(q, limit)
+    return {"success": True, "data": results}
 
 @router.get("/api/cv/{cv_id}")
 async def get_cv(cv_id: int):
     """Get specific CV"""
-    cv = cv_processor.get_cv_by_id(cv_id)
-    if not cv:
-        raise HTTPException(404, "CV not found")
+    cv = await get_cv_processor().get_cv_by_id_async(cv_id)
     return {"success": True, "data": cv}
 
 # Job Description Management
@@ -62,29 +88,93 @@ async def get_cv(cv_id: int):
 async def create_job(request: Request):
     """Create job description"""
     data = await request.json()
-    job = job_description_service.create_job(data)
+    job = await run_in_threadpool(get_job_description_service().create_job_description, data)
     return {"success": True, "data": job}
 
 @router.get("/api/jobs")
-async def list_jobs(limit: int = 20, company: str = None):
-    """List job descriptions"""
-    jobs = job_description_service.list_jobs(limit, company)
-    return {"success": True, "data": jobs}
+async def list_jobs(limit: int = 20, company: str = None, cursor: str = None):
+    """List job descriptions (pass next_cursor back as cursor for the next page)"""
+    page = await get_job_description_service().list_jobs_async(limit, company, cursor=cursor)
+    return {"success": True, "data": page["items"], "next_cursor": page["next_cursor"]}
+
+@router.get("/api/jobs/search")
+async def search_jobs(q: str, limit: int = 10):
+    """Full-text search over active jobs (BM25 ranked)"""
+    results = await get_job_description_service().search_jobs_async(q, limit)
+    return {"success": True, "data": results}
 
 @router.get("/api/jobs/{job_id}")
 async def get_job(job_id: int):
     """Get specific job"""
-    job = job_description_service.get_job(job_id)
-    if not job:
-        raise HTTPException(404, "Job not found")
+    job = await get_job_description_service().get_job_description_async(job_id)
     return {"success": True, "data": job}
 
+@router.get("/api/jobs/{job_id}/top-matches")
+async def get_top_matches(job_id: int, limit: int = 10, latest_per_cv: bool = False):
+    """Best scoring CVs for a job (latest_per_cv keeps only each CV's most recent analysis)"""
+    matches = await get_analysis_service().get_top_matches_async(job_id, limit, latest_per_cv)
+    return {"success": True, "data": matches}
+
+@router.get("/api/jobs/{job_id}/candidates")
+async def get_candidates(job_id: int, limit: int = 20):
+    """CVs meeting a job's required skills, years and degree, most experienced first (no LLM calls)"""
+    cv_ids = await get_analysis_service().get_candidates_async(job_id, limit)
+    return {"success": True, "data": {"cv_ids": cv_ids}}
+
 @router.delete("/api/jobs/{job_id}")
 async def delete_job(job_id: int):
     """Delete job (soft delete)"""
-    job_description_service.delete_job(job_id)
+    await run_in_threadpool(get_job_description_service().deactivate_job, job_id)
     return {"success": True}
 
+# Bulk import
+@router.post("/api/import/{kind}")
+async def bulk_import(kind: str, request: Request, batch_size: int = 500, skip: int = 0,
+                      index_from_id: Optional[int] = None):
+    """
+    Import jobs or pre-parsed CVs from an NDJSON body (one record per line)
+    
+    Streams one NDJSON progress line per committed chunk. To resume an interrupted
+    import, send the same body again with skip and index_from_id set to the
+    lines_done and index_from_id of the last report.
+    """
+    if kind not in IMPORT_KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown import kind: {kind}")
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be positive")
+    if skip and index_from_id is None:
+        raise HTTPException(status_code=400, detail="Resuming with skip needs the index_from_id of the last report")
+    
+    max_bytes = config.IMPORT_MAX_BODY_MB * 1024 * 1024
+    too_large = HTTPException(status_code=413, detail=f"Import too large. Maximum size is {config.IMPORT_MAX_BODY_MB}MB")
+    if int(request.headers.get("content-length") or 0) > max_bytes:
+        raise too_large
+    
+    # The body is spooled to disk first: a streaming response also listens for the
+    # client disconnecting, so the body cannot be read while progress is streamed
+    spool = tempfile.TemporaryFile()
+    try:
+        total = 0
+        async for chunk in request.stream():
+            total += len(chunk)
+            if total > max_bytes:
+                raise too_large
+            await asyncio.to_thread(spool.write, chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    lines = io.TextIOWrapper(spool, encoding="utf-8")
+    
+    async def progress_lines():
+        try:
+            async for report in get_bulk_import_service().import_stream(kind, lines, batch_size, skip, index_from_id):
+                yield json.dumps(report) + "\n"
+        finally:
+            lines.close()
+    
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
 # Analysis
 @router.post("/api/analyze")
 async def analyze_cv(request: Request):
@@ -100,7 +190,7 @@ async def analyze_cv(request: Request):
                 content={"success": False, "error": "cv_id and job_id required"}
             )
         
-        result = await analysis_service.analyze(cv_id, job_id)
+        result = await get_analysis_service().analyze(cv_id, job_id)
         return {"success": True, "data": result}
     except HTTPException as e:
         # Return a proper JSON response for HTTP exceptions
@@ -117,32 +207,13 @@ async def analyze_cv(request: Request):
         )
 
 @router.get("/api/analyses/recent")
-async def get_recent_analyses(limit: int = 20):
-    """Get recent analyses with full related data"""
+async def get_recent_analyses(limit: int = 20, cursor: str = None):
+    """Get recent analysis summaries (pass next_cursor back as cursor for the next page)"""
     try:
-        analyses = analysis_service.get_recent_analyses(limit)
-        
-        # Convert to list if it's not already
-        if not isinstance(analyses, list):
-            analyses = []
-        
-        # Process each analysis
-        analyses_data = []
-        for analysis in analyses:
-            # Handle both dict and object types
-            if isinstance(analysis, dict):
-                analysis_dict = analysis
-            else:
-                # Assume it has a to_dict method
-                try:
-                    analysis_dict = analysis.to_dict()
-                except:
-                    # Skip if we can't convert
-                    continue
-            
-            analyses_data.append(analysis_dict)
-        
-        return {"success": True, "data": analyses_data}
+        page = await get_analysis_service().get_recent_analyses_async(limit, cursor)
+        return {"success": True, "data": page["items"], "next_cursor": page["next_cursor"]}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_recent_analyses: {str(e)}")
         return JSONResponse(
@@ -150,28 +221,29 @@ async def get_recent_analyses(limit: int = 20):
             content={"success": False, "error": "Failed to load recent analyses", "detail": str(e)}
         )
 
+@router.post("/api/analyses/rescore")
+async def rescore_analyses(request: Request):
+    """Recompute suitability scores of all analyses (no LLM calls); other weights only with dry_run"""
+    data = await request.json() if await request.body() else {}
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Expected a JSON object")
+    dry_run = data.get("dry_run", False)
+    # bool("false") is True and bool(0) is False: a wrong guess either hides or applies a rescore
+    if not isinstance(dry_run, bool):
+        raise HTTPException(status_code=400, detail="dry_run must be true or false")
+    result = await run_in_threadpool(
+        get_analysis_service().rescore_all,
+        weights=data.get("weights"),
+        dry_run=dry_run
+    )
+    return {"success": True, "data": result}
+
 @router.get("/api/analyses/{analysis_id}")
 async def get_analysis(analysis_id: int):
     """Get specific analysis with full related data"""
     try:
-        analysis = analysis_service.get_analysis(analysis_id)
-        if not analysis:
-            raise HTTPException(404, "Analysis not found")
-        
-        # Convert to dict and include related data
-        analysis_dict = analysis.to_dict()
-        
-        # Include the full cv_record if available
-        if analysis.cv_record:
-            analysis_dict['cv_record'] = analysis.cv_record.to_dict()
-            # Include file info if available
-            if analysis.cv_record.file_upload:
-                analysis_dict['cv_record']['file_upload'] = analysis.cv_record.file_upload.to_dict()
-        
-        # Include the full job_description if available
-        if analysis.job_description:
-            analysis_dict['job_description'] = analysis.job_description.to_dict()
-        
+        # Analysis with the full cv_record (and file upload) and job_description
+        analysis_dict = await get_analysis_service().get_analysis_record_async(analysis_id)
         return {"success": True, "data": analysis_dict}
     except HTTPException:
         raise
@@ -186,7 +258,7 @@ async def get_analysis(analysis_id: int):
 @router.get("/api/stats")
 async def get_stats():
     """Get application statistics"""
-    stats = analysis_service.get_statistics()
+    stats = await get_analysis_service().get_statistics_async()
     return {"success": True, "data": stats}
 
 # Add this temporary debug endpoint
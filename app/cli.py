@@ -0,0 +1,195 @@
+"""
+Command line maintenance tasks for the CV Analyzer
+
+Run with: python -m app.cli <command> [options]
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+def _rescore(args) -> int:
+    """Re-score every stored analysis with the configured weights (or preview others with --dry-run)"""
+    from fastapi import HTTPException
+    from app.services.analysis_service import get_analysis_service
+
+    weights = {}
+    for name in ("technical", "experience", "education"):
+        value = getattr(args, f"{name}_weight")
+        if value is not None:
+            weights[name] = value
+
+    try:
+        result = get_analysis_service().rescore_all(weights=weights or None, batch_size=args.batch_size,
+                                                    dry_run=args.dry_run)
+    except HTTPException as e:
+        print(e.detail, file=sys.stderr)
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0
+
+def _rebuild_stats(args) -> int:
+    """Recompute the /api/stats rollup from the analyses table"""
+    from app.services.analysis_service import get_analysis_service
+
+    print(json.dumps(get_analysis_service().rebuild_statistics(), indent=2))
+    return 0
+
+def _reindex_search(args) -> int:
+    """Rebuild the full-text search indexes over jobs and CVs"""
+    from app.repositories.base_repository import get_engine
+    from app.repositories.search_index import rebuild_search_index
+
+    print(json.dumps(rebuild_search_index(get_engine()), indent=2))
+    return 0
+
+def _compress_json(args) -> int:
+    """Convert JSON documents stored as plain text to compressed blobs"""
+    from sqlalchemy import text
+    from app.repositories.base_repository import get_engine, compress_json_columns, checkpoint_wal
+    from app.services.analysis_service import get_analysis_service
+
+    # Summary columns are copied with SQL JSON functions, which need the plain text
+    get_analysis_service().backfill_summary_columns()
+    engine = get_engine()
+    result = compress_json_columns(engine, batch_size=args.batch_size)
+    if args.vacuum:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+        checkpoint_wal(mode='TRUNCATE')
+    print(json.dumps(result, indent=2))
+    return 0
+
+def _archive_analyses(args) -> int:
+    """Move old analyses and analyses of inactive jobs to the archive table"""
+    from app.services.analysis_service import get_analysis_service
+
+    result = get_analysis_service().archive_analyses(
+        older_than_days=args.older_than_days,
+        inactive_jobs=False if args.keep_inactive_jobs else None,
+        batch_size=args.batch_size
+    )
+    print(json.dumps(result, indent=2))
+    return 0
+
+def _backfill_features(args) -> int:
+    """Derive the precomputed feature row of every CV without a current one"""
+    from app.services.cv_processor import get_cv_processor
+
+    print(json.dumps({"backfilled": get_cv_processor().backfill_features(batch_size=args.batch_size)}, indent=2))
+    return 0
+
+def _migrate_uploads(args) -> int:
+    """Move uploads stored flat in the upload folder into the content-addressed store"""
+    from app.services.file_handler import FileHandler
+
+    print(json.dumps(FileHandler().migrate_legacy_uploads(), indent=2))
+    return 0
+
+def _sweep_uploads(args) -> int:
+    """Delete orphaned and expired upload files"""
+    from app.services.upload_sweeper import get_upload_sweeper
+
+    result = get_upload_sweeper().sweep(retention_days=args.retention_days, batch_size=args.batch_size,
+                                        files_per_second=args.files_per_second, dry_run=args.dry_run)
+    print(json.dumps(result, indent=2))
+    return 0
+
+def _import(args) -> int:
+    """Bulk import jobs or pre-parsed CVs from an NDJSON file, resuming an interrupted run"""
+    import os
+    from app.services.bulk_import import get_bulk_import_service
+
+    state_file = args.state_file or f"{args.path}.import-state.json"
+    if os.path.exists(state_file) and not args.restart:
+        with open(state_file) as f:
+            state = json.load(f)
+        if state.get("kind") != args.kind:
+            print(f"{state_file} belongs to a '{state.get('kind')}' import, use --restart", file=sys.stderr)
+            return 1
+        print(f"Resuming after line {state['lines_done']}", file=sys.stderr)
+    else:
+        state = get_bulk_import_service().start_import(args.kind)
+
+    def save_state(report):
+        with open(state_file, "w") as f:
+            json.dump(state, f)
+        print(json.dumps(report), file=sys.stderr)
+
+    with open(args.path, encoding="utf-8") as lines:
+        result = get_bulk_import_service().import_lines(args.kind, lines, batch_size=args.batch_size,
+                                                  state=state, on_progress=save_state)
+    if os.path.exists(state_file):
+        os.remove(state_file)
+    print(json.dumps(result, indent=2))
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="CV Analyzer maintenance tasks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rescore = subparsers.add_parser("rescore", help="Recompute suitability scores without LLM calls")
+    rescore.add_argument("--technical-weight", type=float)
+    rescore.add_argument("--experience-weight", type=float)
+    rescore.add_argument("--education-weight", type=float)
+    rescore.add_argument("--batch-size", type=int, default=5000)
+    rescore.add_argument("--dry-run", action="store_true", help="Report changes without writing them")
+    rescore.set_defaults(handler=_rescore)
+
+    rebuild_stats = subparsers.add_parser("rebuild-stats", help="Recompute the statistics rollup")
+    rebuild_stats.set_defaults(handler=_rebuild_stats)
+
+    reindex_search = subparsers.add_parser("reindex-search", help="Rebuild the full-text search indexes")
+    reindex_search.set_defaults(handler=_reindex_search)
+
+    compress = subparsers.add_parser("compress-json", help="Compress JSON documents stored as plain text")
+    compress.add_argument("--batch-size", type=int, default=500)
+    compress.add_argument("--vacuum", action="store_true", help="Reclaim the freed pages afterwards")
+    compress.set_defaults(handler=_compress_json)
+
+    archive = subparsers.add_parser("archive-analyses", help="Move stale analyses to the archive table")
+    archive.add_argument("--older-than-days", type=int, help="Age cutoff, 0 to skip (default: ARCHIVE_ANALYSES_AFTER_DAYS)")
+    archive.add_argument("--keep-inactive-jobs", action="store_true", help="Do not archive analyses of inactive jobs")
+    archive.add_argument("--batch-size", type=int)
+    archive.set_defaults(handler=_archive_analyses)
+
+    backfill_features = subparsers.add_parser("backfill-features", help="Derive missing or outdated CV feature rows")
+    backfill_features.add_argument("--batch-size", type=int, default=500)
+    backfill_features.set_defaults(handler=_backfill_features)
+
+    migrate_uploads = subparsers.add_parser("migrate-uploads", help="Move flat upload files into the blob store")
+    migrate_uploads.set_defaults(handler=_migrate_uploads)
+
+    sweep_uploads = subparsers.add_parser("sweep-uploads", help="Delete orphaned and expired upload files")
+    sweep_uploads.add_argument("--retention-days", type=int, help="Age cutoff, 0 to keep (default: UPLOAD_RETENTION_DAYS)")
+    sweep_uploads.add_argument("--batch-size", type=int)
+    sweep_uploads.add_argument("--files-per-second", type=float, help="I/O rate limit, 0 for none")
+    sweep_uploads.add_argument("--dry-run", action="store_true", help="Report what would be deleted")
+    sweep_uploads.set_defaults(handler=_sweep_uploads)
+
+    bulk_import = subparsers.add_parser("import", help="Bulk import jobs or pre-parsed CVs from NDJSON")
+    bulk_import.add_argument("kind", choices=["jobs", "cvs"])
+    bulk_import.add_argument("path", help="NDJSON file, one record per line")
+    bulk_import.add_argument("--batch-size", type=int, default=500)
+    bulk_import.add_argument("--state-file", help="Resume state (default: <path>.import-state.json)")
+    bulk_import.add_argument("--restart", action="store_true", help="Ignore an existing resume state")
+    bulk_import.set_defaults(handler=_import)
+
+    return parser
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args = build_parser().parse_args(argv)
+
+    from app.config import config
+    from app.repositories.base_repository import init_db
+    # Like the server's startup, point at the database on the Railway volume before opening it
+    config.setup_railway_persistence()
+    init_db()
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
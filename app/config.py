@@ -29,7 +29,21 @@ class Config:
     # File Upload Configuration
     MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "10"))
     MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
-    ALLOWED_EXTENSIONS = os.getenv("ALLOWED_EXTENSIONS", "pdf,docx").split(",")
+    ALLOWED_EXTENSIONS = os.getenv("ALLOWED_EXTENSIONS", "pdf,docx,png,jpg,jpeg").split(",")
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE_KB", "256")) * 1024  # Uploads are streamed to disk in chunks
+    UPLOAD_BLOB_GRACE_SECONDS = int(os.getenv("UPLOAD_BLOB_GRACE_SECONDS", "3600"))  # Unreferenced blobs younger than this are kept
+    UPLOAD_RETENTION_DAYS = int(os.getenv("UPLOAD_RETENTION_DAYS", "0"))  # Delete stored files of older uploads, 0 keeps them
+    UPLOAD_SWEEP_INTERVAL_SECONDS = int(os.getenv("UPLOAD_SWEEP_INTERVAL_SECONDS", "86400"))  # 0 disables the background task
+    UPLOAD_SWEEP_BATCH_SIZE = int(os.getenv("UPLOAD_SWEEP_BATCH_SIZE", "500"))
+    UPLOAD_SWEEP_FILES_PER_SECOND = float(os.getenv("UPLOAD_SWEEP_FILES_PER_SECOND", "200"))  # 0 for no limit
+    BULK_UPLOAD_MAX_FILES = int(os.getenv("BULK_UPLOAD_MAX_FILES", "100"))  # Per request, ZIP entries included
+    IMPORT_MAX_BODY_MB = int(os.getenv("IMPORT_MAX_BODY_MB", "512"))  # NDJSON import bodies are spooled to disk up to this size
+    LLM_PARSE_CONCURRENCY = int(os.getenv("LLM_PARSE_CONCURRENCY", "4"))  # Gemini parse calls in flight across the process
+    LLM_PAYLOAD_SHRINK = os.getenv("LLM_PAYLOAD_SHRINK", "true").lower() == "true"  # Strip images and fonts before parsing
+    LLM_PAYLOAD_WORKERS = int(os.getenv("LLM_PAYLOAD_WORKERS", "2"))  # Process pool size, 0 to shrink in a thread
+    LLM_IMAGE_MAX_SIDE = int(os.getenv("LLM_IMAGE_MAX_SIDE", "2000"))  # Image CVs are downscaled to fit
+    LONG_CV_PAGE_THRESHOLD = int(os.getenv("LONG_CV_PAGE_THRESHOLD", "10"))  # PDFs this long are parsed by page range, 0 disables
+    LONG_CV_PAGES_PER_CHUNK = int(os.getenv("LONG_CV_PAGES_PER_CHUNK", "4"))
     
     # Set upload folder based on environment
     if IS_RAILWAY:
@@ -47,6 +61,19 @@ class Config:
     # CORS Configuration
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
     
+    # Near-duplicate CV detection (MinHash/LSH)
+    DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.85"))
+    DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+    DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+    
+    # Scoring weights (overall = weighted category scores, then hire-recommendation clamps)
+    SCORE_WEIGHT_TECHNICAL = float(os.getenv("SCORE_WEIGHT_TECHNICAL", "0.4"))
+    SCORE_WEIGHT_EXPERIENCE = float(os.getenv("SCORE_WEIGHT_EXPERIENCE", "0.4"))
+    SCORE_WEIGHT_EDUCATION = float(os.getenv("SCORE_WEIGHT_EDUCATION", "0.2"))
+    HIRE_STRONG_YES_FLOOR = int(os.getenv("HIRE_STRONG_YES_FLOOR", "85"))
+    HIRE_NO_CEILING = int(os.getenv("HIRE_NO_CEILING", "40"))
+    
     # API Rate Limiting (for future implementation)
     RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "10"))
     
@@ -59,6 +86,26 @@ class Config:
     DATABASE_PORT = os.getenv("DATABASE_PORT", "5432")
     DATABASE_ECHO: bool = os.getenv("DATABASE_ECHO", "false").lower() == "true"
     
+    # SQLite tuning (applied as pragmas on every new connection)
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+    SQLITE_CACHE_SIZE_MB = int(os.getenv("SQLITE_CACHE_SIZE_MB", "64"))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+    SQLITE_CHECKPOINT_INTERVAL_SECONDS = int(os.getenv("SQLITE_CHECKPOINT_INTERVAL_SECONDS", "300"))  # 0 disables
+    
+    # Archiving of stale analyses into analyses_archive (still readable by id)
+    ARCHIVE_ANALYSES_AFTER_DAYS = int(os.getenv("ARCHIVE_ANALYSES_AFTER_DAYS", "365"))  # 0 disables the age rule
+    ARCHIVE_INACTIVE_JOB_ANALYSES = os.getenv("ARCHIVE_INACTIVE_JOB_ANALYSES", "true").lower() == "true"
+    ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", "86400"))  # 0 disables the background task
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+    
+    # Single writer thread that group-commits upload and analysis writes
+    WRITE_QUEUE_ENABLED = os.getenv("WRITE_QUEUE_ENABLED", "true").lower() == "true"
+    WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "64"))
+    WRITE_QUEUE_MAX_DELAY_MS = float(os.getenv("WRITE_QUEUE_MAX_DELAY_MS", "2"))
+    
     @classmethod
     def setup_railway_persistence(cls):
         """Set up persistent storage on Railway"""
@@ -90,6 +137,10 @@ class Config:
         if cls.MAX_FILE_SIZE_MB <= 0:
             errors.append("MAX_FILE_SIZE_MB must be greater than 0")
         
+        weight_total = cls.SCORE_WEIGHT_TECHNICAL + cls.SCORE_WEIGHT_EXPERIENCE + cls.SCORE_WEIGHT_EDUCATION
+        if abs(weight_total - 1.0) > 1e-6:
+            errors.append("SCORE_WEIGHT_TECHNICAL, SCORE_WEIGHT_EXPERIENCE and SCORE_WEIGHT_EDUCATION must sum to 1")
+        
         if not cls.ALLOWED_EXTENSIONS:
             errors.append("At least one file extension must be allowed")
         
@@ -124,10 +175,18 @@ class Config:
         if self.DATABASE_TYPE == "sqlite":
             # Use absolute path for SQLite
             db_path = Path(self.DATABASE_NAME).absolute()
-            return f"sqlite:///{db_path}?mode=wal"  # Enable WAL mode for better concurrency
+            return f"sqlite:///{db_path}"  # WAL and other pragmas are set on connect (see base_repository)
         else:
             # For other databases (PostgreSQL, MySQL, etc.)
             return f"{self.DATABASE_TYPE}://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
+    
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """Database URL for the asyncio engine (aiosqlite driver for SQLite)"""
+        url = self.DATABASE_URL
+        if self.DATABASE_TYPE == "sqlite":
+            return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        return os.getenv("ASYNC_DATABASE_URL", url)
 
 # Create a global config instance
 config = Config()
\ No newline at end of file
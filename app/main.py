@@ -1,12 +1,19 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
 
 from app.config import config
 from app.api.routes import router
+from app.services.analysis_service import get_analysis_service, run_scheduled_archiving
+from app.services.upload_sweeper import run_scheduled_upload_sweeps
+from app.services.payload import close_payload_pool
+from app.repositories.base_repository import init_db, dispose_engines, checkpoint_wal, run_wal_checkpoints
+from app.repositories.write_queue import close_write_queue
 
 # Configure logging
 logging.basicConfig(
@@ -21,7 +28,8 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {config.APP_NAME} v{config.APP_VERSION}")
     
-    # Validate configuration
+    # Validate configuration (this also moves the database to the Railway volume,
+    # so it has to run before the engine is first used)
     try:
         config.validate()
         logger.info("Configuration validated successfully")
@@ -29,14 +37,47 @@ async def lifespan(app: FastAPI):
         logger.error(f"Configuration validation failed: {e}")
         raise
     
-    # Clean up old uploads on startup (optional)
     if os.path.exists(config.UPLOAD_FOLDER):
         logger.info(f"Upload folder ready at: {config.UPLOAD_FOLDER}")
     
+    # Create or upgrade the schema
+    init_db()
+    
+    # Analyses stored before the summary columns existed
+    get_analysis_service().backfill_summary_columns()
+    
+    # Keep the SQLite WAL bounded between automatic checkpoints
+    checkpoint_task = None
+    if config.SQLITE_CHECKPOINT_INTERVAL_SECONDS > 0:
+        checkpoint_task = asyncio.create_task(run_wal_checkpoints(config.SQLITE_CHECKPOINT_INTERVAL_SECONDS))
+    
+    # Move stale analyses to the archive table in the background
+    archive_task = None
+    if config.ARCHIVE_INTERVAL_SECONDS > 0:
+        archive_task = asyncio.create_task(run_scheduled_archiving(config.ARCHIVE_INTERVAL_SECONDS))
+    
+    # Delete orphaned and expired upload files in the background
+    sweep_task = None
+    if config.UPLOAD_SWEEP_INTERVAL_SECONDS > 0:
+        sweep_task = asyncio.create_task(run_scheduled_upload_sweeps(config.UPLOAD_SWEEP_INTERVAL_SECONDS))
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    if checkpoint_task:
+        checkpoint_task.cancel()
+    if archive_task:
+        archive_task.cancel()
+    if sweep_task:
+        sweep_task.cancel()
+    await asyncio.to_thread(close_write_queue)
+    close_payload_pool()
+    try:
+        checkpoint_wal(mode='TRUNCATE')
+    except Exception as e:
+        logger.warning(f"Final WAL checkpoint failed: {e}")
+    await dispose_engines()
 
 # Create FastAPI app instance
 app = FastAPI(
@@ -79,13 +120,20 @@ app.include_router(router)
 # Error handlers
 @app.exception_handler(413)
 async def request_entity_too_large(request: Request, exc):
-    """Handle file too large errors"""
-    return {"error": f"File too large. Maximum size is {config.MAX_FILE_SIZE_MB}MB"}
+    """Handle file and import too large errors"""
+    detail = exc.detail if isinstance(exc, HTTPException) else None
+    return JSONResponse(
+        status_code=413,
+        content={"error": detail or f"File too large. Maximum size is {config.MAX_FILE_SIZE_MB}MB"}
+    )
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTP exceptions"""
-    return {"error": exc.detail, "status_code": exc.status_code}
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": exc.detail, "status_code": exc.status_code}
+    )
 
 if __name__ == "__main__":
     import uvicorn
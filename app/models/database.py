@@ -1,8 +1,10 @@
 # Simplified database models - remove redundant tables and fields
 
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Text, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Date, JSON, Text, Boolean, Float, ForeignKey, LargeBinary, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+
+from app.models.types import CompressedJSON
 from datetime import datetime
 
 Base = declarative_base()
@@ -16,6 +18,7 @@ class FileUpload(Base):
     original_filename = Column(String(255), nullable=False)
     file_size = Column(Integer)
     file_type = Column(String(50))
+    content_sha256 = Column(String(64), index=True)  # Hex digest computed while the upload streamed to disk
     upload_date = Column(DateTime, default=datetime.utcnow)
     
     # Relationship
@@ -29,18 +32,22 @@ class FileUpload(Base):
             'original_filename': self.original_filename,
             'file_size': self.file_size,
             'file_type': self.file_type,
+            'content_sha256': self.content_sha256,
             'upload_date': self.upload_date.isoformat() if self.upload_date else None
         }
 
 class CVRecord(Base):
     """Store parsed CV data"""
     __tablename__ = 'cv_records'
+    __table_args__ = (
+        Index('ix_cv_records_parsed_date_id', 'parsed_date', 'id'),  # Keyset pagination
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     file_upload_id = Column(Integer, ForeignKey('file_uploads.id'), unique=True)
     
     # Core CV data as JSON
-    parsed_data = Column(JSON, nullable=False)  # Complete structured CV data
+    parsed_data = Column(CompressedJSON, nullable=False)  # Complete structured CV data
     contact_name = Column(String(255), index=True)  # For quick searching
     contact_email = Column(String(255))
     
@@ -49,6 +56,8 @@ class CVRecord(Base):
     # Relationships
     file_upload = relationship("FileUpload", back_populates="cv_record")
     analyses = relationship("Analysis", back_populates="cv_record")
+    features = relationship("CVFeatures", back_populates="cv_record", uselist=False)
+    signature = relationship("CVSignature", back_populates="cv_record", uselist=False)
 
     def to_dict(self):
         """Convert CVRecord object to dictionary"""
@@ -61,16 +70,79 @@ class CVRecord(Base):
             'parsed_date': self.parsed_date.isoformat() if self.parsed_date else None
         }
 
+class CVFeatures(Base):
+    """Precomputed CV features for ranking and filtering without loading parsed_data"""
+    __tablename__ = 'cv_features'
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cv_record_id = Column(Integer, ForeignKey('cv_records.id'), unique=True, index=True)
+    
+    skills = Column(JSON, nullable=False)  # Skills as written (lowercased) and as canonical ids
+    skill_bitmap = Column(Integer, default=0)  # Hashed skill bits for SQL prefiltering
+    total_experience_months = Column(Integer, default=0, index=True)  # Overlaps merged
+    role_durations = Column(JSON)  # Normalized dates and months per experience entry
+    highest_degree_level = Column(Integer, default=0, index=True)
+    certifications = Column(JSON)
+    
+    version = Column(Integer)  # Feature derivation version, stale rows get recomputed
+    computed_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationship
+    cv_record = relationship("CVRecord", back_populates="features")
+
+    def to_dict(self):
+        """Convert CVFeatures object to dictionary"""
+        return {
+            'cv_record_id': self.cv_record_id,
+            'skills': self.skills or [],
+            'skill_bitmap': self.skill_bitmap,
+            'total_experience_months': self.total_experience_months,
+            'role_durations': self.role_durations or [],
+            'highest_degree_level': self.highest_degree_level,
+            'certifications': self.certifications or [],
+            'version': self.version,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
+
+class CVSignature(Base):
+    """MinHash signature of a CV for near-duplicate detection"""
+    __tablename__ = 'cv_signatures'
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cv_record_id = Column(Integer, ForeignKey('cv_records.id'), unique=True, index=True)
+    signature = Column(LargeBinary, nullable=False)  # uint32 MinHash values
+    source = Column(String(20), default="text")  # "text" (document) or "parsed" (JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationship
+    cv_record = relationship("CVRecord", back_populates="signature")
+
+class CVLSHBucket(Base):
+    """LSH band buckets pointing at CVs with similar signatures"""
+    __tablename__ = 'cv_lsh_buckets'
+    __table_args__ = (
+        Index('ix_cv_lsh_buckets_band_bucket', 'band', 'bucket'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    band = Column(Integer, nullable=False)
+    bucket = Column(Integer, nullable=False)  # 64-bit band hash
+    cv_record_id = Column(Integer, ForeignKey('cv_records.id'), index=True)
+
 class JobDescription(Base):
     """Store job descriptions"""
     __tablename__ = 'job_descriptions'
+    __table_args__ = (
+        Index('ix_job_descriptions_active_created_at_id', 'is_active', 'created_at', 'id'),  # Keyset pagination
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     job_title = Column(String(255), nullable=False, index=True)
     company = Column(String(255), nullable=False, index=True)
     
     # Complete job data as JSON
-    job_data = Column(JSON, nullable=False)  # Complete structured job data
+    job_data = Column(CompressedJSON, nullable=False)  # Complete structured job data
+    job_profile = Column(JSON)  # Normalized requirement profile, rebuilt when job_data changes
     
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -85,6 +157,7 @@ class JobDescription(Base):
             'job_title': self.job_title,
             'company': self.company,
             'job_data': self.job_data,
+            'job_profile': self.job_profile,
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
@@ -92,6 +165,14 @@ class JobDescription(Base):
 class Analysis(Base):
     """Store CV-Job analysis results"""
     __tablename__ = 'analyses'
+    __table_args__ = (
+        # Keyset pagination of the global, per-CV and per-job listings
+        Index('ix_analyses_analysis_date_id', 'analysis_date', 'id'),
+        Index('ix_analyses_cv_date_id', 'cv_record_id', 'analysis_date', 'id'),
+        Index('ix_analyses_job_score_id', 'job_description_id', 'suitability_score', 'id'),
+        # Latest analysis per CV within a job (window partition read in index order)
+        Index('ix_analyses_job_cv_date_id', 'job_description_id', 'cv_record_id', 'analysis_date', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     cv_record_id = Column(Integer, ForeignKey('cv_records.id'), index=True)
@@ -100,8 +181,14 @@ class Analysis(Base):
     # Core scores
     suitability_score = Column(Float, nullable=False)
     
+    # Summary fields copied out of analysis_data for list views and re-scoring
+    technical_score = Column(Integer)
+    experience_score = Column(Integer)
+    education_score = Column(Integer)
+    hire_recommendation = Column(String(20))
+    
     # Complete analysis data as JSON
-    analysis_data = Column(JSON, nullable=False)  # Complete analysis response
+    analysis_data = Column(CompressedJSON, nullable=False)  # Complete analysis response (suitability_score lives in its column)
     
     analysis_date = Column(DateTime, default=datetime.utcnow)
     
@@ -116,6 +203,68 @@ class Analysis(Base):
             'cv_record_id': self.cv_record_id,
             'job_description_id': self.job_description_id,
             'suitability_score': self.suitability_score,
-            'analysis_data': self.analysis_data,
+            'analysis_data': self.scored_analysis_data(),
             'analysis_date': self.analysis_date.isoformat() if self.analysis_date else None
-        }
\ No newline at end of file
+        }
+
+    def scored_analysis_data(self):
+        """analysis_data with the current (possibly re-scored) suitability score"""
+        if not self.analysis_data:
+            return self.analysis_data
+        return {**self.analysis_data, 'suitability_score': self.suitability_score}
+
+class ArchivedAnalysis(Base):
+    """Analyses moved out of the hot analyses table (same ids and columns, no foreign keys)"""
+    __tablename__ = 'analyses_archive'
+    
+    id = Column(Integer, primary_key=True)  # The original analysis id
+    cv_record_id = Column(Integer, index=True)
+    job_description_id = Column(Integer, index=True)
+    
+    suitability_score = Column(Float, nullable=False)
+    technical_score = Column(Integer)
+    experience_score = Column(Integer)
+    education_score = Column(Integer)
+    hire_recommendation = Column(String(20))
+    analysis_data = Column(CompressedJSON, nullable=False)  # Copied as stored, never re-encoded
+    analysis_date = Column(DateTime)
+    
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    archive_reason = Column(String(20))  # "age" or "inactive_job"
+
+    scored_analysis_data = Analysis.scored_analysis_data
+
+    def to_dict(self):
+        """Convert ArchivedAnalysis object to dictionary (same shape as Analysis.to_dict)"""
+        return {
+            'id': self.id,
+            'cv_record_id': self.cv_record_id,
+            'job_description_id': self.job_description_id,
+            'suitability_score': self.suitability_score,
+            'analysis_data': self.scored_analysis_data(),
+            'analysis_date': self.analysis_date.isoformat() if self.analysis_date else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
+class AnalysisStats(Base):
+    """Running totals behind /api/stats, kept in step with the analyses table (single row)"""
+    __tablename__ = 'analysis_stats'
+    
+    id = Column(Integer, primary_key=True)
+    total_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)
+    
+    # Score buckets (same ranges as the score distribution)
+    excellent = Column(Integer, nullable=False, default=0)  # >= 80
+    good = Column(Integer, nullable=False, default=0)  # 60-79
+    fair = Column(Integer, nullable=False, default=0)  # 40-59
+    poor = Column(Integer, nullable=False, default=0)  # < 40
+    
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class AnalysisDailyCount(Base):
+    """Number of analyses per day, for the recent activity figure"""
+    __tablename__ = 'analysis_daily_counts'
+    
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -181,6 +181,7 @@ class AnalysisResponse(BaseModel):
     # Recommendations
     recommendations: List[str] = Field(default=[], description="Specific recommendations for the candidate")
     red_flags: List[str] = Field(default=[], description="Potential concerns or red flags")
+    hire_recommendation: Optional[str] = Field(default=None, description="strong yes/yes/maybe/no, kept for re-scoring")
     
     # Detailed analysis (optional, for premium features)
     detailed_analysis: Optional[DetailedAnalysis] = None
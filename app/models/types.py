@@ -0,0 +1,79 @@
+"""
+Custom column types
+"""
+
+from typing import Any, Optional
+import json
+import zlib
+
+from sqlalchemy.types import TypeDecorator, LargeBinary
+
+# zlib preset dictionaries seeded with the keys and recurring values of the stored
+# CV, job and analysis documents, so even small documents compress well. Every
+# compressed value starts with the version of the dictionary it was written with:
+# never edit a published dictionary, add a new version and point
+# CURRENT_DICTIONARY_VERSION at it.
+_DICTIONARY_FRAGMENTS = {
+    1: (
+        # Analysis responses
+        '"detailed_analysis":{"skill_matches":[{"skill":"', '"cv_evidence":["', '"strength":"strong"',
+        '"strength":"moderate"', '"strength":"weak"', '"experience_matches":[{"requirement":"',
+        '"cv_experience":"', '"years_required":', '"years_possessed":', '"match_quality":"full"',
+        '"match_quality":"partial"', '"match_quality":"none"', '"education_matches":[{"requirement":"',
+        '"cv_education":"', '"meets_requirement":true', '"meets_requirement":false',
+        '"certification_matches":[', '"technical_strengths":["', '"technical_gaps":["',
+        '"experience_strengths":["', '"experience_gaps":["', '"education_alignment":"',
+        '"hire_recommendation":"', '"red_flags":["', '"recommendations":["', '"missing_skills":["',
+        '"matching_skills":["', '"scoring_rationale":"The candidate ', '"education_score":',
+        '"experience_score":', '"technical_score":', '{"suitability_score":',
+        # Job descriptions
+        '"salary_range":', '"benefits":["', '"certifications_required":[', '"education_requirements":["',
+        '"requirements":[{"category":"Required","requirements":["', '"preferred_skills":["',
+        '"required_skills":["', '"responsibilities":["', '"experience_level":"', '"job_type":"Full-time"',
+        '"location":"', '"company":"', '{"job_title":"',
+        # Parsed CVs
+        '"raw_text":"', '"publications":[', '"languages":["English"', '"achievements":["',
+        '"certifications":[{"name":"', '"issuer":"', '"credential_id":', '"projects":[{"name":"',
+        '"description":"', '"technologies":["', '"role":"', '"highlights":["', '"education":[{"institution":"',
+        '"degree":"Bachelor of ', '"field_of_study":"', '"gpa":', '"experiences":[{"company":"',
+        '"position":"', '"start_date":"', '"end_date":"Present"', '"technical_skills":{"Programming":["',
+        '"skills":["', '"summary":"', '"github":', '"linkedin":', '"phone":"', '"email":"',
+        '{"contact_info":{"name":"', 'null,', '],"', '","',
+    ),
+}
+CURRENT_DICTIONARY_VERSION = 1
+_DICTIONARIES = {version: ''.join(fragments).encode('utf-8') for version, fragments in _DICTIONARY_FRAGMENTS.items()}
+
+def compress_json(value: Any, level: int = 6) -> bytes:
+    """Serialize and compress a JSON document with the current preset dictionary"""
+    compressor = zlib.compressobj(level, zdict=_DICTIONARIES[CURRENT_DICTIONARY_VERSION])
+    payload = json.dumps(value, separators=(',', ':'), default=str).encode('utf-8')
+    return bytes([CURRENT_DICTIONARY_VERSION]) + compressor.compress(payload) + compressor.flush()
+
+def decompress_json(value: Any) -> Any:
+    """Decode a stored document, compressed or legacy JSON text"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        value = bytes(value)
+        dictionary = _DICTIONARIES.get(value[0]) if value else None
+        if dictionary is None:
+            return json.loads(value.decode('utf-8'))
+        decompressor = zlib.decompressobj(zdict=dictionary)
+        return json.loads(decompressor.decompress(value[1:]) + decompressor.flush())
+    return json.loads(value)
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON document stored as a zlib-compressed blob
+
+    Values written before a column switched to this type (plain JSON text) are
+    still read, and are rewritten compressed by compress_json_columns().
+    SQL JSON functions cannot see inside compressed values.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        return None if value is None else compress_json(value)
+
+    def process_result_value(self, value: Any, dialect) -> Any:
+        return None if value is None else decompress_json(value)
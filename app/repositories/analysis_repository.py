@@ -1,15 +1,269 @@
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from collections import Counter
+from datetime import date, datetime, timedelta
 import logging
 
-from app.repositories.base_repository import BaseRepository
-from app.models.database import Analysis, CVRecord, JobDescription, FileUpload
+from app.repositories.base_repository import BaseRepository, AsyncBaseRepository, keyset_page
+from app.models.database import (
+    Analysis, ArchivedAnalysis, AnalysisStats, AnalysisDailyCount, CVRecord, JobDescription, FileUpload
+)
 from app.models.schemas import AnalysisResponse
-from sqlalchemy import func
-from sqlalchemy.orm import joinedload
+from sqlalchemy import func, text, select, insert, delete, case, literal, or_
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import joinedload, Session
 
 logger = logging.getLogger(__name__)
 
+def _analysis_summaries_query():
+    """Scalar columns behind the analysis list views (no JSON blobs are loaded)"""
+    return select(
+        Analysis.id,
+        Analysis.cv_record_id,
+        Analysis.job_description_id,
+        Analysis.suitability_score,
+        Analysis.technical_score,
+        Analysis.experience_score,
+        Analysis.education_score,
+        Analysis.hire_recommendation,
+        Analysis.analysis_date,
+        CVRecord.contact_name,
+        FileUpload.original_filename,
+        JobDescription.job_title,
+        JobDescription.company
+    ).outerjoin(
+        CVRecord, Analysis.cv_record_id == CVRecord.id
+    ).outerjoin(
+        FileUpload, CVRecord.file_upload_id == FileUpload.id
+    ).outerjoin(
+        JobDescription, Analysis.job_description_id == JobDescription.id
+    )
+
+def _format_analysis_summary(row) -> Dict[str, Any]:
+    """Format an analysis summary row; the full record stays behind GET /api/analyses/{id}"""
+    return {
+        'id': row.id,
+        'cv_record_id': row.cv_record_id,
+        'job_description_id': row.job_description_id,
+        'suitability_score': row.suitability_score,
+        'technical_score': row.technical_score,
+        'experience_score': row.experience_score,
+        'education_score': row.education_score,
+        'hire_recommendation': row.hire_recommendation,
+        'analysis_date': row.analysis_date.isoformat() if row.analysis_date else None,
+        'cv_record': {
+            'id': row.cv_record_id,
+            'contact_name': row.contact_name,
+            'file_upload': {'original_filename': row.original_filename}
+        },
+        'job_description': {
+            'id': row.job_description_id,
+            'job_title': row.job_title,
+            'company': row.company
+        }
+    }
+
+def _top_matches_query(job_id: int, limit: int, latest_per_cv: bool = False):
+    """
+    Best scoring analyses for a job, LIMIT pushed down to the database
+    
+    Without latest_per_cv this walks ix_analyses_job_score_id backwards and stops
+    after `limit` rows. With it, a window function first keeps each CV's latest
+    analysis for the job.
+    """
+    query = select(
+        Analysis.id,
+        Analysis.cv_record_id,
+        Analysis.job_description_id,
+        Analysis.suitability_score,
+        Analysis.technical_score,
+        Analysis.experience_score,
+        Analysis.education_score,
+        Analysis.hire_recommendation,
+        Analysis.analysis_date,
+        CVRecord.contact_name,
+        FileUpload.original_filename
+    ).outerjoin(
+        CVRecord, Analysis.cv_record_id == CVRecord.id
+    ).outerjoin(
+        FileUpload, CVRecord.file_upload_id == FileUpload.id
+    ).where(Analysis.job_description_id == job_id)
+    
+    if latest_per_cv:
+        latest = select(
+            Analysis.id,
+            func.row_number().over(
+                partition_by=Analysis.cv_record_id,
+                order_by=(Analysis.analysis_date.desc(), Analysis.id.desc())
+            ).label('recency')
+        ).where(Analysis.job_description_id == job_id).subquery()
+        query = query.join(latest, latest.c.id == Analysis.id).where(latest.c.recency == 1)
+    
+    return query.order_by(Analysis.suitability_score.desc(), Analysis.id.desc()).limit(limit)
+
+def _format_top_match(row) -> Dict[str, Any]:
+    """Format a top match row (scores and CV name only)"""
+    return {
+        "id": row.id,
+        "cv_id": row.cv_record_id,
+        "job_id": row.job_description_id,
+        "suitability_score": row.suitability_score,
+        "technical_score": row.technical_score,
+        "experience_score": row.experience_score,
+        "education_score": row.education_score,
+        "hire_recommendation": row.hire_recommendation,
+        "analysis_date": row.analysis_date,
+        "cv_name": row.contact_name,
+        "cv_filename": row.original_filename
+    }
+
+# Row id of the single AnalysisStats rollup row
+STATS_ROW_ID = 1
+
+def score_bucket(score: float) -> Optional[str]:
+    """Distribution bucket of a suitability score (None for the gaps between integer ranges)"""
+    if score >= 80:
+        return 'excellent'
+    if 60 <= score <= 79:
+        return 'good'
+    if 40 <= score <= 59:
+        return 'fair'
+    if score < 40:
+        return 'poor'
+    return None
+
+def _apply_to_statistics(db: Session, score: float, analysis_date: datetime, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) one analysis from the rollup, inside the caller's transaction"""
+    _apply_many_to_statistics(db, [(score, analysis_date)], sign)
+
+def _apply_many_to_statistics(db: Session, rows: List[Tuple[float, Optional[datetime]]], sign: int = 1) -> None:
+    """Add or remove (score, analysis_date) rows from the rollup with one update per table"""
+    values = {
+        AnalysisStats.total_count: AnalysisStats.total_count + sign * len(rows),
+        AnalysisStats.score_sum: AnalysisStats.score_sum + sign * sum(score for score, _ in rows),
+        AnalysisStats.updated_at: datetime.utcnow()
+    }
+    buckets = Counter(score_bucket(score) for score, _ in rows)
+    for bucket, count in buckets.items():
+        if bucket:
+            column = getattr(AnalysisStats, bucket)
+            values[column] = column + sign * count
+    
+    updated = db.query(AnalysisStats).filter(AnalysisStats.id == STATS_ROW_ID).update(
+        values, synchronize_session=False
+    )
+    if not updated:
+        # No rollup yet - it is built from the table (including these rows) on first read
+        return
+    
+    days = Counter((analysis_date or datetime.utcnow()).date() for _, analysis_date in rows)
+    for day, count in days.items():
+        _add_to_daily_count(db, day, sign * count)
+
+def _daily_count_upsert(dialect_name: str, day: date, delta: int):
+    """Single-statement upsert adding delta to a day's count (None when the dialect has none)"""
+    if dialect_name in ('sqlite', 'postgresql'):
+        dialect = sqlite if dialect_name == 'sqlite' else postgresql
+        return dialect.insert(AnalysisDailyCount).values(day=day, count=delta).on_conflict_do_update(
+            index_elements=[AnalysisDailyCount.day],
+            set_={'count': AnalysisDailyCount.count + delta}
+        )
+    if dialect_name in ('mysql', 'mariadb'):
+        return mysql.insert(AnalysisDailyCount).values(day=day, count=delta).on_duplicate_key_update(
+            count=AnalysisDailyCount.count + delta
+        )
+    return None
+
+def _add_to_daily_count(db: Session, day: date, delta: int) -> None:
+    """Add delta to a day's count, creating the row when the day is new"""
+    statement = _daily_count_upsert(db.get_bind().dialect.name, day, delta)
+    if statement is not None:
+        db.execute(statement)
+        return
+    updated = db.query(AnalysisDailyCount).filter(AnalysisDailyCount.day == day).update(
+        {AnalysisDailyCount.count: AnalysisDailyCount.count + delta}, synchronize_session=False
+    )
+    if not updated:
+        db.add(AnalysisDailyCount(day=day, count=delta))
+        db.flush()
+
+def _rebuild_statistics(db: Session) -> None:
+    """Recompute the rollup from the analyses table (recovers from any drift)"""
+    score = Analysis.suitability_score
+    total_count, score_sum, excellent, good, fair, poor = db.execute(select(
+        func.count(Analysis.id),
+        func.coalesce(func.sum(score), 0),
+        func.sum(case((score >= 80, 1), else_=0)),
+        func.sum(case((score.between(60, 79), 1), else_=0)),
+        func.sum(case((score.between(40, 59), 1), else_=0)),
+        func.sum(case((score < 40, 1), else_=0))
+    )).one()
+    
+    day = func.date(Analysis.analysis_date)
+    daily = db.execute(select(day, func.count(Analysis.id)).where(day.is_not(None)).group_by(day)).all()
+    
+    db.query(AnalysisDailyCount).delete(synchronize_session=False)
+    # SQLite's date() returns text, other databases a date
+    db.add_all([
+        AnalysisDailyCount(day=value if isinstance(value, date) else date.fromisoformat(value), count=count)
+        for value, count in daily
+    ])
+    db.merge(AnalysisStats(
+        id=STATS_ROW_ID,
+        total_count=total_count,
+        score_sum=score_sum,
+        excellent=excellent or 0,
+        good=good or 0,
+        fair=fair or 0,
+        poor=poor or 0,
+        updated_at=datetime.utcnow()
+    ))
+    logger.info(f"Rebuilt analysis statistics from {total_count} analyses")
+
+def _read_statistics(db: Session) -> Dict[str, Any]:
+    """Statistics from the rollup row and the last week of daily counts"""
+    stats = db.get(AnalysisStats, STATS_ROW_ID)
+    if stats is None:
+        _rebuild_statistics(db)
+        db.flush()
+        stats = db.get(AnalysisStats, STATS_ROW_ID)
+    
+    week_ago = (datetime.utcnow() - timedelta(days=7)).date()
+    recent_count = db.query(func.coalesce(func.sum(AnalysisDailyCount.count), 0)).filter(
+        AnalysisDailyCount.day >= week_ago
+    ).scalar()
+    
+    return {
+        "total_analyses": stats.total_count,
+        "average_score": round(stats.score_sum / stats.total_count, 2) if stats.total_count else 0,
+        "recent_analyses": recent_count,
+        "score_distribution": {
+            "excellent": stats.excellent,
+            "good": stats.good,
+            "fair": stats.fair,
+            "poor": stats.poor
+        }
+    }
+
+# Columns copied verbatim from analyses into analyses_archive
+ARCHIVED_COLUMNS = ('id', 'cv_record_id', 'job_description_id', 'suitability_score', 'technical_score',
+                    'experience_score', 'education_score', 'hire_recommendation', 'analysis_data', 'analysis_date')
+
+def _archive_candidates_query(cutoff: Optional[datetime], inactive_jobs: bool, limit: int):
+    """Ids, scores, dates and archive reasons of the next analyses to archive"""
+    inactive = select(JobDescription.id).where(JobDescription.is_active.is_(False)).scalar_subquery()
+    conditions = []
+    if inactive_jobs:
+        conditions.append(Analysis.job_description_id.in_(inactive))
+    if cutoff is not None:
+        conditions.append(Analysis.analysis_date < cutoff)
+    reason = case((Analysis.job_description_id.in_(inactive), 'inactive_job'), else_='age') if inactive_jobs else literal('age')
+    return (
+        select(Analysis.id, Analysis.suitability_score, Analysis.analysis_date, reason.label('reason'))
+        .where(or_(*conditions))
+        .order_by(Analysis.id)
+        .limit(limit)
+    )
+
 class AnalysisRepository(BaseRepository[Analysis]):
     """Simplified analysis repository"""
     
@@ -30,6 +284,10 @@ class AnalysisRepository(BaseRepository[Analysis]):
                     cv_record_id=cv_record_id,
                     job_description_id=job_description_id,
                     suitability_score=analysis_response.suitability_score,
+                    technical_score=analysis_response.technical_score,
+                    experience_score=analysis_response.experience_score,
+                    education_score=analysis_response.education_score,
+                    hire_recommendation=analysis_response.hire_recommendation,
                     analysis_data=analysis_data,
                     analysis_date=datetime.utcnow()
                 )
@@ -37,12 +295,13 @@ class AnalysisRepository(BaseRepository[Analysis]):
                 db.add(analysis)
                 db.flush()  # Flush to get the ID without committing
                 
+                # Keep /api/stats in step within the same transaction
+                _apply_to_statistics(db, analysis.suitability_score, analysis.analysis_date)
+                
                 # Get all needed data while session is active
                 analysis_id = analysis.id
                 analysis_date = analysis.analysis_date
                 
-                db.commit()  # Now commit the transaction
-                
                 # Return a dictionary with the essential data
                 return {
                     "id": analysis_id,
@@ -57,24 +316,27 @@ class AnalysisRepository(BaseRepository[Analysis]):
             raise
     
     def get_analysis_with_details(self, analysis_id: int) -> Optional[Dict[str, Any]]:
-        """Get full analysis details"""
+        """Get full analysis details (archived analyses included)"""
         with self.get_db() as db:
-            result = db.query(
-                Analysis, CVRecord, JobDescription, FileUpload
-            ).join(
-                CVRecord, Analysis.cv_record_id == CVRecord.id
-            ).join(
-                JobDescription, Analysis.job_description_id == JobDescription.id
-            ).join(
-                FileUpload, CVRecord.file_upload_id == FileUpload.id
-            ).filter(Analysis.id == analysis_id).first()
-            
-            if not result:
+            for model in (Analysis, ArchivedAnalysis):
+                result = db.query(
+                    model, CVRecord, JobDescription, FileUpload
+                ).join(
+                    CVRecord, model.cv_record_id == CVRecord.id
+                ).join(
+                    JobDescription, model.job_description_id == JobDescription.id
+                ).join(
+                    FileUpload, CVRecord.file_upload_id == FileUpload.id
+                ).filter(model.id == analysis_id).first()
+                if result:
+                    break
+            else:
                 return None
             
             analysis, cv, job, file = result
             data = self._format_analysis(analysis)
             data.update({
+                "archived": model is ArchivedAnalysis,
                 "cv_details": {
                     "id": cv.id,
                     "name": cv.contact_name,
@@ -92,86 +354,59 @@ class AnalysisRepository(BaseRepository[Analysis]):
             
             return data
     
-    def get_recent_analyses(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """Get recent analyses with full details"""
+    def get_recent_analyses(self, limit: int = 20, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get recent analysis summaries (scores, CV name, job title), continuing after a cursor"""
         try:
-            with self.get_db() as db:  # Add context manager
-                analyses = (
-                    db.query(Analysis)
-                    .options(
-                        joinedload(Analysis.cv_record).joinedload(CVRecord.file_upload),
-                        joinedload(Analysis.job_description)
-                    )
-                    .order_by(Analysis.analysis_date.desc())
-                    .limit(limit)
-                    .all()
-                )
-                
-                logger.info(f"Found {len(analyses)} analyses in database")
-                
-                # Convert to dict with related data
-                results = []
-                for analysis in analyses:
-                    try:
-                        # Create the result dictionary
-                        result = {
-                            'id': analysis.id,
-                            'cv_record_id': analysis.cv_record_id,
-                            'job_description_id': analysis.job_description_id,
-                            'suitability_score': analysis.suitability_score,
-                            'analysis_date': analysis.analysis_date.isoformat() if analysis.analysis_date else None,
-                            'analysis_data': analysis.analysis_data
-                        }
-                        
-                        # Add CV record data if available
-                        if analysis.cv_record:
-                            result['cv_record'] = {
-                                'id': analysis.cv_record.id,
-                                'contact_name': analysis.cv_record.contact_name,
-                                'contact_email': analysis.cv_record.contact_email,
-                                'parsed_data': analysis.cv_record.parsed_data
-                            }
-                            
-                            # Add file upload data if available
-                            if analysis.cv_record.file_upload:
-                                result['cv_record']['file_upload'] = {
-                                    'id': analysis.cv_record.file_upload.id,
-                                    'original_filename': analysis.cv_record.file_upload.original_filename,
-                                    'filename': analysis.cv_record.file_upload.filename,
-                                    'upload_date': analysis.cv_record.file_upload.upload_date.isoformat() if analysis.cv_record.file_upload.upload_date else None
-                            }
-                        
-                        # Add job description data if available
-                        if analysis.job_description:
-                            result['job_description'] = {
-                                'id': analysis.job_description.id,
-                                'job_title': analysis.job_description.job_title,
-                                'company': analysis.job_description.company,
-                                'job_data': analysis.job_description.job_data
-                            }
-                        
-                        results.append(result)
-                        logger.debug(f"Processed analysis {analysis.id}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing analysis {analysis.id}: {str(e)}")
-                        continue
-                
-                logger.info(f"Returning {len(results)} formatted analyses")
-                return results
+            with self.get_db() as db:
+                rows = db.execute(keyset_page(
+                    _analysis_summaries_query(), Analysis.analysis_date, Analysis.id, cursor, limit
+                )).all()
+                return [_format_analysis_summary(row) for row in rows]
                 
         except Exception as e:
             logger.error(f"Error getting recent analyses: {str(e)}", exc_info=True)
             return []
     
-    def get_analyses_by_cv(self, cv_id: int) -> List[Dict[str, Any]]:
-        """Get all analyses for a CV"""
+    def backfill_summary_columns(self) -> int:
+        """
+        Copy summary fields out of analysis_data for analyses stored before the columns existed
+        
+        Those rows predate compressed storage, so their analysis_data is still JSON text.
+        """
+        with self.get_db() as db:
+            if db.get_bind().dialect.name != 'sqlite':
+                # json_extract and typeof are SQLite functions, decode the documents here instead
+                analyses = db.query(Analysis).filter(Analysis.technical_score.is_(None)).all()
+                for analysis in analyses:
+                    data = analysis.analysis_data or {}
+                    analysis.technical_score = data.get('technical_score') or 0
+                    analysis.experience_score = data.get('experience_score') or 0
+                    analysis.education_score = data.get('education_score') or 0
+                    analysis.hire_recommendation = data.get('hire_recommendation')
+                if analyses:
+                    logger.info(f"Backfilled summary columns for {len(analyses)} analyses")
+                return len(analyses)
+            
+            result = db.execute(text(
+                "UPDATE analyses SET "
+                "technical_score = COALESCE(json_extract(analysis_data, '$.technical_score'), 0), "
+                "experience_score = COALESCE(json_extract(analysis_data, '$.experience_score'), 0), "
+                "education_score = COALESCE(json_extract(analysis_data, '$.education_score'), 0), "
+                "hire_recommendation = json_extract(analysis_data, '$.hire_recommendation') "
+                "WHERE technical_score IS NULL AND typeof(analysis_data) = 'text'"
+            ))
+            if result.rowcount:
+                logger.info(f"Backfilled summary columns for {result.rowcount} analyses")
+            return result.rowcount
+    
+    def get_analyses_by_cv(self, cv_id: int, limit: Optional[int] = None,
+                           cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get analyses for a CV, newest first (all of them unless a limit is given)"""
         with self.get_db() as db:
-            results = db.query(Analysis, JobDescription).join(
+            query = select(Analysis, JobDescription).join(
                 JobDescription, Analysis.job_description_id == JobDescription.id
-            ).filter(
-                Analysis.cv_record_id == cv_id
-            ).order_by(Analysis.analysis_date.desc()).all()
+            ).where(Analysis.cv_record_id == cv_id)
+            results = db.execute(keyset_page(query, Analysis.analysis_date, Analysis.id, cursor, limit)).all()
             
             analyses = []
             for analysis, job in results:
@@ -184,16 +419,16 @@ class AnalysisRepository(BaseRepository[Analysis]):
             
             return analyses
     
-    def get_analyses_by_job(self, job_id: int) -> List[Dict[str, Any]]:
-        """Get all analyses for a job"""
+    def get_analyses_by_job(self, job_id: int, limit: Optional[int] = None,
+                            cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get analyses for a job, best score first (all of them unless a limit is given)"""
         with self.get_db() as db:
-            results = db.query(Analysis, CVRecord, FileUpload).join(
+            query = select(Analysis, CVRecord, FileUpload).join(
                 CVRecord, Analysis.cv_record_id == CVRecord.id
             ).join(
                 FileUpload, CVRecord.file_upload_id == FileUpload.id
-            ).filter(
-                Analysis.job_description_id == job_id
-            ).order_by(Analysis.suitability_score.desc()).all()
+            ).where(Analysis.job_description_id == job_id)
+            results = db.execute(keyset_page(query, Analysis.suitability_score, Analysis.id, cursor, limit)).all()
             
             analyses = []
             for analysis, cv, file in results:
@@ -206,49 +441,101 @@ class AnalysisRepository(BaseRepository[Analysis]):
             
             return analyses
     
-    def get_top_matches_for_job(self, job_id: int, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get top CV matches for a job"""
-        return self.get_analyses_by_job(job_id)[:limit]
+    def get_top_matches_for_job(self, job_id: int, limit: int = 10,
+                                latest_per_cv: bool = False) -> List[Dict[str, Any]]:
+        """Get top CV matches for a job (optionally only each CV's latest analysis)"""
+        with self.get_db() as db:
+            rows = db.execute(_top_matches_query(job_id, limit, latest_per_cv)).all()
+            return [_format_top_match(row) for row in rows]
     
     def get_analysis_statistics(self) -> Dict[str, Any]:
-        """Get basic statistics"""
+        """Get basic statistics from the rollup (built on first use)"""
         with self.get_db() as db:
-            total_analyses = db.query(func.count(Analysis.id)).scalar()
-            
-            # Average score
-            avg_score = db.query(func.avg(Analysis.suitability_score)).scalar() or 0
-            
-            # Recent activity (last 7 days)
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            recent_count = db.query(func.count(Analysis.id)).filter(
-                Analysis.analysis_date >= week_ago
-            ).scalar()
-            
-            # Count by score range
-            excellent = db.query(func.count(Analysis.id)).filter(
-                Analysis.suitability_score >= 80
-            ).scalar()
-            good = db.query(func.count(Analysis.id)).filter(
-                Analysis.suitability_score.between(60, 79)
-            ).scalar()
-            fair = db.query(func.count(Analysis.id)).filter(
-                Analysis.suitability_score.between(40, 59)
-            ).scalar()
-            poor = db.query(func.count(Analysis.id)).filter(
-                Analysis.suitability_score < 40
-            ).scalar()
+            return _read_statistics(db)
+    
+    def rebuild_statistics(self) -> Dict[str, Any]:
+        """Recompute the statistics rollup from the analyses table"""
+        with self.get_db() as db:
+            _rebuild_statistics(db)
+        return self.get_analysis_statistics()
+    
+    def delete(self, id: int) -> bool:
+        """Delete an analysis and take it out of the statistics rollup"""
+        with self.get_db() as db:
+            analysis = db.query(Analysis).filter(Analysis.id == id).first()
+            if not analysis:
+                return False
+            _apply_to_statistics(db, analysis.suitability_score, analysis.analysis_date, sign=-1)
+            db.delete(analysis)
+            return True
+    
+    def archive_analyses(self, cutoff: Optional[datetime], inactive_jobs: bool = True,
+                         batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Move analyses older than cutoff, or of inactive jobs, to analyses_archive
+        
+        Runs in batched transactions (short write locks, resumable). Archived analyses
+        leave the statistics rollup and every listing; they stay readable by id.
+        Returns the number archived per reason.
+        """
+        archived = Counter()
+        if cutoff is None and not inactive_jobs:
+            return dict(archived)
+        
+        while True:
+            with self.get_db() as db:
+                rows = db.execute(_archive_candidates_query(cutoff, inactive_jobs, batch_size)).all()
+                if not rows:
+                    break
+                
+                for reason in {row.reason for row in rows}:
+                    ids = [row.id for row in rows if row.reason == reason]
+                    db.execute(insert(ArchivedAnalysis).from_select(
+                        [*ARCHIVED_COLUMNS, 'archive_reason', 'archived_at'],
+                        select(*(getattr(Analysis, column) for column in ARCHIVED_COLUMNS),
+                               literal(reason), literal(datetime.utcnow()))
+                        .where(Analysis.id.in_(ids))
+                    ))
+                    archived[reason] += len(ids)
+                db.execute(delete(Analysis).where(Analysis.id.in_([row.id for row in rows])))
+                _apply_many_to_statistics(db, [(row.suitability_score, row.analysis_date) for row in rows], sign=-1)
             
-            return {
-                "total_analyses": total_analyses,
-                "average_score": round(avg_score, 2),
-                "recent_analyses": recent_count,
-                "score_distribution": {
-                    "excellent": excellent,
-                    "good": good,
-                    "fair": fair,
-                    "poor": poor
-                }
-            }
+            if len(rows) < batch_size:
+                break
+        
+        if archived:
+            logger.info(f"Archived {sum(archived.values())} analyses ({dict(archived)})")
+        return dict(archived)
+    
+    def load_scoring_inputs(self) -> Dict[str, list]:
+        """Category scores and hire recommendations of every analysis (summary columns, no JSON decoding)"""
+        with self.get_db() as db:
+            rows = db.query(
+                Analysis.id,
+                Analysis.suitability_score,
+                Analysis.technical_score,
+                Analysis.experience_score,
+                Analysis.education_score,
+                Analysis.hire_recommendation
+            ).order_by(Analysis.id).all()
+        
+        columns = list(zip(*rows)) if rows else [[] for _ in range(6)]
+        return {
+            'ids': list(columns[0]),
+            'current': list(columns[1]),
+            'technical': [value or 0 for value in columns[2]],
+            'experience': [value or 0 for value in columns[3]],
+            'education': [value or 0 for value in columns[4]],
+            'hire_recommendation': list(columns[5])
+        }
+    
+    def bulk_update_scores(self, updates: List[Dict[str, Any]], batch_size: int = 5000) -> int:
+        """Write new suitability scores in batched transactions (readers overlay them on analysis_data)"""
+        statement = text("UPDATE analyses SET suitability_score = :score WHERE id = :id")
+        for start in range(0, len(updates), batch_size):
+            with self.get_db() as db:
+                db.execute(statement, updates[start:start + batch_size])
+        return len(updates)
     
     def _format_analysis(self, analysis: Analysis) -> Dict[str, Any]:
         """Format analysis for API response"""
@@ -257,9 +544,66 @@ class AnalysisRepository(BaseRepository[Analysis]):
             "cv_id": analysis.cv_record_id,
             "job_id": analysis.job_description_id,
             "suitability_score": analysis.suitability_score,
-            "analysis": analysis.analysis_data,
+            "analysis": analysis.scored_analysis_data(),
             "analysis_date": analysis.analysis_date,
             "created_at": analysis.analysis_date  # For compatibility
         }
 
+class AsyncAnalysisRepository(AsyncBaseRepository[Analysis]):
+    """Async analysis reads for request handlers"""
+    
+    def __init__(self):
+        super().__init__(Analysis)
+    
+    async def get_recent_analyses(self, limit: int = 20, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get recent analysis summaries (scores, CV name, job title), continuing after a cursor"""
+        async with self.get_db() as db:
+            result = await db.execute(keyset_page(
+                _analysis_summaries_query(), Analysis.analysis_date, Analysis.id, cursor, limit
+            ))
+            return [_format_analysis_summary(row) for row in result.all()]
+    
+    async def get_top_matches_for_job(self, job_id: int, limit: int = 10,
+                                      latest_per_cv: bool = False) -> List[Dict[str, Any]]:
+        """Get top CV matches for a job (optionally only each CV's latest analysis)"""
+        async with self.get_db() as db:
+            result = await db.execute(_top_matches_query(job_id, limit, latest_per_cv))
+            return [_format_top_match(row) for row in result.all()]
+    
+    async def get_analysis_record(self, analysis_id: int) -> Optional[Dict[str, Any]]:
+        """Get an analysis with its full CV record, upload and job description (archived ones included)"""
+        async with self.get_db() as db:
+            result = await db.execute(
+                select(Analysis)
+                .options(
+                    joinedload(Analysis.cv_record).joinedload(CVRecord.file_upload),
+                    joinedload(Analysis.job_description)
+                )
+                .where(Analysis.id == analysis_id)
+            )
+            analysis = result.scalars().first()
+            if analysis:
+                cv_record, job_description = analysis.cv_record, analysis.job_description
+            else:
+                analysis = await db.get(ArchivedAnalysis, analysis_id)
+                if not analysis:
+                    return None
+                cv_record = await db.get(CVRecord, analysis.cv_record_id, options=[joinedload(CVRecord.file_upload)])
+                job_description = await db.get(JobDescription, analysis.job_description_id)
+            
+            data = analysis.to_dict()
+            data['archived'] = isinstance(analysis, ArchivedAnalysis)
+            if cv_record:
+                data['cv_record'] = cv_record.to_dict()
+                if cv_record.file_upload:
+                    data['cv_record']['file_upload'] = cv_record.file_upload.to_dict()
+            if job_description:
+                data['job_description'] = job_description.to_dict()
+            return data
+    
+    async def get_analysis_statistics(self) -> Dict[str, Any]:
+        """Get basic statistics"""
+        async with self.get_db() as db:
+            return await db.run_sync(_read_statistics)
+
 # Remove AnalysisHistoryRepository since we don't have that table
\ No newline at end of file
@@ -1,10 +1,20 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, select, insert, update, bindparam, func, text, tuple_, DateTime
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker, Session, DeclarativeMeta
-from contextlib import contextmanager
-from typing import TypeVar, Generic, Optional, List, Dict, Any, Generator
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from typing import TypeVar, Generic, Optional, List, Dict, Any, Generator, AsyncGenerator, Tuple
+from datetime import datetime
+import asyncio
+import base64
+import json
 import logging
+import threading
 
 from app.models.database import Base
+from app.models.types import CompressedJSON
+from app.repositories.search_index import create_search_tables
 from app.config import config
 
 logger = logging.getLogger(__name__)
@@ -12,18 +22,294 @@ logger = logging.getLogger(__name__)
 # Create a TypeVar for the model type
 ModelType = TypeVar('ModelType', bound=DeclarativeMeta)
 
-# Single engine instance
-engine = create_engine(
-    config.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in config.DATABASE_URL else {},
-    pool_pre_ping=True
-)
+def sqlite_pragmas() -> Dict[str, Any]:
+    """Pragmas applied to every new SQLite connection"""
+    return {
+        'journal_mode': config.SQLITE_JOURNAL_MODE,
+        'synchronous': config.SQLITE_SYNCHRONOUS,
+        'mmap_size': config.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+        'cache_size': -config.SQLITE_CACHE_SIZE_MB * 1024,  # Negative means KiB rather than pages
+        'busy_timeout': config.SQLITE_BUSY_TIMEOUT_MS,
+        'temp_store': config.SQLITE_TEMP_STORE
+    }
 
-# Single session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None) -> None:
+    """Connect hook that tunes a raw SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.execute("PRAGMA journal_mode")
+        journal_mode = cursor.fetchone()[0]
+        if journal_mode.lower() != str(config.SQLITE_JOURNAL_MODE).lower():
+            logger.warning(f"SQLite journal_mode is {journal_mode}, requested {config.SQLITE_JOURNAL_MODE}")
+    finally:
+        cursor.close()
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+def checkpoint_wal(bind: Engine = None, mode: str = 'PASSIVE') -> Optional[Tuple[int, int, int]]:
+    """
+    Checkpoint the SQLite write-ahead log
+    
+    Args:
+        mode: PASSIVE never blocks readers or writers, TRUNCATE also resets the WAL file
+    
+    Returns:
+        (busy, wal_frames, checkpointed_frames), or None when not running on SQLite
+    """
+    bind = bind or get_engine()
+    if bind.dialect.name != 'sqlite':
+        return None
+    with bind.connect() as conn:
+        busy, log_frames, checkpointed = conn.execute(text(f"PRAGMA wal_checkpoint({mode})")).one()
+    logger.debug(f"WAL checkpoint ({mode}): busy={busy}, frames={log_frames}, checkpointed={checkpointed}")
+    return busy, log_frames, checkpointed
+
+async def run_wal_checkpoints(interval_seconds: int) -> None:
+    """Checkpoint the WAL periodically so it cannot grow unbounded under steady reads"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(checkpoint_wal)
+        except Exception as e:
+            logger.warning(f"WAL checkpoint failed: {e}")
+
+# Engines are created on first use rather than at import, so importing the app stays
+# cheap and config.validate() can still move the database (Railway volume) first
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> Engine:
+    """Get or create the process-wide engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(
+                    config.DATABASE_URL,
+                    connect_args={"check_same_thread": False} if "sqlite" in config.DATABASE_URL else {},
+                    pool_pre_ping=True
+                )
+                if engine.dialect.name == 'sqlite':
+                    event.listen(engine, 'connect', apply_sqlite_pragmas)
+                _engine = engine
+    return _engine
+
+def get_async_engine() -> AsyncEngine:
+    """Get or create the asyncio engine, sharing the file and pragmas with the sync engine"""
+    global _async_engine
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                async_engine = create_async_engine(config.ASYNC_DATABASE_URL, pool_pre_ping=True)
+                if async_engine.dialect.name == 'sqlite':
+                    event.listen(async_engine.sync_engine, 'connect', apply_sqlite_pragmas)
+                _async_engine = async_engine
+    return _async_engine
+
+def _disable_driver_transactions(dbapi_connection, connection_record=None) -> None:
+    dbapi_connection.isolation_level = None
+
+def _begin_immediate(conn) -> None:
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+def create_writer_engine(url, **kwargs) -> Engine:
+    """
+    Engine for the write queue's connection
+    
+    pysqlite begins transactions on its own and does not track SAVEPOINT, so releasing
+    the outermost savepoint commits it. As SQLAlchemy documents for this driver, its
+    transaction handling is turned off and every transaction starts with an explicit
+    BEGIN (IMMEDIATE, taking the write lock up front), so savepoints nest inside it.
+    """
+    engine = create_engine(url, **kwargs)
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', apply_sqlite_pragmas)
+        event.listen(engine, 'connect', _disable_driver_transactions)
+        event.listen(engine, 'begin', _begin_immediate)
+    return engine
+
+_writer_engine: Optional[Engine] = None
+_writer_source: Optional[Engine] = None
+
+def get_writer_engine() -> Engine:
+    """Get or create the engine the write queue connects with, on the database of get_engine()"""
+    global _writer_engine, _writer_source
+    engine = get_engine()
+    with _engine_lock:
+        if _writer_source is not engine:
+            if _writer_engine is not None and _writer_engine is not _writer_source:
+                _writer_engine.dispose()
+            if engine.dialect.name == 'sqlite' and engine.url.database not in (None, '', ':memory:'):
+                _writer_engine = create_writer_engine(
+                    engine.url, connect_args={"check_same_thread": False}, pool_pre_ping=True
+                )
+            else:
+                # Other dialects nest savepoints already; an in-memory database is private to its engine
+                _writer_engine = engine
+            _writer_source = engine
+    return _writer_engine
+
+async def dispose_engines() -> None:
+    """Close the pooled connections of whichever engines were created"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _writer_engine is not None and _writer_engine is not _engine:
+        _writer_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+
+# Session factories - instances stay readable after the session closes. Sessions are
+# bound to the lazily created engines when they are opened.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+def upgrade_schema(bind) -> None:
+    """Add columns and indexes declared on the models but missing from an existing database"""
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                    logger.info(f"Added column {table.name}.{column.name}")
+            
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    logger.info(f"Created index {index.name}")
+
+def compress_json_columns(bind, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Rewrite CompressedJSON values still stored as plain JSON text
+    
+    Reads decode either form, so this can run at any time and resume after an
+    interruption. Returns the number of rows converted per column.
+    """
+    converted = {}
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            if not isinstance(column.type, CompressedJSON):
+                continue
+            key = f"{table.name}.{column.name}"
+            converted[key] = 0
+            statement = update(table).where(table.c.id == bindparam('row_id')).values({column.name: bindparam('value')})
+            while True:
+                with bind.begin() as conn:
+                    rows = conn.execute(
+                        select(table.c.id, column)
+                        .where(func.typeof(column) == 'text')
+                        .order_by(table.c.id)
+                        .limit(batch_size)
+                    ).all()
+                    if not rows:
+                        break
+                    conn.execute(statement, [{'row_id': row[0], 'value': row[1]} for row in rows])
+                converted[key] += len(rows)
+            if converted[key]:
+                logger.info(f"Compressed {converted[key]} values of {key}")
+    return converted
+
+class InvalidCursorError(ValueError):
+    """A pagination cursor that was not issued by this API"""
+    pass
+
+def encode_cursor(sort_value: Any, id: int) -> str:
+    """Opaque token for the (sort value, id) of the last row on a page"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, sort_column) -> Tuple[Any, int]:
+    """(sort value, id) from a cursor, typed for comparison against sort_column"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if isinstance(sort_column.type, DateTime) and sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+def keyset_page(query, sort_column, id_column, cursor: Optional[str], limit: Optional[int]):
+    """
+    Order a select newest/highest first on (sort_column, id) and continue after a cursor
+    
+    Every page is an index range scan on a matching composite index, so deep pages
+    cost the same as the first one (unlike OFFSET).
+    """
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor, sort_column)
+        query = query.where(tuple_(sort_column, id_column) < tuple_(sort_value, last_id))
+    query = query.order_by(sort_column.desc(), id_column.desc())
+    return query.limit(limit) if limit else query
+
+def next_cursor(items: List[Dict[str, Any]], limit: Optional[int], sort_key: str,
+                id_key: str = 'id') -> Optional[str]:
+    """Cursor for the page after `items`, None when this was the last page"""
+    if not limit or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last[sort_key], last[id_key])
+
+_schema_ready = False
+
+def init_db(bind: Engine = None) -> None:
+    """Create missing tables, columns, indexes and search tables (run once at startup)"""
+    global _schema_ready
+    if bind is None and _schema_ready:
+        return
+    bind = bind or get_engine()
+    Base.metadata.create_all(bind=bind)
+    upgrade_schema(bind)
+    create_search_tables(bind)
+    if bind is _engine:
+        _schema_ready = True
+
+# Session shared by every repository call inside a unit_of_work() block
+_current_session: ContextVar[Optional[Session]] = ContextVar('current_session', default=None)
+
+@contextmanager
+def unit_of_work() -> Generator[Session, None, None]:
+    """
+    Run the repository calls in the block on one session and one transaction
+    
+    The block commits once when it ends and rolls back entirely if it raises.
+    A nested block joins the outer one. Keep awaits on slow work (LLM calls)
+    outside the block: SQLite holds the write lock until the commit.
+    """
+    db = _current_session.get()
+    if db is not None:
+        yield db
+        return
+    
+    db = SessionLocal(bind=get_engine())
+    token = _current_session.set(db)
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        _current_session.reset(token)
+        db.close()
+
+@contextmanager
+def bound_session(db: Session) -> Generator[Session, None, None]:
+    """Make repository calls in the block use db; the caller owns its transaction"""
+    token = _current_session.set(db)
+    try:
+        yield db
+    finally:
+        _current_session.reset(token)
 
 class BaseRepository(Generic[ModelType]):
     """Simplified base repository with proper typing"""
@@ -33,8 +319,13 @@ class BaseRepository(Generic[ModelType]):
     
     @contextmanager
     def get_db(self) -> Generator[Session, None, None]:
-        """Get database session"""
-        db = SessionLocal()
+        """Get database session (the unit of work's, when one is active)"""
+        shared = _current_session.get()
+        if shared is not None:
+            yield shared  # Committed by the unit of work
+            return
+        
+        db = SessionLocal(bind=get_engine())
         try:
             yield db
             db.commit()
@@ -50,28 +341,41 @@ class BaseRepository(Generic[ModelType]):
             instance = self.model(**kwargs)
             db.add(instance)
             db.flush()
-            db.refresh(instance)
+            self._on_saved(db, instance)
             return instance
     
+    def bulk_insert(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert many rows with one executemany and return their ids in order (write hooks are not run)"""
+        if not rows:
+            return []
+        with self.get_db() as db:
+            result = db.execute(insert(self.model).returning(self.model.id, sort_by_parameter_order=True), rows)
+            return list(result.scalars())
+    
     def get(self, id: int) -> Optional[ModelType]:
         """Get by ID"""
         with self.get_db() as db:
-            return db.query(self.model).filter(self.model.id == id).first()
+            return db.get(self.model, id)
     
-    def get_all(self, limit: int = 100, offset: int = 0) -> List[ModelType]:
-        """Get all records with pagination"""
+    def get_all(self, limit: int = 100, offset: int = 0, after_id: Optional[int] = None) -> List[ModelType]:
+        """Get all records with pagination (pass the last seen id as after_id instead of an offset)"""
         with self.get_db() as db:
-            return db.query(self.model).offset(offset).limit(limit).all()
+            query = db.query(self.model).order_by(self.model.id)
+            if after_id is not None:
+                query = query.filter(self.model.id > after_id)
+            elif offset:
+                query = query.offset(offset)
+            return query.limit(limit).all()
     
     def update(self, id: int, **kwargs) -> Optional[ModelType]:
         """Update a record"""
         with self.get_db() as db:
-            instance = db.query(self.model).filter(self.model.id == id).first()
+            instance = db.get(self.model, id)
             if instance:
                 for key, value in kwargs.items():
                     setattr(instance, key, value)
                 db.flush()
-                db.refresh(instance)
+                self._on_saved(db, instance)
             return instance
     
     def delete(self, id: int) -> bool:
@@ -79,6 +383,7 @@ class BaseRepository(Generic[ModelType]):
         with self.get_db() as db:
             instance = db.query(self.model).filter(self.model.id == id).first()
             if instance:
+                self._on_deleted(db, instance)
                 db.delete(instance)
                 return True
             return False
@@ -86,4 +391,49 @@ class BaseRepository(Generic[ModelType]):
     def exists(self, id: int) -> bool:
         """Check if record exists"""
         with self.get_db() as db:
-            return db.query(self.model).filter(self.model.id == id).count() > 0
\ No newline at end of file
+            return db.query(self.model).filter(self.model.id == id).count() > 0
+    
+    def _on_saved(self, db: Session, instance: ModelType) -> None:
+        """Hook run in the write transaction after a record is created or updated"""
+        pass
+    
+    def _on_deleted(self, db: Session, instance: ModelType) -> None:
+        """Hook run in the write transaction before a record is deleted"""
+        pass
+
+class AsyncBaseRepository(Generic[ModelType]):
+    """Asyncio counterpart of BaseRepository for use on the event loop"""
+    
+    def __init__(self, model: type[ModelType]):
+        self.model = model
+    
+    @asynccontextmanager
+    async def get_db(self) -> AsyncGenerator[AsyncSession, None]:
+        """Get async database session"""
+        async with AsyncSessionLocal(bind=get_async_engine()) as db:
+            try:
+                yield db
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+    
+    async def get(self, id: int) -> Optional[ModelType]:
+        """Get by ID"""
+        async with self.get_db() as db:
+            return await db.get(self.model, id)
+    
+    async def get_all(self, limit: int = 100, after_id: Optional[int] = None) -> List[ModelType]:
+        """Get all records in id order, continuing after after_id"""
+        query = select(self.model).order_by(self.model.id)
+        if after_id is not None:
+            query = query.where(self.model.id > after_id)
+        async with self.get_db() as db:
+            result = await db.execute(query.limit(limit))
+            return list(result.scalars().all())
+    
+    async def exists(self, id: int) -> bool:
+        """Check if record exists"""
+        async with self.get_db() as db:
+            count = await db.scalar(select(func.count()).select_from(self.model).where(self.model.id == id))
+            return count > 0
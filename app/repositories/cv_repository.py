@@ -1,13 +1,118 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
-from app.repositories.base_repository import BaseRepository
-from app.models.database import CVRecord, FileUpload
+from sqlalchemy import select, func, literal
+
+from app.repositories.base_repository import BaseRepository, AsyncBaseRepository, keyset_page, get_engine
+from app.repositories.search_index import (
+    CV_FTS, CV_WEIGHTS, cv_fts, search_supported, fts_query, match, bm25, highlight, snippet,
+    index_cv, unindex
+)
+from app.models.database import CVRecord, FileUpload, CVFeatures
 from app.models.schemas import StructuredCV
+from app.services.cv_features import normalize_skill, skill_bitmap, FEATURES_VERSION
 
 logger = logging.getLogger(__name__)
 
+def _format_cv_with_file_info(cv: CVRecord, file: FileUpload) -> Dict[str, Any]:
+    """Format a CV and its upload for the CV detail response"""
+    return {
+        "id": cv.id,
+        "filename": file.original_filename,
+        "file_size": file.file_size,
+        "upload_date": file.upload_date,
+        "contact_name": cv.contact_name,
+        "contact_email": cv.contact_email,
+        "parsed_data": cv.parsed_data,
+        "parsed_date": cv.parsed_date
+    }
+
+def _recent_cvs_query(limit: int, cursor: Optional[str] = None):
+    """Scalar columns behind the recent CVs list (parsed_data is not loaded)"""
+    query = select(
+        CVRecord.id,
+        CVRecord.contact_name,
+        CVRecord.contact_email,
+        CVRecord.parsed_date,
+        FileUpload.original_filename,
+        FileUpload.file_size,
+        FileUpload.upload_date
+    ).join(
+        FileUpload, CVRecord.file_upload_id == FileUpload.id
+    )
+    return keyset_page(query, CVRecord.parsed_date, CVRecord.id, cursor, limit)
+
+def _format_recent_cv(row) -> Dict[str, Any]:
+    """Format a CV summary row for the recent CVs list"""
+    return {
+        "id": row.id,
+        "filename": row.original_filename,
+        "file_size": row.file_size,
+        "contact_name": row.contact_name,
+        "contact_email": row.contact_email,
+        "parsed_date": row.parsed_date,
+        "upload_date": row.upload_date
+    }
+
+def _cv_search_query(search_term: str, limit: int):
+    """CVs matching the search term, best BM25 rank first (None when nothing is searchable)"""
+    if not search_supported(get_engine()):
+        pattern = f"%{search_term}%"
+        return select(
+            CVRecord.id,
+            CVRecord.contact_name,
+            CVRecord.contact_email,
+            CVRecord.parsed_date,
+            FileUpload.original_filename,
+            *(literal(None).label(name) for name in
+              ('rank', 'name_highlight', 'skills_snippet', 'positions_snippet', 'summary_snippet'))
+        ).join(
+            FileUpload, CVRecord.file_upload_id == FileUpload.id
+        ).where(
+            CVRecord.contact_name.ilike(pattern) | FileUpload.original_filename.ilike(pattern)
+        ).order_by(CVRecord.parsed_date.desc(), CVRecord.id.desc()).limit(limit)
+    
+    expression = fts_query(search_term)
+    if not expression:
+        return None
+    rank = bm25(cv_fts, CV_WEIGHTS).label('rank')
+    return select(
+        CVRecord.id,
+        CVRecord.contact_name,
+        CVRecord.contact_email,
+        CVRecord.parsed_date,
+        FileUpload.original_filename,
+        rank,
+        highlight(cv_fts, 0).label('name_highlight'),
+        snippet(cv_fts, 1).label('skills_snippet'),
+        snippet(cv_fts, 2).label('positions_snippet'),
+        snippet(cv_fts, 3).label('summary_snippet')
+    ).join(
+        cv_fts, cv_fts.c.rowid == CVRecord.id
+    ).join(
+        FileUpload, CVRecord.file_upload_id == FileUpload.id
+    ).where(
+        match(cv_fts, expression)
+    ).order_by(rank).limit(limit)
+
+def _format_cv_hit(row) -> Dict[str, Any]:
+    """Format a CV search result with its rank and highlighted fields"""
+    return {
+        "id": row.id,
+        "filename": row.original_filename,
+        "contact_name": row.contact_name,
+        "contact_email": row.contact_email,
+        "parsed_date": row.parsed_date,
+        "search": {
+            "rank": row.rank,
+            "name": row.name_highlight,
+            "skills": row.skills_snippet,
+            "positions": row.positions_snippet,
+            "summary": row.summary_snippet
+        }
+    }
+
 class CVRepository(BaseRepository[CVRecord]):
     """Simplified CV repository"""
     
@@ -44,7 +149,7 @@ class CVRepository(BaseRepository[CVRecord]):
                 db.add(cv_record)
                 db.flush()  # Flush to get the ID without committing
                 record_id = cv_record.id  # Get the ID while still in session
-                db.commit()  # Now commit the transaction
+                self._on_saved(db, cv_record)
                 
                 return record_id
                 
@@ -101,34 +206,146 @@ class CVRepository(BaseRepository[CVRecord]):
                 return None
             
             cv, file = result
-            return {
-                "id": cv.id,
-                "filename": file.original_filename,
-                "file_size": file.file_size,
-                "upload_date": file.upload_date,
-                "contact_name": cv.contact_name,
-                "contact_email": cv.contact_email,
-                "parsed_data": cv.parsed_data,
-                "parsed_date": cv.parsed_date
-            }
-    
-    def get_recent_cvs(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get recent CVs"""
+            return _format_cv_with_file_info(cv, file)
+    
+    def get_recent_cvs(self, limit: int = 10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get recent CVs, continuing after a cursor"""
         with self.get_db() as db:
-            results = db.query(CVRecord, FileUpload)\
-                .join(FileUpload)\
-                .order_by(CVRecord.parsed_date.desc())\
+            rows = db.execute(_recent_cvs_query(limit, cursor)).all()
+            return [_format_recent_cv(row) for row in rows]
+    
+    def search_cvs(self, search_term: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Full-text search over names, skills, positions and summaries, best matches first"""
+        query = _cv_search_query(search_term, limit)
+        if query is None:
+            return []
+        with self.get_db() as db:
+            return [_format_cv_hit(row) for row in db.execute(query).all()]
+    
+    def _on_saved(self, db, instance: CVRecord) -> None:
+        """Keep the full-text index in step with the CV"""
+        index_cv(db, instance)
+    
+    def _on_deleted(self, db, instance: CVRecord) -> None:
+        """Drop the CV from the full-text index"""
+        unindex(db, CV_FTS, instance.id)
+
+class AsyncCVRepository(AsyncBaseRepository[CVRecord]):
+    """Async CV reads for request handlers"""
+    
+    def __init__(self):
+        super().__init__(CVRecord)
+    
+    async def get_cv_with_file_info(self, cv_id: int) -> Optional[Dict[str, Any]]:
+        """Get CV with file information"""
+        async with self.get_db() as db:
+            result = await db.execute(
+                select(CVRecord, FileUpload)
+                .join(FileUpload, CVRecord.file_upload_id == FileUpload.id)
+                .where(CVRecord.id == cv_id)
+            )
+            row = result.first()
+            return _format_cv_with_file_info(*row) if row else None
+    
+    async def get_recent_cvs(self, limit: int = 10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get recent CVs, continuing after a cursor"""
+        async with self.get_db() as db:
+            result = await db.execute(_recent_cvs_query(limit, cursor))
+            return [_format_recent_cv(row) for row in result.all()]
+    
+    async def search_cvs(self, search_term: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Full-text search over names, skills, positions and summaries, best matches first"""
+        query = _cv_search_query(search_term, limit)
+        if query is None:
+            return []
+        async with self.get_db() as db:
+            result = await db.execute(query)
+            return [_format_cv_hit(row) for row in result.all()]
+
+class CVFeaturesRepository(BaseRepository[CVFeatures]):
+    """Repository for precomputed CV feature rows"""
+    
+    FEATURE_COLUMNS = ('skills', 'skill_bitmap', 'total_experience_months', 'role_durations',
+                       'highest_degree_level', 'certifications', 'version')
+    
+    def __init__(self):
+        super().__init__(CVFeatures)
+    
+    def save_features(self, cv_record_id: int, features: Dict[str, Any]) -> int:
+        """Insert or replace the feature row for a CV and return its ID"""
+        with self.get_db() as db:
+            row = db.query(CVFeatures).filter(CVFeatures.cv_record_id == cv_record_id).first()
+            if row is None:
+                row = CVFeatures(cv_record_id=cv_record_id)
+                db.add(row)
+            
+            for column in self.FEATURE_COLUMNS:
+                setattr(row, column, features[column])
+            row.computed_at = datetime.utcnow()
+            
+            db.flush()
+            return row.id
+    
+    def bulk_insert_features(self, items: List[tuple]) -> List[int]:
+        """Insert feature rows for new CVs from (cv_record_id, features) pairs"""
+        return self.bulk_insert([
+            {'cv_record_id': cv_record_id, **{column: features[column] for column in self.FEATURE_COLUMNS}}
+            for cv_record_id, features in items
+        ])
+    
+    def get_features(self, cv_record_id: int) -> Optional[Dict[str, Any]]:
+        """Get the feature row for a CV (None when missing or derived by an older version)"""
+        with self.get_db() as db:
+            row = db.query(CVFeatures).filter(CVFeatures.cv_record_id == cv_record_id).first()
+            if not row or row.version != FEATURES_VERSION:
+                return None
+            return row.to_dict()
+    
+    def get_cv_ids_without_features(self, limit: int = 500) -> List[int]:
+        """CVs without a current feature row, for backfilling"""
+        with self.get_db() as db:
+            rows = db.query(CVRecord.id)\
+                .outerjoin(CVFeatures, CVFeatures.cv_record_id == CVRecord.id)\
+                .filter((CVFeatures.id.is_(None)) |
+                        (CVFeatures.version.is_(None)) |
+                        (CVFeatures.version != FEATURES_VERSION))\
                 .limit(limit)\
                 .all()
+            return [row.id for row in rows]
+    
+    def filter_cv_ids(self, required_skills: List[str] = None,
+                      min_experience_months: int = 0, min_degree_level: int = 0,
+                      limit: int = 100) -> List[int]:
+        """
+        Filter candidates in SQL, ranked by experience, without loading parsed_data
+        
+        A CV qualifies when it lists every required skill under the same canonical id
+        (aliases resolve, looser wordings do not).
+        """
+        with self.get_db() as db:
+            query = db.query(CVFeatures.cv_record_id, CVFeatures.skills)
+            
+            if min_experience_months:
+                query = query.filter(CVFeatures.total_experience_months >= min_experience_months)
+            if min_degree_level:
+                query = query.filter(CVFeatures.highest_degree_level >= min_degree_level)
             
-            return [{
-                "id": cv.id,
-                "filename": file.original_filename,
-                "contact_name": cv.contact_name,
-                "contact_email": cv.contact_email,
-                "parsed_date": cv.parsed_date,
-                "upload_date": file.upload_date
-            } for cv, file in results]
+            wanted = {normalize_skill(skill) for skill in required_skills or []}
+            if wanted:
+                # Bitmap check is a cheap superset test; exact membership is confirmed below
+                mask = skill_bitmap(wanted)
+                query = query.filter(CVFeatures.skill_bitmap.op('&')(mask) == mask)
+            
+            query = query.order_by(CVFeatures.total_experience_months.desc())
+            
+            cv_ids = []
+            for cv_record_id, skills in query.yield_per(500):
+                if wanted and not wanted.issubset(skills or []):
+                    continue
+                cv_ids.append(cv_record_id)
+                if len(cv_ids) >= limit:
+                    break
+            return cv_ids
 
 class FileUploadRepository(BaseRepository[FileUpload]):
     """Simple file upload repository"""
@@ -152,8 +369,43 @@ class FileUploadRepository(BaseRepository[FileUpload]):
         logger.info(f"Upload {upload_id} status: {status}")
         return self.get(upload_id)
     
+    def count_references(self, content_sha256: str) -> int:
+        """Number of uploads stored as the given blob"""
+        with self.get_db() as db:
+            return db.query(func.count(FileUpload.id)).filter(FileUpload.content_sha256 == content_sha256).scalar()
+    
+    def get_latest_upload_dates(self, content_hashes: List[str]) -> Dict[str, datetime]:
+        """Newest upload date of each given blob that is still referenced"""
+        with self.get_db() as db:
+            rows = (db.query(FileUpload.content_sha256, func.max(FileUpload.upload_date))
+                    .filter(FileUpload.content_sha256.in_(content_hashes))
+                    .group_by(FileUpload.content_sha256))
+            return {sha256: upload_date or datetime.min for sha256, upload_date in rows}
+    
+    def get_latest_legacy_upload_dates(self, filenames: List[str]) -> Dict[str, datetime]:
+        """Like get_latest_upload_dates, for files still stored flat under their upload filename"""
+        with self.get_db() as db:
+            rows = (db.query(FileUpload.filename, func.max(FileUpload.upload_date))
+                    .filter(FileUpload.filename.in_(filenames), FileUpload.content_sha256.is_(None))
+                    .group_by(FileUpload.filename))
+            return {filename: upload_date or datetime.min for filename, upload_date in rows}
+    
+    def get_uploads_without_hash(self) -> List[Tuple[int, str]]:
+        """(id, filename) of uploads saved before content-addressed storage"""
+        with self.get_db() as db:
+            return [tuple(row) for row in db.query(FileUpload.id, FileUpload.filename)
+                    .filter(FileUpload.content_sha256.is_(None)).order_by(FileUpload.id)]
+    
+    def set_content_sha256(self, upload_id: int, content_sha256: str) -> None:
+        """Point an upload record at its blob"""
+        with self.get_db() as db:
+            db.query(FileUpload).filter(FileUpload.id == upload_id).update(
+                {FileUpload.content_sha256: content_sha256}, synchronize_session=False
+            )
+    
     def create_upload_record_and_get_id(self, filename: str, original_filename: str, 
-                                       file_size: int, file_type: str) -> int:
+                                       file_size: int, file_type: str,
+                                       content_sha256: Optional[str] = None) -> int:
         """Create upload record and return ID immediately using proper session management"""
         try:
             with self.get_db() as db:
@@ -162,13 +414,13 @@ class FileUploadRepository(BaseRepository[FileUpload]):
                     original_filename=original_filename,
                     file_size=file_size,
                     file_type=file_type,
+                    content_sha256=content_sha256,
                     upload_date=datetime.utcnow()
                 )
                 
                 db.add(upload_record)
                 db.flush()  # Flush to get the ID without committing
                 record_id = upload_record.id  # Get the ID while still in session
-                db.commit()  # Now commit the transaction
                 
                 return record_id
                 
@@ -0,0 +1,72 @@
+from typing import List, Optional, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy import and_, or_, insert
+
+from app.repositories.base_repository import BaseRepository
+from app.models.database import CVSignature, CVLSHBucket
+from app.services.dedup import MinHasher
+
+logger = logging.getLogger(__name__)
+
+class DedupRepository(BaseRepository[CVSignature]):
+    """Persisted MinHash signatures and LSH buckets"""
+
+    def __init__(self):
+        super().__init__(CVSignature)
+
+    def save_signature(self, cv_record_id: int, signature: np.ndarray, source: str,
+                       buckets: List[Tuple[int, int]]) -> None:
+        """Store a CV signature and its band buckets"""
+        with self.get_db() as db:
+            db.add(CVSignature(
+                cv_record_id=cv_record_id,
+                signature=MinHasher.to_bytes(signature),
+                source=source
+            ))
+            db.add_all([
+                CVLSHBucket(band=band, bucket=bucket, cv_record_id=cv_record_id)
+                for band, bucket in buckets
+            ])
+
+    def bulk_save_signatures(self, items: List[Tuple[int, np.ndarray, str, List[Tuple[int, int]]]]) -> None:
+        """Store many (cv_record_id, signature, source, buckets) with one executemany per table"""
+        if not items:
+            return
+        with self.get_db() as db:
+            db.execute(insert(CVSignature), [
+                {'cv_record_id': cv_record_id, 'signature': MinHasher.to_bytes(signature), 'source': source}
+                for cv_record_id, signature, source, _ in items
+            ])
+            db.execute(insert(CVLSHBucket), [
+                {'band': band, 'bucket': bucket, 'cv_record_id': cv_record_id}
+                for cv_record_id, _, _, buckets in items
+                for band, bucket in buckets
+            ])
+
+    def find_near_duplicate(self, hasher: MinHasher, signature: np.ndarray, source: str,
+                            threshold: float) -> Optional[Tuple[int, float]]:
+        """Best matching (cv_record_id, similarity) at or above the threshold"""
+        buckets = hasher.band_hashes(signature, source)
+
+        with self.get_db() as db:
+            candidate_ids = db.query(CVLSHBucket.cv_record_id).filter(
+                or_(*[and_(CVLSHBucket.band == band, CVLSHBucket.bucket == bucket)
+                      for band, bucket in buckets])
+            ).distinct().all()
+
+            if not candidate_ids:
+                return None
+
+            candidates = db.query(CVSignature.cv_record_id, CVSignature.signature).filter(
+                CVSignature.cv_record_id.in_([row.cv_record_id for row in candidate_ids]),
+                CVSignature.source == source
+            ).all()
+
+        best = None
+        for cv_record_id, stored in candidates:
+            score = hasher.similarity(signature, MinHasher.from_bytes(stored))
+            if score >= threshold and (best is None or score > best[1]):
+                best = (cv_record_id, score)
+        return best
@@ -1,12 +1,68 @@
 from typing import List, Dict, Any, Optional
 import logging
 
-from app.repositories.base_repository import BaseRepository
+from sqlalchemy import select
+
+from app.repositories.base_repository import BaseRepository, AsyncBaseRepository, keyset_page, get_engine
+from app.repositories.search_index import (
+    JOB_FTS, JOB_WEIGHTS, job_fts, search_supported, fts_query, match, bm25, highlight, snippet,
+    index_job, unindex
+)
 from app.models.database import JobDescription
 from app.models.schemas import StructuredJobDescription
 
 logger = logging.getLogger(__name__)
 
+def _active_jobs_query(limit: int, company: str = None, cursor: Optional[str] = None):
+    """Active jobs newest first, optionally filtered by company"""
+    query = select(JobDescription).where(JobDescription.is_active == True)
+    if company:
+        expression = fts_query(company, 'company')
+        if search_supported(get_engine()) and expression:
+            # Word (prefix) match on the full-text index instead of a LIKE scan
+            query = query.where(JobDescription.id.in_(select(job_fts.c.rowid).where(match(job_fts, expression))))
+        else:
+            query = query.where(JobDescription.company.ilike(f"%{company}%"))
+    return keyset_page(query, JobDescription.created_at, JobDescription.id, cursor, limit)
+
+def _job_search_query(search_term: str, limit: int):
+    """Active jobs matching the search term, best BM25 rank first (None when nothing is searchable)"""
+    if not search_supported(get_engine()):
+        pattern = f"%{search_term}%"
+        return select(JobDescription).where(
+            JobDescription.is_active == True,
+            JobDescription.job_title.ilike(pattern) | JobDescription.company.ilike(pattern)
+        ).limit(limit)
+    
+    expression = fts_query(search_term)
+    if not expression:
+        return None
+    rank = bm25(job_fts, JOB_WEIGHTS).label('rank')
+    return select(
+        JobDescription,
+        rank,
+        highlight(job_fts, 0).label('job_title_highlight'),
+        highlight(job_fts, 1).label('company_highlight'),
+        snippet(job_fts, 2).label('snippet')
+    ).join(
+        job_fts, job_fts.c.rowid == JobDescription.id
+    ).where(
+        match(job_fts, expression),
+        JobDescription.is_active == True
+    ).order_by(rank).limit(limit)
+
+def _format_job_hit(row) -> Dict[str, Any]:
+    """Format a job search result with its rank and highlighted fields"""
+    job = JobDescriptionRepository._format_job(row[0])
+    mapping = row._mapping
+    job["search"] = {
+        "rank": mapping.get("rank"),
+        "job_title": mapping.get("job_title_highlight"),
+        "company": mapping.get("company_highlight"),
+        "snippet": mapping.get("snippet")
+    }
+    return job
+
 class JobDescriptionRepository(BaseRepository[JobDescription]):
     """Simplified job description repository"""
     
@@ -14,7 +70,8 @@ class JobDescriptionRepository(BaseRepository[JobDescription]):
         super().__init__(JobDescription)
     
     def save_job_description(self, structured_job: StructuredJobDescription,
-                           source: str = "manual", **kwargs) -> JobDescription:
+                           source: str = "manual", job_profile: Dict[str, Any] = None,
+                           **kwargs) -> JobDescription:
         """Save a structured job description"""
         job_data = structured_job.dict()
         job_data.update(kwargs)  # Add any extra fields
@@ -23,9 +80,23 @@ class JobDescriptionRepository(BaseRepository[JobDescription]):
             job_title=structured_job.job_title,
             company=structured_job.company or "Unknown",
             job_data=job_data,
+            job_profile=job_profile,
             is_active=True
         )
     
+    def get_job_profile(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get the stored requirement profile for a job"""
+        with self.get_db() as db:
+            row = db.query(JobDescription.job_profile).filter(JobDescription.id == job_id).first()
+            return row.job_profile if row else None
+    
+    def save_job_profile(self, job_id: int, job_profile: Dict[str, Any]) -> None:
+        """Store a (re)computed requirement profile"""
+        with self.get_db() as db:
+            db.query(JobDescription).filter(JobDescription.id == job_id).update(
+                {JobDescription.job_profile: job_profile}, synchronize_session=False
+            )
+    
     def get_structured_job_by_id(self, job_id: int) -> Optional[StructuredJobDescription]:
         """Get StructuredJobDescription from stored data"""
         with self.get_db() as db:
@@ -65,28 +136,19 @@ class JobDescriptionRepository(BaseRepository[JobDescription]):
                 return None
     
     def get_active_jobs(self, limit: int = 20, company: str = None,
-                       job_type: str = None) -> List[Dict[str, Any]]:
-        """Get active job descriptions"""
+                       job_type: str = None, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get active job descriptions, continuing after a cursor"""
         with self.get_db() as db:
-            query = db.query(JobDescription).filter(JobDescription.is_active == True)
-            
-            if company:
-                query = query.filter(JobDescription.company.ilike(f"%{company}%"))
-            
-            jobs = query.order_by(JobDescription.created_at.desc()).limit(limit).all()
+            jobs = db.execute(_active_jobs_query(limit, company, cursor)).scalars().all()
             return [self._format_job(job) for job in jobs]
     
     def search_jobs(self, search_term: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Search jobs by title or company"""
+        """Full-text search over title, company and job data, best matches first"""
+        query = _job_search_query(search_term, limit)
+        if query is None:
+            return []
         with self.get_db() as db:
-            pattern = f"%{search_term}%"
-            jobs = db.query(JobDescription).filter(
-                JobDescription.is_active == True,
-                (JobDescription.job_title.ilike(pattern) | 
-                 JobDescription.company.ilike(pattern))
-            ).limit(limit).all()
-            
-            return [self._format_job(job) for job in jobs]
+            return [_format_job_hit(row) for row in db.execute(query).all()]
     
     def get_jobs_by_company(self, company: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get all jobs for a company"""
@@ -104,7 +166,16 @@ class JobDescriptionRepository(BaseRepository[JobDescription]):
         """Soft delete a job"""
         return self.update(job_id, is_active=False)
     
-    def _format_job(self, job: JobDescription) -> Dict[str, Any]:
+    def _on_saved(self, db, instance: JobDescription) -> None:
+        """Keep the full-text index in step with the job"""
+        index_job(db, instance)
+    
+    def _on_deleted(self, db, instance: JobDescription) -> None:
+        """Drop the job from the full-text index"""
+        unindex(db, JOB_FTS, instance.id)
+    
+    @staticmethod
+    def _format_job(job: JobDescription) -> Dict[str, Any]:
         """Format job record for API response"""
         job_data = job.job_data.copy() if job.job_data else {}
         job_data.update({
@@ -114,4 +185,26 @@ class JobDescriptionRepository(BaseRepository[JobDescription]):
             "is_active": job.is_active,
             "created_at": job.created_at
         })
-        return job_data
\ No newline at end of file
+        return job_data
+
+class AsyncJobDescriptionRepository(AsyncBaseRepository[JobDescription]):
+    """Async job description reads for request handlers"""
+    
+    def __init__(self):
+        super().__init__(JobDescription)
+    
+    async def get_active_jobs(self, limit: int = 20, company: str = None,
+                              job_type: str = None, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get active job descriptions, continuing after a cursor"""
+        async with self.get_db() as db:
+            result = await db.execute(_active_jobs_query(limit, company, cursor))
+            return [JobDescriptionRepository._format_job(job) for job in result.scalars().all()]
+    
+    async def search_jobs(self, search_term: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Full-text search over title, company and job data, best matches first"""
+        query = _job_search_query(search_term, limit)
+        if query is None:
+            return []
+        async with self.get_db() as db:
+            result = await db.execute(query)
+            return [_format_job_hit(row) for row in result.all()]
@@ -0,0 +1,220 @@
+"""
+SQLite FTS5 full-text indexes over job descriptions and CVs
+
+Each virtual table row uses the id of the indexed record as its rowid. The
+repositories keep the tables in step on every write, and rebuild_search_index()
+repopulates them from scratch.
+"""
+
+from contextlib import closing
+from functools import lru_cache
+from typing import Dict, Any, Optional
+import logging
+import re
+import sqlite3
+
+from sqlalchemy import select, text, table, column, func, literal_column
+
+from app.models.database import JobDescription, CVRecord
+
+logger = logging.getLogger(__name__)
+
+JOB_FTS = 'job_descriptions_fts'
+CV_FTS = 'cv_records_fts'
+
+JOB_COLUMNS = ('job_title', 'company', 'body')
+CV_COLUMNS = ('name', 'skills', 'positions', 'summary')
+
+# BM25 column weights: hits in titles and names outrank hits in body text
+JOB_WEIGHTS = (10.0, 5.0, 1.0)
+CV_WEIGHTS = (10.0, 4.0, 3.0, 1.0)
+
+# '+' and '#' are part of words, so C++ and C# are not indexed as C
+TOKENIZER = "porter unicode61 remove_diacritics 2 tokenchars '+#'"
+HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE = '<mark>', '</mark>'
+SNIPPET_TOKENS = 16
+
+job_fts = table(JOB_FTS, column('rowid'), *(column(name) for name in JOB_COLUMNS))
+cv_fts = table(CV_FTS, column('rowid'), *(column(name) for name in CV_COLUMNS))
+
+_WORD_PATTERN = re.compile(r'\w[\w+#]*')
+
+@lru_cache(maxsize=None)
+def fts5_available() -> bool:
+    """Whether the linked SQLite library has FTS5 (probed once, on a private in-memory database)"""
+    try:
+        with closing(sqlite3.connect(':memory:')) as conn:
+            conn.execute("CREATE VIRTUAL TABLE fts5_probe USING fts5(x)")
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"SQLite has no FTS5, search falls back to LIKE matching: {e}")
+        return False
+
+def search_supported(bind) -> bool:
+    """Full-text indexes are only maintained on SQLite builds with FTS5"""
+    return bind.dialect.name == 'sqlite' and fts5_available()
+
+def fts_query(term: str, column_name: Optional[str] = None) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text typed by a user
+
+    Every word has to match and the last one matches as a prefix, so partially
+    typed input works. Words are quoted, so FTS5 operators in the input are
+    treated as plain text. Returns None when the input has no searchable words.
+    """
+    words = _WORD_PATTERN.findall(term or '')
+    if not words:
+        return None
+    expression = ' '.join(f'"{word}"' for word in words) + '*'
+    return f'{column_name} : ({expression})' if column_name else expression
+
+def match(fts_table, expression: str):
+    """WHERE clause restricting a query to rows of fts_table matching expression"""
+    return literal_column(fts_table.name).op('MATCH')(expression)
+
+def bm25(fts_table, weights):
+    """BM25 relevance of the matched row (lower is better)"""
+    return func.bm25(literal_column(fts_table.name), *weights)
+
+def highlight(fts_table, column_index: int):
+    """Full column text with the matched terms marked"""
+    return func.highlight(literal_column(fts_table.name), column_index, HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE)
+
+def snippet(fts_table, column_index: int):
+    """Short excerpt of a long column around the matched terms"""
+    return func.snippet(literal_column(fts_table.name), column_index, HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE,
+                        '…', SNIPPET_TOKENS)
+
+def _join(values) -> str:
+    """Space separated text of the non-empty values"""
+    return ' '.join(str(value) for value in values if value)
+
+def job_document(job_title: str, company: str, job_data: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Indexed text of a job description"""
+    data = job_data or {}
+    requirements = [
+        requirement
+        for group in data.get('requirements') or [] if isinstance(group, dict)
+        for requirement in group.get('requirements') or []
+    ]
+    body = _join([
+        data.get('summary'), data.get('location'), data.get('job_type'), data.get('experience_level'),
+        *(data.get('responsibilities') or []),
+        *(data.get('required_skills') or []),
+        *(data.get('preferred_skills') or []),
+        *requirements,
+        *(data.get('education_requirements') or []),
+        *(data.get('certifications_required') or [])
+    ])
+    return {'job_title': job_title or '', 'company': company or '', 'body': body}
+
+def cv_document(contact_name: Optional[str], parsed_data: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Indexed text of a parsed CV"""
+    data = parsed_data or {}
+    contact_info = data.get('contact_info') or {}
+    skills = list(data.get('skills') or [])
+    for group in (data.get('technical_skills') or {}).values():
+        skills.extend(group or [])
+    positions = [
+        _join([experience.get('position'), experience.get('company')])
+        for experience in data.get('experiences') or [] if isinstance(experience, dict)
+    ]
+    return {
+        'name': contact_name or contact_info.get('name') or '',
+        'skills': _join(skills),
+        'positions': _join(positions),
+        'summary': data.get('summary') or ''
+    }
+
+def _insert(fts_name: str, columns):
+    """INSERT of one row of indexed text keyed by record id"""
+    return text(f"INSERT INTO {fts_name} (rowid, {', '.join(columns)}) "
+                f"VALUES (:id, {', '.join(':' + name for name in columns)})")
+
+def _index(db, fts_name: str, columns, row_id: int, document: Dict[str, str]) -> None:
+    """Replace the indexed text of one record"""
+    db.execute(text(f"DELETE FROM {fts_name} WHERE rowid = :id"), {'id': row_id})
+    db.execute(_insert(fts_name, columns), {'id': row_id, **document})
+
+def index_job(db, job: JobDescription) -> None:
+    """(Re)index a job description inside the caller's transaction"""
+    if search_supported(db.get_bind()):
+        _index(db, JOB_FTS, JOB_COLUMNS, job.id, job_document(job.job_title, job.company, job.job_data))
+
+def index_cv(db, cv: CVRecord) -> None:
+    """(Re)index a CV inside the caller's transaction"""
+    if search_supported(db.get_bind()):
+        _index(db, CV_FTS, CV_COLUMNS, cv.id, cv_document(cv.contact_name, cv.parsed_data))
+
+def unindex(db, fts_name: str, row_id: int) -> None:
+    """Remove a deleted record from a full-text index"""
+    if search_supported(db.get_bind()):
+        db.execute(text(f"DELETE FROM {fts_name} WHERE rowid = :id"), {'id': row_id})
+
+def create_search_tables(bind) -> None:
+    """Create the FTS5 tables, populating them when they are new"""
+    if not search_supported(bind):
+        return
+    with bind.begin() as conn:
+        existing = set()
+        for name, sql in conn.execute(text(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name IN (:job, :cv)"
+        ), {'job': JOB_FTS, 'cv': CV_FTS}):
+            if TOKENIZER in sql:
+                existing.add(name)
+            else:
+                # Created with an older tokenizer, recreate and repopulate it
+                conn.execute(text(f"DROP TABLE {name}"))
+        conn.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {JOB_FTS} USING fts5("
+                          f'{", ".join(JOB_COLUMNS)}, tokenize = "{TOKENIZER}")'))
+        conn.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {CV_FTS} USING fts5("
+                          f'{", ".join(CV_COLUMNS)}, tokenize = "{TOKENIZER}")'))
+    if existing != {JOB_FTS, CV_FTS}:
+        rebuild_search_index(bind)
+
+def _sources():
+    """(name, fts table, columns, source select, document builder) of each index"""
+    return (
+        ('jobs', JOB_FTS, JOB_COLUMNS,
+         select(JobDescription.id, JobDescription.job_title, JobDescription.company, JobDescription.job_data),
+         lambda row: job_document(row.job_title, row.company, row.job_data)),
+        ('cvs', CV_FTS, CV_COLUMNS,
+         select(CVRecord.id, CVRecord.contact_name, CVRecord.parsed_data),
+         lambda row: cv_document(row.contact_name, row.parsed_data))
+    )
+
+def _index_rows(conn, fts_name: str, columns, rows, build, batch_size: int) -> int:
+    """Insert the documents of source rows in batches"""
+    for start in range(0, len(rows), batch_size):
+        conn.execute(_insert(fts_name, columns),
+                     [{'id': row.id, **build(row)} for row in rows[start:start + batch_size]])
+    return len(rows)
+
+def rebuild_search_index(bind, batch_size: int = 500) -> Dict[str, int]:
+    """Repopulate both full-text indexes from the job and CV tables"""
+    if not search_supported(bind):
+        return {'jobs': 0, 'cvs': 0}
+
+    counts = {}
+    with bind.begin() as conn:
+        for name, fts_name, columns, source, build in _sources():
+            conn.execute(text(f"DELETE FROM {fts_name}"))
+            counts[name] = _index_rows(conn, fts_name, columns, conn.execute(source).all(), build, batch_size)
+            conn.execute(text(f"INSERT INTO {fts_name} ({fts_name}) VALUES ('optimize')"))
+
+    logger.info(f"Rebuilt full-text indexes: {counts['jobs']} jobs, {counts['cvs']} CVs")
+    return counts
+
+def index_new_rows(bind, name: str, after_id: int, batch_size: int = 500) -> int:
+    """(Re)index the jobs or CVs with an id above after_id, e.g. after a bulk import"""
+    if not search_supported(bind):
+        return 0
+    for source_name, fts_name, columns, source, build in _sources():
+        if source_name != name:
+            continue
+        id_column = source.selected_columns.id
+        with bind.begin() as conn:
+            conn.execute(text(f"DELETE FROM {fts_name} WHERE rowid > :id"), {'id': after_id})
+            rows = conn.execute(source.where(id_column > after_id).order_by(id_column)).all()
+            return _index_rows(conn, fts_name, columns, rows, build, batch_size)
+    raise ValueError(f"Unknown search index: {name}")
@@ -0,0 +1,175 @@
+"""
+Single-writer queue for database writes
+
+SQLite allows one writer at a time. Instead of letting request threads race for
+the write lock (and hit "database is locked" or busy-timeout stalls), writes are
+queued to one thread that owns the write connection. It runs whatever is pending
+as a batch, each write inside its own savepoint, and commits the batch once.
+The connection comes from a writer engine (see create_writer_engine) on which
+savepoints nest inside the batch transaction.
+"""
+
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+from app.config import config
+from app.repositories.base_repository import get_writer_engine, SessionLocal, bound_session
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class WriteQueue:
+    """Dedicated writer thread that group-commits queued write functions"""
+
+    def __init__(self, bind=None, max_batch: int = 64, max_delay_ms: float = 2):
+        self.bind = bind or get_writer_engine()
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.writes = 0
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Queue fn(*args, **kwargs) for the writer thread
+
+        Repository calls made by fn share the batch session. The future resolves
+        with fn's return value once its batch has committed, or with the
+        exception fn (or the commit) raised.
+        """
+        future: Future = Future()
+        if self.in_writer():
+            # A write issued from inside a queued write joins the running batch
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self._ensure_started()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def execute(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Queue a write and wait for its result"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Queue a write and await its result without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def in_writer(self) -> bool:
+        """Whether the caller is running on the writer thread"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def close(self, timeout: float = 10) -> None:
+        """Finish the queued writes and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> Tuple[List[tuple], bool]:
+        """Block for one write, then collect whatever else arrives within max_delay"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch, stop = [first], False
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _run(self) -> None:
+        connection = self.bind.connect()
+        try:
+            while True:
+                batch, stop = self._next_batch()
+                if batch:
+                    connection = self._write_batch(connection, batch)
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+    def _write_batch(self, connection, batch: List[tuple]):
+        """Run a batch in one transaction; returns the connection to use next"""
+        results = []
+        db = SessionLocal(bind=connection)
+        try:
+            with bound_session(db):
+                for future, fn, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    savepoint = db.begin_nested()
+                    try:
+                        result = fn(*args, **kwargs)
+                        db.flush()
+                        savepoint.commit()
+                        results.append((future, result, None))
+                    except Exception as e:
+                        savepoint.rollback()
+                        results.append((future, None, e))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Write batch of {len(batch)} failed: {e}")
+            db.rollback()
+            db.close()
+            for future, fn, args, kwargs in batch:
+                if not future.done():
+                    future.set_exception(e)
+            connection.close()
+            return self.bind.connect()
+
+        db.close()
+        self.batches += 1
+        self.writes += len(results)
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        return connection
+
+_write_queue: Optional[WriteQueue] = None
+
+def get_write_queue() -> WriteQueue:
+    """Process-wide write queue (the writer thread starts on first use)"""
+    global _write_queue
+    if _write_queue is None:
+        _write_queue = WriteQueue(max_batch=config.WRITE_QUEUE_MAX_BATCH,
+                                  max_delay_ms=config.WRITE_QUEUE_MAX_DELAY_MS)
+    return _write_queue
+
+async def run_write(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a write through the write queue, or a worker thread when the queue is disabled"""
+    if config.WRITE_QUEUE_ENABLED:
+        return await get_write_queue().run(fn, *args, **kwargs)
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+def close_write_queue() -> None:
+    """Drain and stop the writer thread, if it was started"""
+    if _write_queue is not None:
+        _write_queue.close()
@@ -1,13 +1,20 @@
 import logging
+import time
+import numpy as np
 from typing import Dict, Any, List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+import asyncio
 from fastapi import HTTPException
 
-from app.repositories.analysis_repository import AnalysisRepository
-from app.services.cv_processor import cv_processor
-from app.services.job_description_service import job_description_service
+from app.repositories.analysis_repository import AnalysisRepository, AsyncAnalysisRepository
+from app.repositories.base_repository import InvalidCursorError, next_cursor
+from app.repositories.write_queue import run_write
+from app.services.cv_processor import get_cv_processor
+from app.services.job_description_service import get_job_description_service
 from app.services.analyzer import analyze_cv_job_match
 from app.models.schemas import AnalysisResponse
+from app.config import config
+from app.services.scoring import overall_scores, hire_codes_for, get_scoring_weights, resolve_weights
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +23,7 @@ class AnalysisService:
     
     def __init__(self):
         self.analysis_repository = AnalysisRepository()
+        self.async_analysis_repository = AsyncAnalysisRepository()
     
     async def perform_analysis(self, cv_id: int, job_id: int, 
                          detailed: bool = True, 
@@ -25,8 +33,10 @@ class AnalysisService:
         
         try:
             # Get CV and job description data
-            structured_cv = cv_processor.get_structured_cv(cv_id)
-            structured_job = job_description_service.get_structured_job(job_id)
+            structured_cv = await asyncio.to_thread(get_cv_processor().get_structured_cv, cv_id)
+            cv_features = await get_cv_processor().get_cv_features_async(cv_id, structured_cv)
+            structured_job = await asyncio.to_thread(get_job_description_service().get_structured_job, job_id)
+            job_profile = await get_job_description_service().get_job_profile_async(job_id, structured_job)
             
             logger.info(f"Starting analysis: CV {cv_id} vs Job {job_id}")
             
@@ -34,7 +44,9 @@ class AnalysisService:
             analysis_result = await analyze_cv_job_match(
                 structured_cv=structured_cv,
                 structured_job=structured_job,
-                detailed=detailed
+                detailed=detailed,
+                cv_features=cv_features,
+                job_profile=job_profile
             )
             
             end_time = datetime.now()
@@ -42,7 +54,8 @@ class AnalysisService:
             
             # Save the result if requested
             if save_result:
-                analysis_record_data = self.analysis_repository.save_analysis_result(
+                analysis_record_data = await run_write(
+                    self.analysis_repository.save_analysis_result,
                     cv_record_id=cv_id,
                     job_description_id=job_id,
                     analysis_response=analysis_result,
@@ -99,31 +112,185 @@ class AnalysisService:
             logger.error(f"Error getting analysis {analysis_id}: {str(e)}")
             return None
     
-    def get_recent_analyses(self, limit: int = 20) -> List[Dict[str, Any]]:
+    def get_recent_analyses(self, limit: int = 20, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get recent analyses with related data"""
         try:
             # Use the repository to get recent analyses
-            analyses = self.analysis_repository.get_recent_analyses(limit)
+            analyses = self.analysis_repository.get_recent_analyses(limit, cursor=cursor)
             return analyses
         except Exception as e:
             logger.error(f"Error getting recent analyses: {str(e)}")
             return []
     
-    def get_cv_analyses(self, cv_id: int) -> List[Dict[str, Any]]:
-        """Get all analyses for a specific CV"""
-        return self.analysis_repository.get_analyses_by_cv(cv_id)
+    async def get_recent_analyses_async(self, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Page of recent analysis summaries plus the cursor of the next page"""
+        try:
+            analyses = await self.async_analysis_repository.get_recent_analyses(limit, cursor=cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": analyses, "next_cursor": next_cursor(analyses, limit, 'analysis_date')}
+    
+    async def get_analysis_record_async(self, analysis_id: int) -> Dict[str, Any]:
+        """Get an analysis with its full CV and job records without blocking the event loop"""
+        analysis = await self.async_analysis_repository.get_analysis_record(analysis_id)
+        if not analysis:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+        return analysis
     
-    def get_job_analyses(self, job_id: int) -> List[Dict[str, Any]]:
-        """Get all analyses for a specific job"""
-        return self.analysis_repository.get_analyses_by_job(job_id)
+    def get_cv_analyses(self, cv_id: int, limit: Optional[int] = None,
+                        cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get analyses for a specific CV (paged when a limit is given)"""
+        try:
+            return self.analysis_repository.get_analyses_by_cv(cv_id, limit=limit, cursor=cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
-    def get_top_matches(self, job_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_job_analyses(self, job_id: int, limit: Optional[int] = None,
+                         cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get analyses for a specific job (paged when a limit is given)"""
+        try:
+            return self.analysis_repository.get_analyses_by_job(job_id, limit=limit, cursor=cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    def get_top_matches(self, job_id: int, limit: int = 10,
+                        latest_per_cv: bool = False) -> List[Dict[str, Any]]:
         """Get top CV matches for a job"""
-        return self.analysis_repository.get_top_matches_for_job(job_id, limit=limit)
+        return self.analysis_repository.get_top_matches_for_job(job_id, limit=limit, latest_per_cv=latest_per_cv)
+    
+    async def get_top_matches_async(self, job_id: int, limit: int = 10,
+                                    latest_per_cv: bool = False) -> List[Dict[str, Any]]:
+        """Get top CV matches for a job without blocking the event loop"""
+        return await self.async_analysis_repository.get_top_matches_for_job(
+            job_id, limit=limit, latest_per_cv=latest_per_cv
+        )
+    
+    async def get_candidates_async(self, job_id: int, limit: int = 20) -> List[int]:
+        """
+        IDs of the CVs that list every required skill of a job and meet its years and degree
+        
+        Most experienced first. Runs on the precomputed feature rows, without loading
+        parsed_data or calling the LLM, e.g. to choose which CVs to analyze. CVs stored
+        before feature rows existed are found once `python -m app.cli backfill-features` ran.
+        """
+        job_profile = await get_job_description_service().get_job_profile_async(job_id)
+        # A requirement without a degree level can be met by the field of study alone
+        degree_levels = [requirement['degree_level'] for requirement in job_profile['education']]
+        return await asyncio.to_thread(
+            get_cv_processor().feature_repository.filter_cv_ids,
+            required_skills=[skill['id'] for skill in job_profile['required_skills']],
+            min_experience_months=job_profile['required_years'] * 12,
+            min_degree_level=min(degree_levels) if degree_levels and all(degree_levels) else 0,
+            limit=limit
+        )
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get overall analysis statistics"""
         return self.analysis_repository.get_analysis_statistics()
+    
+    def rebuild_statistics(self) -> Dict[str, Any]:
+        """Recompute the statistics rollup from the analyses table"""
+        return self.analysis_repository.rebuild_statistics()
+    
+    async def get_statistics_async(self) -> Dict[str, Any]:
+        """Get overall analysis statistics without blocking the event loop"""
+        return await self.async_analysis_repository.get_analysis_statistics()
+    
+    def backfill_summary_columns(self) -> int:
+        """Fill the denormalized score columns of analyses saved before they existed"""
+        return self.analysis_repository.backfill_summary_columns()
+    
+    def archive_analyses(self, older_than_days: Optional[int] = None, inactive_jobs: Optional[bool] = None,
+                         batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """Move stale analyses (by age, or of deactivated jobs) to the archive table"""
+        older_than_days = config.ARCHIVE_ANALYSES_AFTER_DAYS if older_than_days is None else older_than_days
+        inactive_jobs = config.ARCHIVE_INACTIVE_JOB_ANALYSES if inactive_jobs is None else inactive_jobs
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days) if older_than_days > 0 else None
+        
+        start = time.perf_counter()
+        archived = self.analysis_repository.archive_analyses(
+            cutoff, inactive_jobs=inactive_jobs, batch_size=batch_size or config.ARCHIVE_BATCH_SIZE
+        )
+        return {
+            "archived": sum(archived.values()),
+            "by_reason": archived,
+            "cutoff": cutoff.isoformat() if cutoff else None,
+            "inactive_jobs": inactive_jobs,
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+    
+    def rescore_all(self, weights: Optional[Dict[str, float]] = None,
+                    batch_size: int = 5000, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Recompute suitability scores of every stored analysis with the current weights
+        
+        Uses the category scores already stored with each analysis - no LLM calls.
+        Other weights can only be previewed (dry_run): new analyses are always scored
+        with the configured SCORE_WEIGHT_* values, so stored scores must match them.
+        """
+        start = time.perf_counter()
+        try:
+            weights = resolve_weights(weights)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if weights != get_scoring_weights() and not dry_run:
+            raise HTTPException(
+                status_code=400,
+                detail="Custom weights can only be previewed with dry_run; set SCORE_WEIGHT_* to apply them"
+            )
+        
+        self.backfill_summary_columns()
+        inputs = self.analysis_repository.load_scoring_inputs()
+        loaded = time.perf_counter()
+        
+        ids = np.asarray(inputs['ids'], dtype=np.int64)
+        current = np.asarray(inputs['current'], dtype=np.float64)
+        technical = np.asarray(inputs['technical'], dtype=np.float64)
+        experience = np.asarray(inputs['experience'], dtype=np.float64)
+        education = np.asarray(inputs['education'], dtype=np.float64)
+        hire_codes = hire_codes_for(inputs['hire_recommendation'], technical, experience, education, current)
+        
+        scores = overall_scores(technical, experience, education, hire_codes, weights)
+        changed = np.nonzero(scores != current)[0]
+        computed = time.perf_counter()
+        
+        if not dry_run and len(changed):
+            self.analysis_repository.bulk_update_scores(
+                [{"id": int(ids[i]), "score": int(scores[i])} for i in changed],
+                batch_size=batch_size
+            )
+            # Score sums and buckets moved, recompute the rollup once
+            self.analysis_repository.rebuild_statistics()
+        
+        result = {
+            "total_analyses": int(len(ids)),
+            "changed": int(len(changed)),
+            "dry_run": dry_run,
+            "weights": weights,
+            "timings_seconds": {
+                "load": round(loaded - start, 3),
+                "compute": round(computed - loaded, 3),
+                "write": round(time.perf_counter() - computed, 3)
+            }
+        }
+        logger.info(f"Re-scored {result['total_analyses']} analyses, {result['changed']} changed")
+        return result
+
+async def run_scheduled_archiving(interval_seconds: int) -> None:
+    """Archive stale analyses periodically, off the event loop"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(get_analysis_service().archive_analyses)
+        except Exception as e:
+            logger.warning(f"Scheduled analysis archiving failed: {e}")
+
+# Singleton instance, created on first use
+_analysis_service: Optional[AnalysisService] = None
 
-# Create singleton instance
-analysis_service = AnalysisService()
\ No newline at end of file
+def get_analysis_service() -> AnalysisService:
+    """Get or create the singleton analysis service"""
+    global _analysis_service
+    if _analysis_service is None:
+        _analysis_service = AnalysisService()
+    return _analysis_service
@@ -1,10 +1,8 @@
-import google.genai as genai
 import os
 import json
 import logging
 from typing import Dict, Any, List, Optional, Tuple
 import asyncio
-from datetime import datetime
 import re
 from collections import defaultdict
 
@@ -13,7 +11,11 @@ from app.models.schemas import (
     DetailedAnalysis, SkillMatch, ExperienceMatch, EducationMatch,
     JobRequirement
 )
-from app.services.cv_processor import cv_processor
+from app.services.cv_processor import get_cv_processor
+from app.services.cv_features import collect_cv_skills, extract_skills_from_text, degree_level, SKILL_VARIATIONS
+from app.services.job_profile import build_job_profile, extract_required_years
+from app.services.scoring import overall_score
+from app.services.timeline import build_timeline
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -37,6 +39,8 @@ class CVJobAnalyzer:
             if not api_key:
                 raise ValueError("GEMINI_API_KEY not found in environment variables")
             
+            # Deferred like in GeminiCVParser, to keep it out of app startup
+            import google.genai as genai
             self.client = genai.Client(api_key=api_key)
             self.model = 'gemini-2.0-flash'
             logger.info("Gemini API configured successfully for analyzer")
@@ -47,7 +51,9 @@ class CVJobAnalyzer:
     async def analyze_cv_for_job(self, 
                                  structured_cv: StructuredCV, 
                                  structured_job: StructuredJobDescription,
-                                 detailed: bool = True) -> AnalysisResponse:
+                                 detailed: bool = True,
+                                 cv_features: Optional[Dict[str, Any]] = None,
+                                 job_profile: Optional[Dict[str, Any]] = None) -> AnalysisResponse:
         """
         Analyze CV against job description
         
@@ -55,20 +61,25 @@ class CVJobAnalyzer:
             structured_cv: Parsed CV data
             structured_job: Parsed job description data
             detailed: Whether to include detailed analysis
+            cv_features: Precomputed CV features (skills, experience months)
+            job_profile: Precomputed job requirement profile
             
         Returns:
             AnalysisResponse with complete analysis
         """
         try:
+            if job_profile is None:
+                job_profile = build_job_profile(structured_job)
+            
             # Conduct multi-stage analysis
             # Stage 1: Skills analysis
-            skills_analysis = await self._analyze_skills(structured_cv, structured_job)
+            skills_analysis = await self._analyze_skills(structured_cv, structured_job, job_profile, cv_features)
             
             # Stage 2: Experience analysis
-            experience_analysis = await self._analyze_experience(structured_cv, structured_job)
+            experience_analysis = await self._analyze_experience(structured_cv, structured_job, job_profile, cv_features)
             
             # Stage 3: Education analysis
-            education_analysis = await self._analyze_education(structured_cv, structured_job)
+            education_analysis = await self._analyze_education(structured_cv, structured_job, job_profile)
             
             # Stage 4: Overall suitability and recommendations
             # Stage 4: Overall suitability and recommendations
@@ -93,13 +104,14 @@ class CVJobAnalyzer:
                 matching_skills=skills_analysis.get('matching', []),
                 missing_skills=skills_analysis.get('missing', []),
                 recommendations=overall_analysis.get('recommendations', []),
-                red_flags=overall_analysis.get('red_flags', [])
+                red_flags=overall_analysis.get('red_flags', []),
+                hire_recommendation=overall_analysis.get('hire_recommendation')
             )
             
             # Add detailed analysis if requested
             if detailed:
                 response.detailed_analysis = await self._create_detailed_analysis(
-                    structured_cv, structured_job,
+                    structured_cv, structured_job, job_profile,
                     skills_analysis, experience_analysis, education_analysis
                 )
             
@@ -109,40 +121,29 @@ class CVJobAnalyzer:
             logger.error(f"Error analyzing CV: {str(e)}")
             raise AnalysisError(f"Failed to analyze CV: {str(e)}")
     
-    async def _analyze_skills(self, cv: StructuredCV, job: StructuredJobDescription) -> Dict[str, Any]:
+    async def _analyze_skills(self, cv: StructuredCV, job: StructuredJobDescription,
+                              job_profile: Dict[str, Any],
+                              cv_features: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze skills match between CV and job"""
-        # Combine all CV skills
-        cv_skills = set(cv.skills)
-        for category, skills in cv.technical_skills.items():
-            cv_skills.update(skills)
-        
-        # Extract skills from experiences and projects
-        for exp in cv.experiences:
-            # Look for skills in responsibilities and achievements
-            text = ' '.join(exp.responsibilities + exp.achievements)
-            cv_skills.update(self._extract_skills_from_text(text))
-        
-        for proj in cv.projects:
-            cv_skills.update(proj.technologies)
-        
-        # Normalize skills for comparison
-        cv_skills_normalized = {skill.lower().strip() for skill in cv_skills}
-        required_skills_normalized = {skill.lower().strip() for skill in job.required_skills}
-        preferred_skills_normalized = {skill.lower().strip() for skill in job.preferred_skills}
+        # Combined, normalized CV skills - precomputed at upload when available
+        if cv_features:
+            cv_skills = set(cv_features['skills'])
+        else:
+            cv_skills = collect_cv_skills(cv)
         
         # Find matches
         matching_required = []
         missing_required = []
         
-        for skill in job.required_skills:
-            if any(self._skills_match(skill, cv_skill) for cv_skill in cv_skills):
+        for skill, requirement in zip(job.required_skills, job_profile['required_skills']):
+            if self._skill_present(requirement, cv_skills):
                 matching_required.append(skill)
             else:
                 missing_required.append(skill)
         
         matching_preferred = []
-        for skill in job.preferred_skills:
-            if any(self._skills_match(skill, cv_skill) for cv_skill in cv_skills):
+        for skill, requirement in zip(job.preferred_skills, job_profile['preferred_skills']):
+            if self._skill_present(requirement, cv_skills):
                 matching_preferred.append(skill)
         
         # Use Gemini for deeper skill analysis
@@ -189,11 +190,16 @@ class CVJobAnalyzer:
             'cv_skills': list(cv_skills)
         }
     
-    async def _analyze_experience(self, cv: StructuredCV, job: StructuredJobDescription) -> Dict[str, Any]:
+    async def _analyze_experience(self, cv: StructuredCV, job: StructuredJobDescription,
+                                  job_profile: Dict[str, Any],
+                                  cv_features: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze experience match"""
         # Extract years of experience
-        cv_years = self._calculate_total_experience(cv)
-        required_years = self._extract_required_years(job)
+        if cv_features:
+            cv_years = cv_features['total_experience_months'] // 12
+        else:
+            cv_years = self._calculate_total_experience(cv)
+        required_years = job_profile['required_years']
         
         # Analyze role relevance
         experience_prompt = f"""
@@ -252,7 +258,8 @@ class CVJobAnalyzer:
             } for exp in cv.experiences]
         }
     
-    async def _analyze_education(self, cv: StructuredCV, job: StructuredJobDescription) -> Dict[str, Any]:
+    async def _analyze_education(self, cv: StructuredCV, job: StructuredJobDescription,
+                                 job_profile: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze education match"""
         education_data = {
             'degrees': [f"{edu.degree} in {edu.field_of_study or 'N/A'}" for edu in cv.education],
@@ -266,23 +273,21 @@ class CVJobAnalyzer:
         meets_requirements = any(
             self._education_meets_requirement(edu, req)
             for edu in cv.education
-            for req in job.education_requirements
-        ) if job.education_requirements else True
+            for req in job_profile['education']
+        ) if job_profile['education'] else True
         
         # Check certifications
-        has_required_certs = all(
-            any(self._certification_matches(cert.name, req) for cert in cv.certifications)
-            for req in job.certifications_required
-        ) if job.certifications_required else True
+        missing_certifications = [
+            req['requirement'] for req in job_profile['certifications']
+            if not any(self._certification_matches(cert.name, req) for cert in cv.certifications)
+        ]
+        has_required_certs = not missing_certifications
         
         return {
             'meets_requirements': meets_requirements,
             'has_required_certifications': has_required_certs,
             'education_details': education_data,
-            'missing_certifications': [
-                req for req in job.certifications_required
-                if not any(self._certification_matches(cert.name, req) for cert in cv.certifications)
-            ]
+            'missing_certifications': missing_certifications
         }
     
     async def _analyze_overall_suitability(self, cv: StructuredCV, job: StructuredJobDescription,
@@ -342,7 +347,7 @@ class CVJobAnalyzer:
             }
     
     async def _create_detailed_analysis(self, cv: StructuredCV, job: StructuredJobDescription,
-                                      skills_analysis: Dict, experience_analysis: Dict,
+                                      job_profile: Dict[str, Any], skills_analysis: Dict, experience_analysis: Dict,
                                       education_analysis: Dict) -> DetailedAnalysis:
         """Create detailed analysis object"""
         detailed = DetailedAnalysis()
@@ -366,10 +371,10 @@ class CVJobAnalyzer:
             ))
         
         # Education matches
-        for req in job.education_requirements:
+        for req in job_profile['education']:
             match = self._find_education_match(req, cv)
             detailed.education_matches.append(EducationMatch(
-                requirement=req,
+                requirement=req['requirement'],
                 cv_education=match['education'],
                 meets_requirement=match['meets']
             ))
@@ -415,25 +420,15 @@ class CVJobAnalyzer:
         if not education_analysis['has_required_certifications']:
             education_score -= 20
         
-        # Overall score (weighted average)
-        overall_score = int(
-            technical_score * 0.4 +
-            experience_score * 0.4 +
-            education_score * 0.2
-        )
-        
-        # Adjust based on hire recommendation
-        hire_rec = overall_analysis.get('hire_recommendation', 'maybe')
-        if hire_rec == 'strong yes':
-            overall_score = max(85, overall_score)
-        elif hire_rec == 'no':
-            overall_score = min(40, overall_score)
-        
+        # Overall score (configured weighted average, adjusted by hire recommendation)
         return {
             'technical': technical_score,
             'experience': experience_score,
             'education': education_score,
-            'overall': overall_score
+            'overall': overall_score(
+                technical_score, experience_score, education_score,
+                overall_analysis.get('hire_recommendation', 'maybe')
+            )
         }
     
     # Helper methods
@@ -451,17 +446,21 @@ class CVJobAnalyzer:
     
     def _extract_skills_from_text(self, text: str) -> List[str]:
         """Extract potential skills from text"""
-        # Common skill patterns
-        skill_keywords = ['python', 'java', 'javascript', 'react', 'django', 'aws', 'docker',
-                         'kubernetes', 'sql', 'mongodb', 'git', 'ci/cd', 'agile', 'scrum']
-        
-        found_skills = []
-        text_lower = text.lower()
-        for skill in skill_keywords:
-            if skill in text_lower:
-                found_skills.append(skill)
-        
-        return found_skills
+        return extract_skills_from_text(text)
+    
+    def _skill_present(self, requirement: Dict[str, Any], cv_skills: set) -> bool:
+        """Check a job profile skill against the CV skills (written forms and canonical ids)"""
+        if requirement['id'] in cv_skills:
+            return True
+        return any(
+            self._skills_match(requirement['text'], cv_skill)
+            or any(self._mentions(cv_skill, alias) for alias in requirement['aliases'])
+            for cv_skill in cv_skills
+        )
+    
+    def _mentions(self, text: str, term: str) -> bool:
+        """Whether term appears in text as a whole word (so 'py' is not found in 'numpy')"""
+        return re.search(rf'(?<!\w){re.escape(term)}(?!\w)', text) is not None
     
     def _skills_match(self, required: str, candidate: str) -> bool:
         """Check if two skills match (fuzzy matching)"""
@@ -477,105 +476,44 @@ class CVJobAnalyzer:
             return True
         
         # Common variations
-        variations = {
-            'javascript': ['js', 'node.js', 'nodejs'],
-            'python': ['py'],
-            'kubernetes': ['k8s'],
-            'amazon web services': ['aws'],
-            'google cloud platform': ['gcp'],
-            'continuous integration': ['ci', 'ci/cd']
-        }
-        
-        for key, vals in variations.items():
+        for key, vals in SKILL_VARIATIONS.items():
             if required_lower in [key] + vals and candidate_lower in [key] + vals:
                 return True
         
         return False
     
     def _calculate_total_experience(self, cv: StructuredCV) -> int:
-        """Calculate total years of experience"""
-        total_months = 0
-        
-        for exp in cv.experiences:
-            if exp.start_date:
-                try:
-                    start = datetime.strptime(exp.start_date, '%Y-%m')
-                    if exp.end_date and exp.end_date.lower() != 'present':
-                        end = datetime.strptime(exp.end_date, '%Y-%m')
-                    else:
-                        end = datetime.now()
-                    
-                    months = (end.year - start.year) * 12 + end.month - start.month
-                    total_months += max(0, months)
-                except:
-                    # If date parsing fails, estimate 2 years per position
-                    total_months += 24
-        
-        return total_months // 12
+        """Calculate total years of experience (overlapping roles merged)"""
+        return build_timeline(cv.experiences)['total_months'] // 12
     
     def _extract_required_years(self, job: StructuredJobDescription) -> int:
         """Extract required years of experience from job description"""
-        # Look in experience level
-        if job.experience_level:
-            level_map = {
-                'entry': 0, 'junior': 1, 'mid': 3,
-                'senior': 5, 'lead': 7, 'principal': 10
-            }
-            for key, years in level_map.items():
-                if key in job.experience_level.lower():
-                    return years
-        
-        # Look in requirements
-        for req_group in job.requirements:
-            for req in req_group.requirements:
-                match = re.search(r'(\d+)\+?\s*years?', req.lower())
-                if match:
-                    return int(match.group(1))
-        
-        return 0
+        return extract_required_years(job)
     
-    def _education_meets_requirement(self, education, requirement: str) -> bool:
-        """Check if education meets requirement"""
-        req_lower = requirement.lower()
-        edu_text = f"{education.degree} {education.field_of_study or ''}".lower()
-        
-        # Check for degree level
-        degree_levels = ['bachelor', 'master', 'phd', 'doctorate']
-        for level in degree_levels:
-            if level in req_lower and level in edu_text:
-                return True
+    def _education_meets_requirement(self, education, requirement: Dict[str, Any]) -> bool:
+        """Check if education meets a job profile education requirement"""
+        # Check for degree level - a higher degree satisfies a lower threshold
+        required_level = requirement['degree_level']
+        if required_level and degree_level(f"{education.degree} {education.field_of_study or ''}") >= required_level:
+            return True
         
         # Check for field match
         if education.field_of_study:
             field_lower = education.field_of_study.lower()
-            if any(field in req_lower for field in field_lower.split()):
+            if any(field in requirement['text'] for field in field_lower.split()):
                 return True
         
         return False
     
-    def _certification_matches(self, cert_name: str, requirement: str) -> bool:
-        """Check if certification matches requirement"""
+    def _certification_matches(self, cert_name: str, requirement: Dict[str, Any]) -> bool:
+        """Check if certification matches a job profile certification requirement"""
         cert_lower = cert_name.lower()
-        req_lower = requirement.lower()
+        aliases = requirement['aliases']
         
-        # Direct match
-        if req_lower in cert_lower or cert_lower in req_lower:
+        # Direct match (aliases[0] is the requirement itself) or a known abbreviation
+        if cert_lower in aliases[0]:
             return True
-        
-        # Common certification abbreviations
-        cert_map = {
-            'aws certified': ['aws', 'amazon web services'],
-            'azure': ['az-', 'microsoft azure'],
-            'google cloud': ['gcp', 'google certified'],
-            'cisco': ['ccna', 'ccnp', 'ccie'],
-            'comptia': ['a+', 'network+', 'security+']
-        }
-        
-        for key, values in cert_map.items():
-            if any(v in req_lower for v in [key] + values) and any(v in cert_lower for v in [key] + values):
-                return True
-        
-        return False
+        return any(alias in cert_lower for alias in aliases)
     
     def _find_skill_evidence(self, skill: str, cv: StructuredCV) -> List[str]:
         """Find evidence of skill in CV"""
@@ -622,7 +560,7 @@ class CVJobAnalyzer:
         
         return best_match
     
-    def _find_education_match(self, requirement: str, cv: StructuredCV) -> Dict[str, Any]:
+    def _find_education_match(self, requirement: Dict[str, Any], cv: StructuredCV) -> Dict[str, Any]:
         """Find matching education for a requirement"""
         for edu in cv.education:
             if self._education_meets_requirement(edu, requirement):
@@ -657,7 +595,9 @@ def get_cv_analyzer() -> CVJobAnalyzer:
     return _analyzer_instance
 
 # Convenience function
-async def analyze_cv_job_match(structured_cv: StructuredCV, structured_job: StructuredJobDescription, detailed: bool = True) -> AnalysisResponse:
+async def analyze_cv_job_match(structured_cv: StructuredCV, structured_job: StructuredJobDescription, detailed: bool = True,
+                               cv_features: Optional[Dict[str, Any]] = None,
+                               job_profile: Optional[Dict[str, Any]] = None) -> AnalysisResponse:
     """
     Analyze CV against job description
     
@@ -665,12 +605,14 @@ async def analyze_cv_job_match(structured_cv: StructuredCV, structured_job: Stru
         structured_cv: Parsed CV data
         structured_job: Parsed job description data
         detailed: Include detailed analysis
+        cv_features: Precomputed CV features
+        job_profile: Precomputed job requirement profile
         
     Returns:
         AnalysisResponse with complete analysis
     """
     analyzer = get_cv_analyzer()
-    return await analyzer.analyze_cv_for_job(structured_cv, structured_job, detailed)
+    return await analyzer.analyze_cv_for_job(structured_cv, structured_job, detailed, cv_features, job_profile)
 
 # Convenience function for analyzing CV by ID
 async def analyze_cv_job_match_by_id(cv_id: int, structured_job: StructuredJobDescription, detailed: bool = True) -> AnalysisResponse:
@@ -686,7 +628,8 @@ async def analyze_cv_job_match_by_id(cv_id: int, structured_job: StructuredJobDe
         AnalysisResponse with complete analysis
     """
     # Get structured CV from stored data without re-parsing
-    structured_cv = cv_processor.get_structured_cv(cv_id)
+    structured_cv = await asyncio.to_thread(get_cv_processor().get_structured_cv, cv_id)
+    cv_features = await get_cv_processor().get_cv_features_async(cv_id, structured_cv)
     
     analyzer = get_cv_analyzer()
-    return await analyzer.analyze_cv_for_job(structured_cv, structured_job, detailed)
\ No newline at end of file
+    return await analyzer.analyze_cv_for_job(structured_cv, structured_job, detailed, cv_features)
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Content-addressed storage for uploaded files
+
+Each distinct file is stored once, named by its SHA-256 hex digest, under two
+levels of shard directories (ab/cd/abcd...). Directory sizes stay small however
+many files are stored, and identical uploads share one blob. Blobs are
+referenced by FileUpload.content_sha256; the reference count is the number of
+such rows.
+"""
+
+from pathlib import Path
+from typing import Iterator, Tuple
+import logging
+import os
+import re
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_SHA256_HEX = re.compile(r'[0-9a-f]{64}')
+
+class BlobStore:
+    """Blobs named by SHA-256 under two-level shard directories"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.tmp = self.root / "tmp"
+        self.tmp.mkdir(parents=True, exist_ok=True)
+
+    def path(self, sha256: str) -> Path:
+        """Location of a blob (whether or not it exists)"""
+        if not _SHA256_HEX.fullmatch(sha256 or ''):
+            raise ValueError(f"Not a SHA-256 hex digest: {sha256!r}")
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def exists(self, sha256: str) -> bool:
+        return self.path(sha256).exists()
+
+    def temp_path(self) -> Path:
+        """Unique path for a file being written, on the store's file system (for put_file)"""
+        return self.tmp / f"{uuid.uuid4().hex}.part"
+
+    def iter_blobs(self) -> Iterator[Tuple[str, os.DirEntry]]:
+        """Stored blobs as (sha256, directory entry), one shard directory at a time"""
+        for shard in _subdirectories(self.root):
+            if shard.name == self.tmp.name:
+                continue
+            for subshard in _subdirectories(shard.path):
+                with os.scandir(subshard.path) as entries:
+                    for entry in entries:
+                        if entry.is_file() and _SHA256_HEX.fullmatch(entry.name):
+                            yield entry.name, entry
+
+    def iter_partials(self) -> Iterator[os.DirEntry]:
+        """Staging files of writes in progress or interrupted"""
+        with os.scandir(self.tmp) as entries:
+            yield from (entry for entry in entries if entry.is_file())
+
+    def put(self, content: bytes, sha256: str) -> Path:
+        """Store content under its digest, unless that content is already stored"""
+        path = self.path(sha256)
+        if path.exists():
+            os.utime(path)
+            return path
+
+        partial_path = self.temp_path()
+        try:
+            with open(partial_path, "wb") as buffer:
+                buffer.write(content)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        return self.put_file(partial_path, sha256)
+
+    def put_file(self, source: Path, sha256: str) -> Path:
+        """Move a complete file into the store; it is dropped if the content is already stored"""
+        path = self.path(sha256)
+        if path.exists():
+            Path(source).unlink(missing_ok=True)
+            os.utime(path)  # Restarts the grace period of delete()
+            return path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, path)
+        return path
+
+    def delete(self, sha256: str, min_age_seconds: float = 0) -> bool:
+        """
+        Remove a blob the caller knows is unreferenced
+
+        Blobs stored or re-stored within min_age_seconds are kept: an upload in
+        flight may have found the blob already present and not yet recorded its
+        reference.
+        """
+        path = self.path(sha256)
+        try:
+            if min_age_seconds and time.time() - path.stat().st_mtime < min_age_seconds:
+                return False
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        logger.info(f"Blob deleted: {sha256}")
+        return True
+
+
+def _subdirectories(path) -> Iterator[os.DirEntry]:
+    with os.scandir(path) as entries:
+        yield from (entry for entry in entries if entry.is_dir())
@@ -0,0 +1,210 @@
+"""
+Bulk import of job descriptions and pre-parsed CVs from NDJSON
+
+Records are validated and inserted in chunks, one transaction per chunk, with
+executemany inserts instead of one repository call per record. Full-text
+indexing happens once, when the import finishes. The import state records how
+many input lines are committed, so an interrupted import resumes after the
+last committed chunk.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Iterable, AsyncIterator, Callable
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import func, select
+
+from app.config import config
+from app.models.database import JobDescription, CVRecord
+from app.models.schemas import StructuredCV, StructuredJobDescription
+from app.repositories.base_repository import get_engine, unit_of_work
+from app.repositories.cv_repository import CVRepository, FileUploadRepository, CVFeaturesRepository
+from app.repositories.dedup_repository import DedupRepository
+from app.repositories.job_description_repository import JobDescriptionRepository
+from app.repositories.search_index import index_new_rows
+from app.services.cv_features import build_cv_features
+from app.services.dedup import get_min_hasher, parsed_cv_text
+from app.services.job_description_service import normalize_job_data
+from app.services.job_profile import build_job_profile
+
+logger = logging.getLogger(__name__)
+
+IMPORT_KINDS = ('jobs', 'cvs')
+MAX_REPORTED_ERRORS = 100
+
+class BulkImportService:
+    """Chunked NDJSON ingestion of jobs and pre-parsed CVs"""
+
+    def __init__(self):
+        self.job_repository = JobDescriptionRepository()
+        self.cv_repository = CVRepository()
+        self.file_repository = FileUploadRepository()
+        self.feature_repository = CVFeaturesRepository()
+        self.dedup_repository = DedupRepository()
+
+    def start_import(self, kind: str) -> Dict[str, Any]:
+        """New import state; rows above index_from_id get indexed when the import finishes"""
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Unknown import kind '{kind}', expected one of {', '.join(IMPORT_KINDS)}")
+        model = JobDescription if kind == 'jobs' else CVRecord
+        with get_engine().connect() as conn:
+            index_from_id = conn.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+        return {
+            "kind": kind,
+            "index_from_id": index_from_id,
+            "lines_done": 0,
+            "imported": 0,
+            "invalid": 0,
+            "errors": [],
+            "started_at": datetime.utcnow().isoformat()
+        }
+
+    def import_batch(self, state: Dict[str, Any], batch: List[Tuple[int, str]]) -> Dict[str, Any]:
+        """Validate and insert one chunk of (line number, line) in a single transaction"""
+        if not batch:
+            return progress(state)
+
+        prepare = self._prepare_job if state["kind"] == 'jobs' else self._prepare_cv
+        valid = []
+        for line_number, line in batch:
+            try:
+                valid.append(prepare(json.loads(line), line_number))
+            except (ValueError, TypeError, ValidationError) as e:
+                state["invalid"] += 1
+                if len(state["errors"]) < MAX_REPORTED_ERRORS:
+                    state["errors"].append({"line": line_number, "error": str(e).splitlines()[0]})
+
+        with unit_of_work():
+            if state["kind"] == 'jobs':
+                self.job_repository.bulk_insert(valid)
+            else:
+                self._insert_cvs(valid)
+
+        state["imported"] += len(valid)
+        state["lines_done"] = batch[-1][0]
+        return progress(state)
+
+    def finish_import(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the derived indexes of everything the import inserted"""
+        indexed = index_new_rows(get_engine(), state["kind"], state["index_from_id"])
+        state["indexed"] = indexed
+        state["finished_at"] = datetime.utcnow().isoformat()
+        logger.info(f"Imported {state['imported']} {state['kind']} ({state['invalid']} invalid), indexed {indexed}")
+        return progress(state, done=True)
+
+    def import_lines(self, kind: str, lines: Iterable[str], batch_size: int = 500,
+                     state: Optional[Dict[str, Any]] = None,
+                     on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Import NDJSON lines, resuming after state['lines_done'] when a state is given
+
+        on_progress is called with the state after every committed chunk, which is
+        the point to persist it for resuming.
+        """
+        state = state or self.start_import(kind)
+        for batch in iter_batches(lines, batch_size, skip=state["lines_done"]):
+            report = self.import_batch(state, batch)
+            if on_progress:
+                on_progress(report)
+        return self.finish_import(state)
+
+    async def import_stream(self, kind: str, lines: Iterable[str], batch_size: int = 500, skip: int = 0,
+                            index_from_id: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Import NDJSON lines off the event loop, yielding progress after every committed chunk
+
+        A resumed import passes the index_from_id of its first run, so the rows that
+        run committed are indexed too.
+        """
+        state = await run_in_threadpool(self.start_import, kind)
+        state["lines_done"] = skip
+        if index_from_id is not None:
+            state["index_from_id"] = index_from_id
+        batches = iter_batches(lines, batch_size, skip=skip)
+        while (batch := await run_in_threadpool(next, batches, None)) is not None:
+            yield await run_in_threadpool(self.import_batch, state, batch)
+        yield await run_in_threadpool(self.finish_import, state)
+
+    def _prepare_job(self, record: Dict[str, Any], line_number: int) -> Dict[str, Any]:
+        """Row of a job record (same validation as POST /api/jobs)"""
+        if not isinstance(record, dict):
+            raise ValueError("Expected a JSON object")
+        structured_job = StructuredJobDescription(**normalize_job_data(record))
+        job_data = structured_job.dict()
+        job_data.update({key: record[key] for key in ("industry", "department") if key in record})
+        return {
+            "job_title": structured_job.job_title,
+            "company": structured_job.company or "Unknown",
+            "job_data": job_data,
+            "job_profile": build_job_profile(structured_job),
+            "is_active": True
+        }
+
+    def _prepare_cv(self, record: Dict[str, Any], line_number: int) -> Dict[str, Any]:
+        """Upload, CV, feature and signature data of a parsed CV record"""
+        if not isinstance(record, dict):
+            raise ValueError("Expected a JSON object")
+        parsed = record.get("parsed_data", record)
+        structured_cv = StructuredCV(**parsed)
+        parsed_data = structured_cv.dict()
+        filename = record.get("filename") or f"import-line-{line_number}.json"
+        signature = get_min_hasher().signature(parsed_cv_text(parsed_data)) if config.DEDUP_ENABLED else None
+        return {
+            "upload": {"filename": filename, "original_filename": filename, "file_type": "cv"},
+            "cv": {
+                "parsed_data": parsed_data,
+                "contact_name": structured_cv.contact_info.name,
+                "contact_email": structured_cv.contact_info.email
+            },
+            "features": build_cv_features(structured_cv),
+            "signature": signature
+        }
+
+    def _insert_cvs(self, items: List[Dict[str, Any]]) -> None:
+        """Insert prepared CVs and their derived rows with executemany"""
+        upload_ids = self.file_repository.bulk_insert([item["upload"] for item in items])
+        cv_ids = self.cv_repository.bulk_insert([
+            {**item["cv"], "file_upload_id": upload_id} for item, upload_id in zip(items, upload_ids)
+        ])
+        self.feature_repository.bulk_insert_features([
+            (cv_id, item["features"]) for item, cv_id in zip(items, cv_ids)
+        ])
+        hasher = get_min_hasher()
+        self.dedup_repository.bulk_save_signatures([
+            (cv_id, item["signature"], "parsed", hasher.band_hashes(item["signature"], "parsed"))
+            for item, cv_id in zip(items, cv_ids) if item["signature"] is not None
+        ])
+
+def progress(state: Dict[str, Any], done: bool = False) -> Dict[str, Any]:
+    """Progress report of an import (the state without its bookkeeping fields)"""
+    report = {key: state[key] for key in ("kind", "index_from_id", "lines_done", "imported", "invalid")}
+    report["done"] = done
+    if done:
+        report.update({"indexed": state.get("indexed", 0), "errors": state["errors"]})
+    return report
+
+def iter_batches(lines: Iterable[str], batch_size: int, skip: int = 0) -> Iterable[List[Tuple[int, str]]]:
+    """Chunks of (line number, line), skipping blank lines and the first `skip` lines"""
+    batch = []
+    for line_number, line in enumerate(lines, 1):
+        if line_number <= skip or not line.strip():
+            continue
+        batch.append((line_number, line))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# Singleton instance, created on first use
+_bulk_import_service: Optional[BulkImportService] = None
+
+def get_bulk_import_service() -> BulkImportService:
+    """Get or create the singleton bulk import service"""
+    global _bulk_import_service
+    if _bulk_import_service is None:
+        _bulk_import_service = BulkImportService()
+    return _bulk_import_service
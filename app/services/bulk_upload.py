@@ -0,0 +1,165 @@
+"""
+Bulk CV upload: many files, or a ZIP of them, in one request
+
+Two stages joined by a bounded queue: files (and ZIP entries) are streamed into
+the blob store one after another, while up to LLM_PARSE_CONCURRENCY workers read
+them back and run the single-upload pipeline (sign, parse, store). The queue
+holds at most one file per worker, so a large batch is never all in memory and
+the parse stage is never starved by the copy. The Gemini calls themselves take
+the parser's process-wide llm_slot, so several bulk uploads, or long CVs split
+into page ranges, stay within the same limit. Each file gets its own progress
+result; a file that fails does not stop the others.
+"""
+
+import asyncio
+import logging
+import posixpath
+import time
+import zipfile
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import config
+from app.services.cv_processor import CVProcessor, get_cv_processor
+
+logger = logging.getLogger(__name__)
+
+def _is_zip(file: UploadFile) -> bool:
+    return (file.filename or "").lower().endswith(".zip")
+
+def _zip_members(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    """Files of an archive, without directories and OS metadata (__MACOSX, dotfiles)"""
+    return [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and not posixpath.basename(info.filename).startswith(".")
+    ]
+
+def _error_message(error: Exception) -> str:
+    return error.detail if isinstance(error, HTTPException) else str(error)
+
+class BulkUploadService:
+    """Pipelined upload and parsing of a batch of CV files"""
+
+    def __init__(self, cv_processor: Optional[CVProcessor] = None):
+        self.cv_processor = cv_processor or get_cv_processor()
+        self.file_handler = self.cv_processor.file_handler
+
+    async def upload_stream(self, files: List[UploadFile],
+                            link_duplicates: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Process a batch, yielding one result per file as it completes and a summary last"""
+        start = time.perf_counter()
+        workers = max(1, config.LLM_PARSE_CONCURRENCY)
+        stored: asyncio.Queue = asyncio.Queue(maxsize=workers)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def ingest():
+            try:
+                async for index, name, upload, error in self._entries(files):
+                    if error:
+                        await results.put(self._failed(index, name, error))
+                        continue
+                    try:
+                        filename, content_sha256, _ = await self.file_handler.save_uploaded_file(upload)
+                    except Exception as e:
+                        await results.put(self._failed(index, name, _error_message(e)))
+                        continue
+                    finally:
+                        await upload.close()
+                    await stored.put((index, name, filename, content_sha256))
+            except Exception as e:
+                logger.error(f"Bulk upload stopped reading files: {e}")
+                await results.put(self._failed(None, None, f"Could not read the remaining files: {e}"))
+            finally:
+                for _ in range(workers):
+                    await stored.put(None)
+
+        async def parse():
+            while (item := await stored.get()) is not None:
+                await results.put(await self._process(*item, link_duplicates=link_duplicates))
+            await results.put(None)
+
+        tasks = [asyncio.create_task(ingest())] + [asyncio.create_task(parse()) for _ in range(workers)]
+        counts = {"parsed": 0, "linked": 0, "failed": 0}
+        try:
+            running = workers
+            while running:
+                result = await results.get()
+                if result is None:
+                    running -= 1
+                    continue
+                counts[result["status"]] += 1
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        yield {"done": True, "files": sum(counts.values()), **counts,
+               "seconds": round(time.perf_counter() - start, 3)}
+
+    async def _entries(self, files: List[UploadFile]) -> AsyncIterator[Tuple[int, str, Optional[UploadFile], Optional[str]]]:
+        """(index, original filename, upload, error) of every CV in the batch, ZIP archives expanded"""
+        index = 0
+        for file in files:
+            if not _is_zip(file):
+                if index >= config.BULK_UPLOAD_MAX_FILES:
+                    yield index, file.filename, None, f"Batch limit of {config.BULK_UPLOAD_MAX_FILES} files reached"
+                    return
+                yield index, file.filename, file, None
+                index += 1
+                continue
+
+            try:
+                archive = await run_in_threadpool(zipfile.ZipFile, file.file)
+            except zipfile.BadZipFile:
+                yield index, file.filename, None, "Not a valid ZIP archive"
+                index += 1
+                continue
+            with archive:
+                for info in _zip_members(archive):
+                    name = posixpath.basename(info.filename)
+                    if index >= config.BULK_UPLOAD_MAX_FILES:
+                        yield index, name, None, f"Batch limit of {config.BULK_UPLOAD_MAX_FILES} files reached"
+                        return
+                    # The declared size is checked before reading, and the read itself stops at the limit
+                    entry = await run_in_threadpool(archive.open, info)
+                    yield index, name, UploadFile(entry, filename=name, size=info.file_size), None
+                    index += 1
+
+    async def _process(self, index: int, name: str, filename: str, content_sha256: str,
+                       link_duplicates: bool) -> Dict[str, Any]:
+        """Parse and store one file already in the blob store"""
+        try:
+            content = await asyncio.to_thread(self.file_handler.get_file_path(content_sha256).read_bytes)
+            cv = await self.cv_processor.process_cv_content(
+                filename, name, content, content_sha256, link_duplicates=link_duplicates
+            )
+        except Exception as e:
+            logger.warning(f"Bulk upload of {name} failed: {e}")
+            return self._failed(index, name, _error_message(e))
+        return {
+            "index": index,
+            "filename": name,
+            "status": "linked" if cv.get("linked_to_existing") else "parsed",
+            "cv_id": cv["id"],
+            "upload_id": cv["upload_id"],
+            "near_duplicate": cv["near_duplicate"]
+        }
+
+    @staticmethod
+    def _failed(index: Optional[int], name: Optional[str], error: str) -> Dict[str, Any]:
+        return {"index": index, "filename": name, "status": "failed", "error": error}
+
+# Singleton instance, created on first use
+_bulk_upload_service: Optional[BulkUploadService] = None
+
+def get_bulk_upload_service() -> BulkUploadService:
+    """Get or create the singleton bulk upload service"""
+    global _bulk_upload_service
+    if _bulk_upload_service is None:
+        _bulk_upload_service = BulkUploadService()
+    return _bulk_upload_service
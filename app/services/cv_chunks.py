@@ -0,0 +1,121 @@
+"""
+Page-range splitting of long CVs and merging of the partial parse results
+
+Long PDFs are parsed as several page ranges at once; each range yields a
+partial CV JSON in the parser's schema. merge_parsed_chunks combines them in
+page order, so the result does not depend on which chunk finished first.
+Entries cut by a page boundary show up in two chunks and are merged: scalar
+fields keep the first value found, list fields are unioned.
+"""
+
+import io
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.cv_features import normalize_skill
+from app.services.timeline import normalize_date
+
+# Keys that identify the same entry across chunks (dates may be missing from a continuation)
+_ENTRY_KEYS = {
+    'experiences': ('company', 'position'),
+    'education': ('institution', 'degree'),
+    'projects': ('name',),
+    'certifications': ('name',),
+}
+_ENTRY_DATE = {'experiences': 'start_date', 'education': 'start_date', 'certifications': 'date'}
+_STRING_LISTS = ('languages', 'achievements', 'publications')
+
+def pdf_page_count(content: bytes) -> int:
+    """Pages of a PDF (0 when it cannot be read)"""
+    from PyPDF2 import PdfReader
+    try:
+        return len(PdfReader(io.BytesIO(content)).pages)
+    except Exception:
+        return 0
+
+def page_ranges(page_count: int, pages_per_chunk: int) -> List[Tuple[int, int]]:
+    """[start, end) page ranges covering the document"""
+    return [(start, min(start + pages_per_chunk, page_count)) for start in range(0, page_count, pages_per_chunk)]
+
+def split_pdf(content: bytes, ranges: List[Tuple[int, int]]) -> List[bytes]:
+    """One PDF per page range"""
+    from PyPDF2 import PdfReader, PdfWriter
+
+    reader = PdfReader(io.BytesIO(content))
+    chunks = []
+    for start, end in ranges:
+        writer = PdfWriter()
+        for page in reader.pages[start:end]:
+            writer.add_page(page)
+        output = io.BytesIO()
+        writer.write(output)
+        chunks.append(output.getvalue())
+    return chunks
+
+def _text_key(value: Any) -> str:
+    return re.sub(r'\s+', ' ', str(value).casefold().strip())
+
+def _union(target: List[Any], values: Optional[List[Any]], key: Callable[[Any], str] = _text_key) -> None:
+    """Append the values not already in target (by key), keeping first-seen order"""
+    seen = {key(value) for value in target}
+    for value in values or []:
+        value_key = key(value)
+        if value_key and value_key not in seen:
+            seen.add(value_key)
+            target.append(value)
+
+def _same_entry(entry: Dict[str, Any], other: Dict[str, Any], section: str) -> bool:
+    if any(_text_key(entry.get(key) or '') != _text_key(other.get(key) or '') for key in _ENTRY_KEYS[section]):
+        return False
+    date_key = _ENTRY_DATE.get(section)
+    if not date_key or not entry.get(date_key) or not other.get(date_key):
+        return True
+    return normalize_date(entry[date_key]) == normalize_date(other[date_key])
+
+def _merge_entry(entry: Dict[str, Any], other: Dict[str, Any]) -> None:
+    for key, value in other.items():
+        if isinstance(value, list):
+            entry[key] = entry.get(key) or []
+            _union(entry[key], value)
+        elif entry.get(key) in (None, '') and value not in (None, ''):
+            entry[key] = value
+
+def merge_parsed_chunks(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine partial parse results (in page order) into one CV JSON, deduplicating entries and skills"""
+    merged: Dict[str, Any] = {
+        'contact_info': {}, 'summary': None, 'skills': [], 'technical_skills': {},
+        **{section: [] for section in _ENTRY_KEYS}, **{key: [] for key in _STRING_LISTS}
+    }
+    category_names: Dict[str, str] = {}
+
+    for chunk in chunks:
+        if not isinstance(chunk, dict):
+            continue
+        for field, value in (chunk.get('contact_info') or {}).items():
+            if merged['contact_info'].get(field) in (None, '') and value not in (None, ''):
+                merged['contact_info'][field] = value
+        if not merged['summary'] and chunk.get('summary'):
+            merged['summary'] = chunk['summary']
+
+        _union(merged['skills'], [skill for skill in chunk.get('skills') or [] if isinstance(skill, str)],
+               key=normalize_skill)
+        for category, skills in (chunk.get('technical_skills') or {}).items():
+            name = category_names.setdefault(_text_key(category), category)
+            merged['technical_skills'].setdefault(name, [])
+            _union(merged['technical_skills'][name], [skill for skill in skills or [] if isinstance(skill, str)],
+                   key=normalize_skill)
+
+        for section in _ENTRY_KEYS:
+            for entry in chunk.get(section) or []:
+                if not isinstance(entry, dict):
+                    continue
+                match = next((existing for existing in merged[section] if _same_entry(existing, entry, section)), None)
+                if match is None:
+                    merged[section].append(dict(entry))
+                else:
+                    _merge_entry(match, entry)
+
+        for key in _STRING_LISTS:
+            _union(merged[key], chunk.get(key))
+
+    return merged
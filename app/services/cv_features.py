@@ -0,0 +1,120 @@
+import re
+import zlib
+import logging
+from typing import Dict, Any, List, Iterable, Optional, Set
+
+from app.models.schemas import StructuredCV
+from app.services.timeline import build_timeline
+
+logger = logging.getLogger(__name__)
+
+# Skill keywords picked up from free text (responsibilities, achievements)
+SKILL_KEYWORDS = ['python', 'java', 'javascript', 'react', 'django', 'aws', 'docker',
+                  'kubernetes', 'sql', 'mongodb', 'git', 'ci/cd', 'agile', 'scrum']
+
+# Common skill variations - every member of a group resolves to the group key
+SKILL_VARIATIONS = {
+    'javascript': ['js', 'node.js', 'nodejs'],
+    'python': ['py'],
+    'kubernetes': ['k8s'],
+    'amazon web services': ['aws'],
+    'google cloud platform': ['gcp'],
+    'continuous integration': ['ci', 'ci/cd']
+}
+
+_SKILL_ALIASES = {alias: key for key, aliases in SKILL_VARIATIONS.items() for alias in aliases}
+
+# Degree levels, highest first; the first pattern found in a degree wins
+DEGREE_LEVELS = [
+    (5, r'\b(phd|ph\.d|doctorate|doctor of)\b'),
+    (4, r'\b(master|masters|msc|m\.sc|mba|meng|m\.eng)\b'),
+    (3, r'\b(bachelor|bachelors|bsc|b\.sc|bcom|b\.com|beng|b\.eng|honours|honors)\b'),
+    (2, r'\b(associate|advanced diploma|higher certificate)\b'),
+    (1, r'\b(diploma|certificate|matric)\b'),
+]
+
+# SQLite integers are signed 64-bit, keep the bitmap to 63 bits
+SKILL_BITMAP_BITS = 63
+
+# Bump when derived features change so stored rows get recomputed
+FEATURES_VERSION = 3
+
+def skill_text(skill: str) -> str:
+    """A skill as written, lowercased with whitespace collapsed"""
+    return re.sub(r'\s+', ' ', skill.lower().strip())
+
+def normalize_skill(skill: str) -> str:
+    """Normalize a skill to its canonical lowercase form"""
+    text = skill_text(skill)
+    return _SKILL_ALIASES.get(text, text)
+
+def skill_group(skill: str) -> List[str]:
+    """Every name in the variation group of a skill (empty when it has none)"""
+    key = normalize_skill(skill)
+    return [key] + SKILL_VARIATIONS[key] if key in SKILL_VARIATIONS else []
+
+def skill_terms(skill: str) -> Set[str]:
+    """The written form of a skill and its canonical id"""
+    return {skill_text(skill), normalize_skill(skill)}
+
+def extract_skills_from_text(text: str) -> List[str]:
+    """Extract potential skills from text"""
+    text_lower = text.lower()
+    return [skill for skill in SKILL_KEYWORDS if skill in text_lower]
+
+def skill_bit(skill: str) -> int:
+    """Bit assigned to a normalized skill (stable across processes)"""
+    return 1 << (zlib.crc32(skill.encode('utf-8')) % SKILL_BITMAP_BITS)
+
+def skill_bitmap(skills: Iterable[str]) -> int:
+    """Fold normalized skills into a bitmap usable for SQL prefiltering"""
+    bitmap = 0
+    for skill in skills:
+        bitmap |= skill_bit(skill)
+    return bitmap
+
+def degree_level(text: Optional[str]) -> int:
+    """Map a degree description to a numeric level (0 when unknown)"""
+    if not text:
+        return 0
+    text_lower = text.lower()
+    for level, pattern in DEGREE_LEVELS:
+        if re.search(pattern, text_lower):
+            return level
+    return 0
+
+def collect_cv_skills(cv: StructuredCV) -> Set[str]:
+    """Union of all skills listed or mentioned anywhere in the CV, as written and as canonical ids"""
+    cv_skills = set(cv.skills)
+    for category, skills in cv.technical_skills.items():
+        cv_skills.update(skills)
+
+    for exp in cv.experiences:
+        text = ' '.join(exp.responsibilities + exp.achievements)
+        cv_skills.update(extract_skills_from_text(text))
+
+    for proj in cv.projects:
+        cv_skills.update(proj.technologies)
+
+    terms = set()
+    for skill in cv_skills:
+        if skill and skill.strip():
+            terms.update(skill_terms(skill))
+    return terms
+
+def build_cv_features(cv: StructuredCV) -> Dict[str, Any]:
+    """Derive the compact feature record stored alongside a parsed CV"""
+    skills = sorted(collect_cv_skills(cv))
+    timeline = build_timeline(cv.experiences)
+    return {
+        'version': FEATURES_VERSION,
+        'skills': skills,
+        'skill_bitmap': skill_bitmap(skills),
+        'total_experience_months': timeline['total_months'],
+        'role_durations': timeline['roles'],
+        'highest_degree_level': max(
+            (degree_level(f"{edu.degree} {edu.field_of_study or ''}") for edu in cv.education),
+            default=0
+        ),
+        'certifications': [cert.name for cert in cv.certifications]
+    }
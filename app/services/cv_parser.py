@@ -1,14 +1,18 @@
-import google.genai as genai
 import os
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 from pathlib import Path
 import asyncio
-from datetime import datetime
 import re
+import time
+from contextlib import asynccontextmanager
 
 from app.models.schemas import StructuredCV, ContactInfo, Education, Experience, Project, Certification
+from app.services.timeline import normalize_date
+from app.config import config
+from app.services.cv_chunks import merge_parsed_chunks, page_ranges, pdf_page_count, split_pdf
+from app.services.payload import shrink_for_llm
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -17,6 +21,21 @@ class CVParsingError(Exception):
     """Custom exception for CV parsing errors"""
     pass
 
+# Gemini parse calls in flight, shared by every upload, bulk upload and page range in the process
+_llm_slots: Optional[asyncio.Semaphore] = None
+_llm_slots_loop = None
+
+@asynccontextmanager
+async def llm_slot():
+    """One of the LLM_PARSE_CONCURRENCY slots, held for the duration of one Gemini call"""
+    global _llm_slots, _llm_slots_loop
+    loop = asyncio.get_running_loop()
+    if _llm_slots_loop is not loop:
+        _llm_slots = asyncio.Semaphore(max(1, config.LLM_PARSE_CONCURRENCY))
+        _llm_slots_loop = loop
+    async with _llm_slots:
+        yield
+
 class GeminiCVParser:
     """Service for parsing CVs using Google Gemini Vision API"""
     
@@ -32,6 +51,8 @@ class GeminiCVParser:
                 raise ValueError("GEMINI_API_KEY not found in environment variables")
             
             # Configure the client
+            # Imported here: the SDK is slow to import and only needed once a CV is processed
+            import google.genai as genai
             self.client = genai.Client(api_key=api_key)
             self.model = 'gemini-1.5-flash'  # Model name for the new API
             logger.info("Gemini API configured successfully")
@@ -58,9 +79,35 @@ class GeminiCVParser:
             logger.info(f"Reading CV file: {file_path}")
             with open(file_path, 'rb') as f:
                 file_content = f.read()
+        except Exception as e:
+            logger.error(f"Error parsing CV: {str(e)}")
+            raise CVParsingError(f"Failed to parse CV: {str(e)}")
+        
+        return await self.parse_cv_from_bytes(file_content, file_path)
+    
+    async def parse_cv_from_bytes(self, content: Union[bytes, memoryview],
+                                  filename: str) -> tuple[StructuredCV, Dict[str, Any]]:
+        """
+        Parse a CV document that is already in memory (no file access)
+        
+        Args:
+            content: Document bytes
+            filename: Name of the document, used for its MIME type
+            
+        Returns:
+            Tuple of (StructuredCV object, raw parsed JSON)
+        """
+        try:
+            # The Gemini client sends bytes; a memoryview is copied once here
+            file_content = content if isinstance(content, bytes) else bytes(content)
+            
+            # Strip images and fonts the model does not need (the stored file is unchanged)
+            file_content = await shrink_for_llm(file_content, filename)
             
-            # Parse CV with retry logic
-            raw_parsed_json = await self._parse_with_retry(file_content, file_path)
+            # Parse CV with retry logic, long PDFs as concurrent page ranges
+            raw_parsed_json = await self._parse_long_cv(file_content, filename)
+            if raw_parsed_json is None:
+                raw_parsed_json = await self._parse_with_retry(file_content, filename)
             
             # Validate and structure the result
             structured_cv = self._validate_and_structure(raw_parsed_json)
@@ -72,32 +119,73 @@ class GeminiCVParser:
             logger.error(f"Error parsing CV: {str(e)}")
             raise CVParsingError(f"Failed to parse CV: {str(e)}")
     
-    async def _parse_with_retry(self, file_content: bytes, file_path: str, max_retries: int = 3) -> Dict[str, Any]:
+    async def _parse_long_cv(self, file_content: bytes, filename: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a long PDF as page ranges concurrently and merge the results
+        
+        Returns None for documents below LONG_CV_PAGE_THRESHOLD pages, and when a
+        range fails, so the caller parses the whole document in one call instead.
+        """
+        if not config.LONG_CV_PAGE_THRESHOLD or Path(filename).suffix.lower() != '.pdf':
+            return None
+        page_count = await asyncio.to_thread(pdf_page_count, file_content)
+        if page_count < config.LONG_CV_PAGE_THRESHOLD:
+            return None
+        
+        ranges = page_ranges(page_count, config.LONG_CV_PAGES_PER_CHUNK)
+        chunks = await asyncio.to_thread(split_pdf, file_content, ranges)
+        
+        async def parse_range(chunk: bytes, start: int, end: int) -> Dict[str, Any]:
+            prompt = self._create_extraction_prompt() + (
+                f"\n        NOTE: This document is pages {start + 1}-{end} of a {page_count}-page CV. "
+                "Extract only what appears on these pages; sections may start or end mid-way."
+            )
+            # Concurrency is bounded by llm_slot around each Gemini call
+            return await self._parse_with_retry(chunk, filename, prompt=prompt)
+        
+        start_time = time.perf_counter()
+        try:
+            partials = await asyncio.gather(*(
+                parse_range(chunk, start, end) for chunk, (start, end) in zip(chunks, ranges)
+            ))
+        except Exception as e:
+            logger.warning(f"Page-range parse of {filename} failed, parsing it in one call: {e}")
+            return None
+        logger.info(f"Parsed {page_count}-page CV {filename} as {len(ranges)} page ranges "
+                    f"in {(time.perf_counter() - start_time) * 1000:.0f} ms")
+        return merge_parsed_chunks(partials)
+    
+    async def _parse_with_retry(self, file_content: bytes, file_path: str, max_retries: int = 3,
+                                prompt: Optional[str] = None) -> Dict[str, Any]:
         """Parse CV with retry logic for robustness"""
-        prompt = self._create_extraction_prompt()
+        prompt = prompt or self._create_extraction_prompt()
         
         for attempt in range(max_retries):
             try:
                 logger.info(f"Parsing attempt {attempt + 1}/{max_retries}")
                 
                 # Create the request with file content
-                response = await asyncio.to_thread(
-                    self.client.models.generate_content,
-                    model=self.model,
-                    contents=[
-                        {
-                            "parts": [
-                                {"text": prompt},
-                                {
-                                    "inline_data": {
-                                        "mime_type": self._get_mime_type(file_path),
-                                        "data": file_content
+                start = time.perf_counter()
+                async with llm_slot():
+                    response = await asyncio.to_thread(
+                        self.client.models.generate_content,
+                        model=self.model,
+                        contents=[
+                            {
+                                "parts": [
+                                    {"text": prompt},
+                                    {
+                                        "inline_data": {
+                                            "mime_type": self._get_mime_type(file_path),
+                                            "data": file_content
+                                        }
                                     }
-                                }
-                            ]
-                        }
-                    ]
-                )
+                                ]
+                            }
+                        ]
+                    )
+                logger.info(f"Gemini parse of {Path(file_path).name}: {len(file_content)} bytes sent, "
+                            f"{(time.perf_counter() - start) * 1000:.0f} ms")
                 
                 # Extract and clean JSON from response
                 json_str = self._extract_json_from_response(response.text)
@@ -223,23 +311,24 @@ class GeminiCVParser:
         """Extract raw text from CV for reference"""
         try:
             prompt = "Extract and return all text content from this document as plain text."
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model=self.model,
-                contents=[
-                    {
-                        "parts": [
-                            {"text": prompt},
-                            {
-                                "inline_data": {
-                                    "mime_type": self._get_mime_type(file_path),
-                                    "data": file_content
+            async with llm_slot():
+                response = await asyncio.to_thread(
+                    self.client.models.generate_content,
+                    model=self.model,
+                    contents=[
+                        {
+                            "parts": [
+                                {"text": prompt},
+                                {
+                                    "inline_data": {
+                                        "mime_type": self._get_mime_type(file_path),
+                                        "data": file_content
+                                    }
                                 }
-                            }
-                        ]
-                    }
-                ]
-            )
+                            ]
+                        }
+                    ]
+                )
             return response.text.strip()
         except Exception as e:
             logger.warning(f"Failed to extract raw text: {str(e)}")
@@ -324,49 +413,7 @@ class GeminiCVParser:
     
     def normalize_date(self, date_str: Optional[str]) -> Optional[str]:
         """Normalize date strings to YYYY-MM format"""
-        if not date_str:
-            return None
-        
-        # Common date patterns
-        patterns = [
-            (r'(\d{4})-(\d{1,2})', r'\1-\2'),  # YYYY-MM
-            (r'(\d{1,2})/(\d{4})', r'\2-\1'),  # MM/YYYY
-            (r'([A-Za-z]+)\s+(\d{4})', self._month_year_to_yyyy_mm),  # Month YYYY
-            (r'(\d{4})', r'\1-01'),  # Just year
-        ]
-        
-        for pattern, replacement in patterns:
-            match = re.match(pattern, date_str.strip())
-            if match:
-                if callable(replacement):
-                    return replacement(match)
-                else:
-                    return match.expand(replacement)
-        
-        return date_str  # Return as-is if no pattern matches
-    
-    def _month_year_to_yyyy_mm(self, match) -> str:
-        """Convert 'Month YYYY' to 'YYYY-MM'"""
-        months = {
-            'january': '01', 'jan': '01',
-            'february': '02', 'feb': '02',
-            'march': '03', 'mar': '03',
-            'april': '04', 'apr': '04',
-            'may': '05',
-            'june': '06', 'jun': '06',
-            'july': '07', 'jul': '07',
-            'august': '08', 'aug': '08',
-            'september': '09', 'sep': '09', 'sept': '09',
-            'october': '10', 'oct': '10',
-            'november': '11', 'nov': '11',
-            'december': '12', 'dec': '12'
-        }
-        
-        month_str = match.group(1).lower()
-        year = match.group(2)
-        
-        month_num = months.get(month_str, '01')
-        return f"{year}-{month_num}"
+        return normalize_date(date_str)
 
 # Singleton instance
 _parser_instance = None
@@ -390,4 +437,18 @@ async def parse_cv(file_path: str) -> tuple[StructuredCV, Dict[str, Any]]:
         Tuple of (StructuredCV object, raw parsed JSON)
     """
     parser = get_cv_parser()
-    return await parser.parse_cv_from_file(file_path)
\ No newline at end of file
+    return await parser.parse_cv_from_file(file_path)
+
+async def parse_cv_bytes(content: Union[bytes, memoryview], filename: str) -> tuple[StructuredCV, Dict[str, Any]]:
+    """
+    Parse an in-memory CV document and return structured data with raw JSON
+    
+    Args:
+        content: Document bytes
+        filename: Document name (its extension selects the MIME type)
+        
+    Returns:
+        Tuple of (StructuredCV object, raw parsed JSON)
+    """
+    parser = get_cv_parser()
+    return await parser.parse_cv_from_bytes(content, filename)
@@ -1,10 +1,18 @@
+import asyncio
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from fastapi import UploadFile, HTTPException
 
+from app.config import config
 from app.services.file_handler import FileHandler
-from app.services.cv_parser import parse_cv
-from app.repositories.cv_repository import CVRepository, FileUploadRepository
+from app.services.cv_parser import parse_cv_bytes
+from app.services.cv_features import build_cv_features
+from app.services.dedup import get_min_hasher, extract_cv_text, parsed_cv_text
+from app.repositories.cv_repository import CVRepository, AsyncCVRepository, FileUploadRepository, CVFeaturesRepository
+from app.repositories.dedup_repository import DedupRepository
+from app.repositories.analysis_repository import AnalysisRepository
+from app.repositories.base_repository import InvalidCursorError, next_cursor, unit_of_work
+from app.repositories.write_queue import run_write
 from app.models.schemas import StructuredCV
 
 logger = logging.getLogger(__name__)
@@ -15,69 +23,189 @@ class CVProcessor:
     def __init__(self):
         self.file_handler = FileHandler()
         self.cv_repository = CVRepository()
+        self.async_cv_repository = AsyncCVRepository()
         self.file_repository = FileUploadRepository()
+        self.feature_repository = CVFeaturesRepository()
+        self.dedup_repository = DedupRepository()
+        self.analysis_repository = AnalysisRepository()
     
-    async def process_cv_upload(self, file: UploadFile) -> Dict[str, Any]:
-        """Process a CV file upload - orchestrates the entire workflow"""
-        upload_record_id = None
-        cv_record_id = None
+    async def process_cv_upload(self, file: UploadFile, link_duplicates: bool = False) -> Dict[str, Any]:
+        """
+        Process a CV file upload - orchestrates the entire workflow
+        
+        The database writes happen in one unit of work after the parse, so a
+        failed parse or save leaves no partial upload behind.
+        
+        Args:
+            file: Uploaded CV file
+            link_duplicates: Reuse an existing near-duplicate CV (and its analyses)
+                instead of parsing the upload again
+        """
+        filename = None
+        persist = None
         
         try:
-            # Step 1: Save file
-            filename, _, file_size = await self.file_handler.save_uploaded_file(file)
-            logger.info(f"File saved: {filename}")
+            # Step 1: Read the upload once; the bytes are written to disk in the
+            # background while the same buffer is signed and parsed
+            filename, content, content_sha256 = await self.file_handler.read_uploaded_file(file)
+            persist = asyncio.create_task(asyncio.to_thread(self.file_handler.store_content, content, content_sha256))
+            return await self.process_cv_content(filename, file.filename, content, content_sha256,
+                                                 link_duplicates=link_duplicates, persist=persist)
+            
+        except Exception as e:
+            if persist is not None:
+                await asyncio.gather(persist, return_exceptions=True)
+            if filename:
+                logger.info(f"Upload {filename} failed, no records were stored")
             
-            # Step 2: Create upload record and get ID directly (session-safe)
+            logger.error(f"Error processing CV: {str(e)}")
+            if isinstance(e, HTTPException):
+                raise
+            raise HTTPException(status_code=500, detail=f"Error processing CV: {str(e)}")
+    
+    async def process_cv_content(self, filename: str, original_filename: str, content: bytes,
+                                 content_sha256: str, link_duplicates: bool = False,
+                                 persist: Optional[asyncio.Future] = None) -> Dict[str, Any]:
+        """
+        Sign, parse and store a CV whose bytes are in hand
+        
+        persist is the pending write of the file, awaited before any record points
+        at it; None when the file is already stored.
+        """
+        file_size = len(content)
+        
+        # Step 2: Near-duplicate check on the document text before paying for a parse
+        near_duplicate = None
+        signature, source = await self._sign_document(filename, content)
+        if signature is not None:
+            near_duplicate = await asyncio.to_thread(self._find_near_duplicate, signature, source)
+        
+        if near_duplicate and link_duplicates:
+            if persist is not None:
+                await persist
+            upload_record_id = await run_write(
+                self._store_duplicate_upload, filename, original_filename, file_size, content_sha256
+            )
+            return await self._linked_duplicate_response(near_duplicate, upload_record_id, filename, original_filename)
+        
+        # Step 3: Parse CV from the bytes already in memory
+        logger.info(f"Parsing CV: {filename}")
+        structured_cv, raw_parsed_json = await parse_cv_bytes(content, filename)
+        logger.info("CV parsed successfully")
+        
+        # Step 4: Store the upload, CV, features and signature in one transaction,
+        # once the file the records point at is on disk
+        if persist is not None:
+            await persist
+        upload_record_id, cv_record_id, near_duplicate = await run_write(
+            self._store_parsed_cv, filename, original_filename, file_size, content_sha256,
+            structured_cv, raw_parsed_json, signature, source, near_duplicate
+        )
+        logger.info(f"CV record saved with ID: {cv_record_id} (upload {upload_record_id})")
+        
+        # Step 5: Prepare response
+        response = structured_cv.dict()
+        response.update({
+            "id": cv_record_id,  # Use the stored ID
+            "upload_id": upload_record_id,
+            "filename": filename,
+            "original_filename": original_filename,
+            "near_duplicate": near_duplicate
+        })
+        
+        logger.info(f"CV processed successfully. ID: {cv_record_id}")
+        return response
+    
+    def _store_duplicate_upload(self, filename: str, original_filename: str, file_size: int,
+                                content_sha256: str) -> int:
+        """Record an upload that is linked to an existing CV instead of being parsed"""
+        with unit_of_work():
             upload_record_id = self.file_repository.create_upload_record_and_get_id(
                 filename=filename,
-                original_filename=file.filename,
+                original_filename=original_filename,
                 file_size=file_size,
-                file_type="cv"
+                file_type="cv",
+                content_sha256=content_sha256
             )
-            logger.info(f"Upload record created with ID: {upload_record_id}")
-            
-            # Step 3: Parse CV (now returns tuple)
-            file_path = self.file_handler.get_file_path(filename)
-            logger.info(f"Parsing CV from: {file_path}")
-            structured_cv, raw_parsed_json = await parse_cv(str(file_path))
-            logger.info("CV parsed successfully")
-            
-            # Step 4: Save parsed CV with raw JSON and get ID immediately
-            cv_record_id = self.cv_repository.save_cv_and_get_id(
-                upload_record_id,
-                structured_cv, 
-                raw_parsed_json
+            self.file_repository.update_status(upload_record_id, "duplicate")
+        return upload_record_id
+    
+    def _store_parsed_cv(self, filename: str, original_filename: str, file_size: int, content_sha256: str,
+                         structured_cv: StructuredCV, raw_parsed_json: Dict[str, Any],
+                         signature, source: str,
+                         near_duplicate: Optional[Dict[str, Any]]) -> Tuple[int, int, Optional[Dict[str, Any]]]:
+        """Write every record of a parsed upload in a single unit of work"""
+        with unit_of_work():
+            upload_record_id = self.file_repository.create_upload_record_and_get_id(
+                filename=filename,
+                original_filename=original_filename,
+                file_size=file_size,
+                file_type="cv",
+                content_sha256=content_sha256
             )
-            logger.info(f"CV record saved with ID: {cv_record_id}")
+            cv_record_id = self.cv_repository.save_cv_and_get_id(upload_record_id, structured_cv, raw_parsed_json)
             
-            # Step 5: Update upload status
-            self.file_repository.update_status(upload_record_id, "processed")
+            # Derive the feature row once so analyses and ranking skip recomputation
+            self.feature_repository.save_features(cv_record_id, build_cv_features(structured_cv))
             
-            # Step 6: Prepare response
-            response = structured_cv.dict()
-            response.update({
-                "id": cv_record_id,  # Use the stored ID
-                "upload_id": upload_record_id,
-                "filename": filename,
-                "original_filename": file.filename
-            })
+            # Persist the MinHash signature, signing the parsed JSON if the document had no text
+            if config.DEDUP_ENABLED:
+                if signature is None:
+                    source = "parsed"
+                    signature = get_min_hasher().signature(parsed_cv_text(raw_parsed_json))
+                    if signature is not None:
+                        near_duplicate = self._find_near_duplicate(signature, source)
+                if signature is not None:
+                    self.dedup_repository.save_signature(
+                        cv_record_id, signature, source,
+                        get_min_hasher().band_hashes(signature, source)
+                    )
             
-            logger.info(f"CV processed successfully. ID: {cv_record_id}")
-            return response
-            
-        except Exception as e:
-            # Update status to failed if we have an upload record ID
-            if upload_record_id:
-                try:
-                    self.file_repository.update_status(upload_record_id, "failed")
-                    logger.info(f"Updated upload {upload_record_id} status to failed")
-                except Exception as update_error:
-                    logger.error(f"Failed to update status to failed: {update_error}")
-            
-            logger.error(f"Error processing CV: {str(e)}")
-            if isinstance(e, HTTPException):
-                raise
-            raise HTTPException(status_code=500, detail=f"Error processing CV: {str(e)}")
+            self.file_repository.update_status(upload_record_id, "processed")
+        return upload_record_id, cv_record_id, near_duplicate
+    
+    async def _sign_document(self, filename: str, content: bytes) -> Tuple[Optional[Any], str]:
+        """MinHash signature of the document text (None when disabled or no text)"""
+        if not config.DEDUP_ENABLED:
+            return None, "text"
+        text = await asyncio.to_thread(extract_cv_text, filename, content)
+        return get_min_hasher().signature(text) if text.strip() else None, "text"
+    
+    def _find_near_duplicate(self, signature, source: str) -> Optional[Dict[str, Any]]:
+        """Look up an existing CV whose signature is close to this one"""
+        match = self.dedup_repository.find_near_duplicate(
+            get_min_hasher(), signature, source, config.DEDUP_SIMILARITY_THRESHOLD
+        )
+        if not match:
+            return None
+        cv_id, similarity = match
+        logger.info(f"Near-duplicate of CV {cv_id} detected (similarity {similarity:.2f})")
+        return {"cv_id": cv_id, "similarity": round(similarity, 3)}
+    
+    async def _linked_duplicate_response(self, near_duplicate: Dict[str, Any], upload_record_id: int,
+                                         filename: str, original_filename: str) -> Dict[str, Any]:
+        """Response for an upload linked to an existing CV instead of being parsed again"""
+        existing_cv = await self.get_cv_by_id_async(near_duplicate["cv_id"])
+        analyses = await asyncio.to_thread(self.analysis_repository.get_analyses_by_cv, near_duplicate["cv_id"])
+        
+        response = dict(existing_cv["parsed_data"] or {})
+        response.update({
+            "id": near_duplicate["cv_id"],
+            "upload_id": upload_record_id,
+            "filename": filename,
+            "original_filename": original_filename,
+            "near_duplicate": near_duplicate,
+            "linked_to_existing": True,
+            "existing_analyses": [{
+                "id": analysis["id"],
+                "job_id": analysis["job_id"],
+                "job_title": analysis["job_title"],
+                "suitability_score": analysis["suitability_score"]
+            } for analysis in analyses]
+        })
+        
+        logger.info(f"Upload {upload_record_id} linked to existing CV {near_duplicate['cv_id']}")
+        return response
     
     def get_cv_by_id(self, cv_id: int) -> Dict[str, Any]:
         """Get CV by ID with file information"""
@@ -86,6 +214,13 @@ class CVProcessor:
             raise HTTPException(status_code=404, detail="CV not found")
         return cv_data
     
+    async def get_cv_by_id_async(self, cv_id: int) -> Dict[str, Any]:
+        """Get CV by ID with file information without blocking the event loop"""
+        cv_data = await self.async_cv_repository.get_cv_with_file_info(cv_id)
+        if not cv_data:
+            raise HTTPException(status_code=404, detail="CV not found")
+        return cv_data
+    
     def get_structured_cv(self, cv_id: int) -> StructuredCV:
         """Get StructuredCV object from stored data without re-parsing"""
         structured_cv = self.cv_repository.get_structured_cv_by_id(cv_id)
@@ -93,9 +228,54 @@ class CVProcessor:
             raise HTTPException(status_code=404, detail="CV not found")
         return structured_cv
     
-    def get_recent_cvs(self, limit: int = 10) -> List[Dict[str, Any]]:
+    async def get_cv_features_async(self, cv_id: int, structured_cv: Optional[StructuredCV] = None) -> Dict[str, Any]:
+        """Get precomputed CV features, deriving them through the write queue for older CVs"""
+        features = await asyncio.to_thread(self.feature_repository.get_features, cv_id)
+        if features:
+            return features
+        
+        structured_cv = structured_cv or await asyncio.to_thread(self.get_structured_cv, cv_id)
+        features = build_cv_features(structured_cv)
+        await run_write(self.feature_repository.save_features, cv_id, features)
+        logger.info(f"Backfilled features for CV {cv_id}")
+        return features
+    
+    def backfill_features(self, batch_size: int = 500) -> int:
+        """Derive feature rows, one transaction per batch, for every CV without a current one"""
+        total = 0
+        while True:
+            cv_ids = self.feature_repository.get_cv_ids_without_features(limit=batch_size)
+            if not cv_ids:
+                return total
+            with unit_of_work():
+                for cv_id in cv_ids:
+                    structured_cv = self.cv_repository.get_structured_cv_by_id(cv_id) or StructuredCV()
+                    self.feature_repository.save_features(cv_id, build_cv_features(structured_cv))
+            total += len(cv_ids)
+            logger.info(f"Backfilled features for {total} CVs")
+    
+    def get_recent_cvs(self, limit: int = 10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get recent CVs"""
-        return self.cv_repository.get_recent_cvs(limit=limit)
+        return self.cv_repository.get_recent_cvs(limit=limit, cursor=cursor)
+    
+    async def get_recent_cvs_async(self, limit: int = 10, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Page of recent CVs plus the cursor of the next page"""
+        try:
+            cvs = await self.async_cv_repository.get_recent_cvs(limit=limit, cursor=cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": cvs, "next_cursor": next_cursor(cvs, limit, 'parsed_date')}
+    
+    async def search_cvs_async(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Full-text CV search, best matches first with highlighted fields"""
+        return await self.async_cv_repository.search_cvs(query, limit=limit)
+
+# Singleton instance, created on first use
+_cv_processor: Optional[CVProcessor] = None
 
-# Create singleton instance
-cv_processor = CVProcessor()
\ No newline at end of file
+def get_cv_processor() -> CVProcessor:
+    """Get or create the singleton CV processor"""
+    global _cv_processor
+    if _cv_processor is None:
+        _cv_processor = CVProcessor()
+    return _cv_processor
@@ -0,0 +1,150 @@
+import io
+import re
+import json
+import zlib
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+def extract_cv_text(file_path: str, content: Optional[bytes] = None) -> str:
+    """
+    Extract plain text locally from a PDF or DOCX (empty string when not possible)
+    
+    When the document is already in memory, pass it as content; file_path then
+    only has to carry the file type and is not read.
+    """
+    ext = Path(file_path).suffix.lower()
+    source = io.BytesIO(content) if content is not None else file_path
+    try:
+        if ext == '.pdf':
+            from PyPDF2 import PdfReader
+            reader = PdfReader(source)
+            return '\n'.join(page.extract_text() or '' for page in reader.pages)
+        if ext == '.docx':
+            from docx import Document
+            document = Document(source)
+            return '\n'.join(paragraph.text for paragraph in document.paragraphs)
+    except Exception as e:
+        logger.warning(f"Local text extraction failed for {file_path}: {e}")
+    return ''
+
+def parsed_cv_text(parsed_data: Dict[str, Any]) -> str:
+    """Flatten parsed CV JSON into text for signing when no document text is available"""
+    return json.dumps(parsed_data, sort_keys=True, default=str)
+
+# Odd multipliers used to combine consecutive token hashes into a shingle hash
+_SHINGLE_MIXERS = (np.uint32(0x9E3779B1), np.uint32(0x85EBCA77), np.uint32(0xC2B2AE3D))
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """Distinct 32-bit hashes of the word shingles of the normalized text"""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if not tokens:
+        return np.empty(0, dtype=np.uint32)
+
+    token_hashes = np.fromiter(
+        (zlib.crc32(token.encode('utf-8')) for token in tokens),
+        dtype=np.uint32, count=len(tokens)
+    )
+    size = min(size, len(tokens))
+    count = len(tokens) - size + 1
+
+    # Order-sensitive combination of each window of `size` token hashes
+    combined = np.zeros(count, dtype=np.uint32)
+    for offset in range(size):
+        combined ^= token_hashes[offset:offset + count] * _SHINGLE_MIXERS[offset % len(_SHINGLE_MIXERS)]
+    return np.unique(combined)
+
+class MinHasher:
+    """MinHash signatures with LSH banding for near-duplicate detection"""
+
+    def __init__(self, num_perm: int = None, bands: int = None, seed: int = 1):
+        self.num_perm = num_perm or config.DEDUP_NUM_PERM
+        self.bands = bands or config.DEDUP_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError("DEDUP_NUM_PERM must be a multiple of DEDUP_BANDS")
+        self.rows = self.num_perm // self.bands
+
+        # Hash family h(x) = a * x + b (mod 2**32) with odd multipliers; uint32 wraparound
+        # does the modulo for free, which keeps signing cheap on large corpora
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(0, 1 << 32, size=self.num_perm, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+        self._b = generator.randint(0, 1 << 32, size=self.num_perm, dtype=np.uint64).astype(np.uint32)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of a text, or None when it has no tokens"""
+        hashes = shingle_hashes(text)
+        if not len(hashes):
+            return None
+
+        # (num_perm, n_shingles) permutation matrix, reduced to the per-permutation minimum
+        permuted = np.multiply.outer(self._a, hashes)
+        permuted += self._b[:, None]
+        return permuted.min(axis=1)
+
+    def band_hashes(self, signature: np.ndarray, source: str = 'text') -> List[Tuple[int, int]]:
+        """(band, bucket) pairs for LSH lookup; the source keeps text and JSON signatures apart"""
+        buckets = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(source.encode('utf-8') + chunk, digest_size=8).digest()
+            buckets.append((band, int.from_bytes(digest, 'big', signed=True)))
+        return buckets
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(first == second))
+
+    @staticmethod
+    def to_bytes(signature: np.ndarray) -> bytes:
+        return signature.astype(np.uint32).tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> np.ndarray:
+        return np.frombuffer(data, dtype=np.uint32)
+
+class LSHIndex:
+    """In-memory LSH index mirroring the persisted buckets (used for benchmarks and bulk runs)"""
+
+    def __init__(self, hasher: MinHasher, threshold: float = None):
+        self.hasher = hasher
+        self.threshold = threshold if threshold is not None else config.DEDUP_SIMILARITY_THRESHOLD
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+        self._signatures: Dict[int, np.ndarray] = {}
+
+    def query(self, signature: np.ndarray, source: str = 'text') -> Optional[Tuple[int, float]]:
+        """Best (key, similarity) above the threshold, if any"""
+        candidates = set()
+        for bucket in self.hasher.band_hashes(signature, source):
+            candidates.update(self._buckets.get(bucket, ()))
+
+        best = None
+        for key in candidates:
+            score = self.hasher.similarity(signature, self._signatures[key])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+    def add(self, key: int, signature: np.ndarray, source: str = 'text') -> None:
+        self._signatures[key] = signature
+        for bucket in self.hasher.band_hashes(signature, source):
+            self._buckets.setdefault(bucket, []).append(key)
+
+# Singleton instance
+_hasher_instance = None
+
+def get_min_hasher() -> MinHasher:
+    """Get or create singleton MinHasher instance"""
+    global _hasher_instance
+    if _hasher_instance is None:
+        _hasher_instance = MinHasher()
+    return _hasher_instance
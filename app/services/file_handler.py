@@ -1,11 +1,14 @@
-import os
+import hashlib
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Tuple
+from typing import Dict, Tuple, AsyncIterator
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from app.config import config
+from app.repositories.cv_repository import FileUploadRepository
+from app.services.blob_store import BlobStore
 
 logger = logging.getLogger(__name__)
 
@@ -15,57 +18,125 @@ class FileHandler:
     def __init__(self, upload_folder: str = None):
         self.upload_folder = Path(upload_folder or config.UPLOAD_FOLDER)
         self.upload_folder.mkdir(exist_ok=True)
+        self.store = BlobStore(self.upload_folder / "blobs")
+        self.file_repository = FileUploadRepository()
     
-    async def save_uploaded_file(self, file: UploadFile) -> Tuple[str, bytes, int]:
+    async def save_uploaded_file(self, file: UploadFile) -> Tuple[str, str, int]:
         """
-        Save uploaded file and return filename, content, and size
+        Stream an uploaded file into the blob store, hashing it on the way
+        
+        The upload is copied in UPLOAD_CHUNK_SIZE chunks, so memory use does not
+        depend on the file size, and the copy stops as soon as the size limit is
+        exceeded. The blob only appears once complete, and is dropped when the
+        same content is already stored.
+        
+        Returns:
+            Tuple of (upload filename, sha256_hex, file_size)
+        """
+        filename = self.new_filename(file)
+        partial_path = self.store.temp_path()
+        digest = hashlib.sha256()
+        file_size = 0
+        try:
+            with open(partial_path, "wb") as buffer:
+                async for chunk in self._read_chunks(file):
+                    file_size += len(chunk)
+                    digest.update(chunk)
+                    await run_in_threadpool(buffer.write, chunk)
+            sha256 = digest.hexdigest()
+            await run_in_threadpool(self.store.put_file, partial_path, sha256)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        
+        logger.info(f"File saved: {filename} ({file_size} bytes, sha256 {sha256})")
+        return filename, sha256, file_size
+    
+    async def read_uploaded_file(self, file: UploadFile) -> Tuple[str, bytes, str]:
+        """
+        Read an upload into memory (for callers that need the bytes anyway), hashing it on the way
+        
+        Reading stops as soon as the size limit is exceeded, so at most
+        MAX_FILE_SIZE_BYTES are held. Nothing is written; see store_content.
         
         Returns:
-            Tuple of (saved_filename, file_content, file_size)
+            Tuple of (upload filename, file_content, sha256_hex)
         """
-        # Validate file extension
+        filename = self.new_filename(file)
+        digest = hashlib.sha256()
+        chunks = []
+        async for chunk in self._read_chunks(file):
+            digest.update(chunk)
+            chunks.append(chunk)
+        return filename, b"".join(chunks), digest.hexdigest()
+    
+    def store_content(self, content: bytes, content_sha256: str) -> Path:
+        """Write content read by read_uploaded_file to the blob store (once per distinct content)"""
+        return self.store.put(content, content_sha256)
+    
+    def new_filename(self, file: UploadFile) -> str:
+        """Validate the upload's extension and generate the unique name it is stored under"""
         if not config.is_allowed_file(file.filename):
             raise HTTPException(
                 status_code=400,
                 detail=f"File type not allowed. Allowed types: {', '.join(config.ALLOWED_EXTENSIONS)}"
             )
-        
-        # Read file content
-        content = await file.read()
-        file_size = len(content)
-        
-        # Validate file size
-        if file_size > config.MAX_FILE_SIZE_BYTES:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large. Maximum size is {config.MAX_FILE_SIZE_MB}MB"
-            )
-        
-        # Generate unique filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{timestamp}_{file.filename}"
-        file_path = self.upload_folder / filename
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
+        return f"{timestamp}_{file.filename}"
+    
+    async def _read_chunks(self, file: UploadFile) -> AsyncIterator[bytes]:
+        """Chunks of an upload, raising 413 as soon as it exceeds the size limit"""
+        # Reject on the size reported by the multipart parser before reading anything
+        if file.size is not None and file.size > config.MAX_FILE_SIZE_BYTES:
+            raise self._too_large()
         
-        logger.info(f"File saved: {filename}")
-        return filename, content, file_size
+        total = 0
+        while chunk := await file.read(config.UPLOAD_CHUNK_SIZE):
+            total += len(chunk)
+            if total > config.MAX_FILE_SIZE_BYTES:
+                raise self._too_large()
+            yield chunk
     
-    def delete_file(self, filename: str) -> bool:
-        """Delete a file from the upload folder"""
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {config.MAX_FILE_SIZE_MB}MB"
+        )
+    
+    def delete_file(self, content_sha256: str) -> bool:
+        """
+        Delete a stored file once no upload record references it
+        
+        Call after deleting the FileUpload rows. Blobs stored within the last
+        UPLOAD_BLOB_GRACE_SECONDS are kept for uploads still being processed.
+        """
         try:
-            file_path = self.upload_folder / filename
-            if file_path.exists():
-                file_path.unlink()
-                logger.info(f"File deleted: {filename}")
-                return True
-            return False
+            if self.file_repository.count_references(content_sha256):
+                return False
+            return self.store.delete(content_sha256, min_age_seconds=config.UPLOAD_BLOB_GRACE_SECONDS)
         except Exception as e:
-            logger.error(f"Error deleting file {filename}: {e}")
+            logger.error(f"Error deleting file {content_sha256}: {e}")
             return False
     
-    def get_file_path(self, filename: str) -> Path:
-        """Get full path for a filename"""
-        return self.upload_folder / filename
\ No newline at end of file
+    def get_file_path(self, content_sha256: str) -> Path:
+        """Get the stored path of a file by its content hash"""
+        return self.store.path(content_sha256)
+    
+    def migrate_legacy_uploads(self) -> Dict[str, int]:
+        """Move files stored flat in the upload folder (by upload filename) into the blob store"""
+        migrated = missing = 0
+        for upload_id, filename in self.file_repository.get_uploads_without_hash():
+            legacy_path = self.upload_folder / filename
+            if not legacy_path.is_file():
+                missing += 1
+                continue
+            digest = hashlib.sha256()
+            with open(legacy_path, "rb") as f:
+                while chunk := f.read(config.UPLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+            sha256 = digest.hexdigest()
+            self.store.put_file(legacy_path, sha256)
+            self.file_repository.set_content_sha256(upload_id, sha256)
+            migrated += 1
+        logger.info(f"Migrated {migrated} legacy uploads into the blob store ({missing} files missing)")
+        return {"migrated": migrated, "missing": missing}
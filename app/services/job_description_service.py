@@ -1,44 +1,53 @@
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 from fastapi import HTTPException
 
-from app.repositories.job_description_repository import JobDescriptionRepository
+from app.repositories.job_description_repository import JobDescriptionRepository, AsyncJobDescriptionRepository
+from app.repositories.base_repository import InvalidCursorError, next_cursor
+from app.repositories.write_queue import run_write
 from app.models.schemas import StructuredJobDescription, JobRequirement
+from app.services.job_profile import build_job_profile, is_current
 
 logger = logging.getLogger(__name__)
 
+def normalize_job_data(job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Bring submitted job data into the StructuredJobDescription shape"""
+    # Process requirements if provided as plain data
+    if "requirements" in job_data and isinstance(job_data["requirements"], list):
+        processed_requirements = []
+        for req in job_data["requirements"]:
+            if isinstance(req, dict) and "category" in req and "requirements" in req:
+                # Already in correct format
+                processed_requirements.append(req)
+            elif isinstance(req, str):
+                # Simple string, assume it's a required skill
+                processed_requirements.append({
+                    "category": "Required",
+                    "requirements": [req]
+                })
+        job_data["requirements"] = processed_requirements
+    return job_data
+
 class JobDescriptionService:
     """Service for managing job descriptions"""
     
     def __init__(self):
         self.repository = JobDescriptionRepository()
+        self.async_repository = AsyncJobDescriptionRepository()
     
     def create_job_description(self, job_data: Dict[str, Any], 
                              source: str = "manual") -> Dict[str, Any]:
         """Create a new job description from structured data"""
         try:
-            # Process requirements if provided as plain data
-            if "requirements" in job_data and isinstance(job_data["requirements"], list):
-                processed_requirements = []
-                for req in job_data["requirements"]:
-                    if isinstance(req, dict) and "category" in req and "requirements" in req:
-                        # Already in correct format
-                        processed_requirements.append(req)
-                    elif isinstance(req, str):
-                        # Simple string, assume it's a required skill
-                        processed_requirements.append({
-                            "category": "Required",
-                            "requirements": [req]
-                        })
-                job_data["requirements"] = processed_requirements
-            
             # Validate and create StructuredJobDescription
-            structured_job = StructuredJobDescription(**job_data)
+            structured_job = StructuredJobDescription(**normalize_job_data(job_data))
             
-            # Save to database
+            # Save to database with the precomputed requirement profile
             job_record = self.repository.save_job_description(
                 structured_job, 
                 source=source,
+                job_profile=build_job_profile(structured_job),
                 industry=job_data.get("industry"),
                 department=job_data.get("department")
             )
@@ -56,6 +65,13 @@ class JobDescriptionService:
             raise HTTPException(status_code=404, detail="Job description not found")
         return job_data.to_dict()
     
+    async def get_job_description_async(self, job_id: int) -> Dict[str, Any]:
+        """Get job description by ID without blocking the event loop"""
+        job = await self.async_repository.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job description not found")
+        return job.to_dict()
+    
     def get_structured_job(self, job_id: int) -> StructuredJobDescription:
         """Get StructuredJobDescription object"""
         structured_job = self.repository.get_structured_job_by_id(job_id)
@@ -63,21 +79,52 @@ class JobDescriptionService:
             raise HTTPException(status_code=404, detail="Job description not found")
         return structured_job
     
+    async def get_job_profile_async(self, job_id: int,
+                                    structured_job: Optional[StructuredJobDescription] = None) -> Dict[str, Any]:
+        """Get the job's requirement profile, rebuilding it through the write queue when missing or outdated"""
+        profile = await asyncio.to_thread(self.repository.get_job_profile, job_id)
+        if is_current(profile):
+            return profile
+        
+        structured_job = structured_job or await asyncio.to_thread(self.get_structured_job, job_id)
+        profile = build_job_profile(structured_job)
+        await run_write(self.repository.save_job_profile, job_id, profile)
+        logger.info(f"Rebuilt requirement profile for job {job_id}")
+        return profile
+    
     def list_jobs(self, limit: int = 20, company: str = None, 
-                  job_type: str = None) -> List[Dict[str, Any]]:
+                  job_type: str = None, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """List active job descriptions with optional filters"""
-        return self.repository.get_active_jobs(limit=limit, company=company, job_type=job_type)
+        return self.repository.get_active_jobs(limit=limit, company=company, job_type=job_type, cursor=cursor)
+    
+    async def list_jobs_async(self, limit: int = 20, company: str = None,
+                              job_type: str = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Page of active job descriptions plus the cursor of the next page"""
+        try:
+            jobs = await self.async_repository.get_active_jobs(
+                limit=limit, company=company, job_type=job_type, cursor=cursor
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": jobs, "next_cursor": next_cursor(jobs, limit, 'created_at')}
     
     def search_jobs(self, search_term: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search job descriptions"""
         return self.repository.search_jobs(search_term, limit=limit)
     
+    async def search_jobs_async(self, search_term: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Full-text job search, best matches first with highlighted fields"""
+        return await self.async_repository.search_jobs(search_term, limit=limit)
+    
     def get_similar_jobs(self, job_id: int, limit: int = 5) -> List[Dict[str, Any]]:
         """Get similar job descriptions"""
         return self.repository.get_similar_jobs(job_id, limit=limit)
     
     def update_job_description(self, job_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
         """Update job description"""
+        if "job_data" in updates:
+            # Keep the requirement profile in step with the job data
+            updates["job_profile"] = build_job_profile(StructuredJobDescription(**updates["job_data"]))
         job_record = self.repository.update(job_id, **updates)
         if not job_record:
             raise HTTPException(status_code=404, detail="Job description not found")
@@ -94,5 +141,12 @@ class JobDescriptionService:
         """Get all jobs for a company"""
         return self.repository.get_jobs_by_company(company, limit=limit)
 
-# Create singleton instance
-job_description_service = JobDescriptionService()
\ No newline at end of file
+# Singleton instance, created on first use
+_job_description_service: Optional[JobDescriptionService] = None
+
+def get_job_description_service() -> JobDescriptionService:
+    """Get or create the singleton job description service"""
+    global _job_description_service
+    if _job_description_service is None:
+        _job_description_service = JobDescriptionService()
+    return _job_description_service
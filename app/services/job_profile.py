@@ -0,0 +1,87 @@
+import re
+import logging
+from typing import Dict, Any, List, Optional
+
+from app.models.schemas import StructuredJobDescription
+from app.services.cv_features import normalize_skill, skill_group, skill_text, degree_level
+
+logger = logging.getLogger(__name__)
+
+# Bump when the profile layout changes so stored profiles get rebuilt
+JOB_PROFILE_VERSION = 2
+
+# Years implied by the experience level, checked in order
+EXPERIENCE_LEVEL_YEARS = {
+    'entry': 0, 'junior': 1, 'mid': 3,
+    'senior': 5, 'lead': 7, 'principal': 10
+}
+
+# Common certification abbreviations
+CERT_ALIASES = {
+    'aws certified': ['aws', 'amazon web services'],
+    'azure': ['az-', 'microsoft azure'],
+    'google cloud': ['gcp', 'google certified'],
+    'cisco': ['ccna', 'ccnp', 'ccie'],
+    'comptia': ['a+', 'network+', 'security+']
+}
+
+_YEARS_PATTERN = re.compile(r'(\d+)\+?\s*years?')
+
+def extract_required_years(job: StructuredJobDescription) -> int:
+    """Extract required years of experience from job description"""
+    # Look in experience level
+    if job.experience_level:
+        level_lower = job.experience_level.lower()
+        for key, years in EXPERIENCE_LEVEL_YEARS.items():
+            if key in level_lower:
+                return years
+
+    # Look in requirements
+    for req_group in job.requirements:
+        for req in req_group.requirements:
+            match = _YEARS_PATTERN.search(req.lower())
+            if match:
+                return int(match.group(1))
+
+    return 0
+
+def certification_aliases(requirement: str) -> List[str]:
+    """Lowercase strings that satisfy a certification requirement when found in a cert name"""
+    req_lower = requirement.lower()
+    aliases = [req_lower]
+    for key, values in CERT_ALIASES.items():
+        group = [key] + values
+        if any(v in req_lower for v in group):
+            aliases.extend(v for v in group if v not in aliases)
+    return aliases
+
+def skill_requirement(skill: str) -> Dict[str, Any]:
+    """A required skill as written, its canonical id and the aliases of its group"""
+    return {'text': skill_text(skill), 'id': normalize_skill(skill), 'aliases': skill_group(skill)}
+
+def build_job_profile(job: StructuredJobDescription) -> Dict[str, Any]:
+    """
+    Precompute the normalized requirement profile for a job
+
+    Lists stay aligned with the matching StructuredJobDescription lists so the
+    analyzer can report the original wording.
+    """
+    return {
+        'version': JOB_PROFILE_VERSION,
+        'required_skills': [skill_requirement(skill) for skill in job.required_skills],
+        'preferred_skills': [skill_requirement(skill) for skill in job.preferred_skills],
+        'required_years': extract_required_years(job),
+        'education': [{
+            'requirement': req,
+            'degree_level': degree_level(req),
+            'text': req.lower()
+        } for req in job.education_requirements],
+        'certifications': [{
+            'requirement': req,
+            'aliases': certification_aliases(req)
+        } for req in job.certifications_required]
+    }
+
+def is_current(profile: Optional[Dict[str, Any]]) -> bool:
+    """Whether a stored profile can be used as-is"""
+    return bool(profile) and profile.get('version') == JOB_PROFILE_VERSION
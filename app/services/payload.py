@@ -0,0 +1,185 @@
+"""
+Shrinks CV documents before they are sent to Gemini as inline data
+
+Photos, logos and embedded fonts make up most of the bytes of a typical CV but
+add nothing to the extracted JSON, while request size drives upload time and
+model latency. PDFs keep their pages, text and layout: image XObjects are
+replaced by a 1x1 placeholder drawn in the same box, and font programs are
+dropped where the text maps to Unicode without them. DOCX packages lose their
+media and embedded fonts. Image CVs are downscaled (with Pillow, when installed).
+
+The work is CPU-bound, so it runs in a process pool; a result is only used when
+it is smaller than the original and still readable.
+"""
+
+import asyncio
+import io
+import logging
+import multiprocessing
+import posixpath
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+_FONT_FILE_KEYS = ('/FontFile', '/FontFile2', '/FontFile3')
+_STANDARD_ENCODINGS = ('/WinAnsiEncoding', '/MacRomanEncoding', '/StandardEncoding')
+# Package parts that only carry pictures, embedded fonts or thumbnails
+_DOCX_DROPPED_PARTS = re.compile(r'^(word/media/|word/embeddings/|word/fonts/|docProps/thumbnail\.)')
+_RELATIONSHIP = re.compile(rb'<Relationship\b[^>]*?Target="([^"]*)"[^>]*/>')
+_CONTENT_TYPE_OVERRIDE = re.compile(rb'<Override\b[^>]*?PartName="/([^"]*)"[^>]*/>')
+
+def _shrink_pdf(content: bytes) -> bytes:
+    from PyPDF2 import PdfReader, PdfWriter
+    from PyPDF2.generic import NameObject, NumberObject
+
+    reader = PdfReader(io.BytesIO(content))
+    seen = set()
+
+    def strip_resources(resources) -> None:
+        resources = resources.get_object() if resources is not None else None
+        if not resources:
+            return
+        for xobject in (resources.get('/XObject') or {}).values():
+            xobject = xobject.get_object()
+            if id(xobject) in seen:  # Shared by several pages or forms
+                continue
+            seen.add(id(xobject))
+            if xobject.get('/Subtype') == '/Image':
+                for key in ('/Filter', '/DecodeParms', '/SMask', '/Mask', '/Decode', '/Intent'):
+                    xobject.pop(key, None)
+                xobject.update({
+                    NameObject('/Width'): NumberObject(1),
+                    NameObject('/Height'): NumberObject(1),
+                    NameObject('/BitsPerComponent'): NumberObject(8),
+                    NameObject('/ColorSpace'): NameObject('/DeviceGray'),
+                })
+                xobject._data = b'\xc0'
+            elif xobject.get('/Subtype') == '/Form':
+                strip_resources(xobject.get('/Resources'))
+        for font in (resources.get('/Font') or {}).values():
+            font = font.get_object()
+            # Without a ToUnicode map or a standard encoding, the glyphs need the font program to be read
+            if '/ToUnicode' not in font and font.get('/Encoding') not in _STANDARD_ENCODINGS:
+                continue
+            for descendant in [font, *(font.get('/DescendantFonts') or [])]:
+                descriptor = descendant.get_object().get('/FontDescriptor')
+                if descriptor is not None:
+                    for key in _FONT_FILE_KEYS:
+                        descriptor.get_object().pop(key, None)
+
+    writer = PdfWriter()
+    for page in reader.pages:
+        strip_resources(page.get('/Resources'))
+        writer.add_page(page)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+def _relationship_target(rels_name: str, target: str) -> str:
+    """Package part a relationship points at (rels files sit in a _rels folder next to their source)"""
+    if target.startswith('/'):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(posixpath.dirname(rels_name)), target))
+
+def _shrink_docx(content: bytes) -> bytes:
+    output = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(content)) as source, \
+            zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as target:
+        dropped = {name for name in source.namelist() if _DOCX_DROPPED_PARTS.match(name)}
+        for info in source.infolist():
+            if info.filename in dropped:
+                continue
+            data = source.read(info)
+            # References to dropped parts would point at nothing
+            if info.filename.endswith('.rels'):
+                data = _RELATIONSHIP.sub(
+                    lambda m: b'' if _relationship_target(info.filename, m.group(1).decode()) in dropped
+                    else m.group(0), data)
+            elif info.filename == '[Content_Types].xml':
+                data = _CONTENT_TYPE_OVERRIDE.sub(lambda m: b'' if m.group(1).decode() in dropped else m.group(0), data)
+            target.writestr(info.filename, data)
+    return output.getvalue()
+
+def _shrink_image(content: bytes, extension: str) -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        return content
+    image = Image.open(io.BytesIO(content))
+    image.thumbnail((config.LLM_IMAGE_MAX_SIDE, config.LLM_IMAGE_MAX_SIDE))
+    output = io.BytesIO()
+    if extension == '.png':
+        image.save(output, format='PNG', optimize=True)
+    else:
+        image.convert('RGB').save(output, format='JPEG', quality=85, optimize=True)
+    return output.getvalue()
+
+def _is_readable(content: bytes, extension: str) -> bool:
+    """Whether a shrunk document still opens"""
+    if extension == '.pdf':
+        from PyPDF2 import PdfReader
+        return len(PdfReader(io.BytesIO(content)).pages) > 0
+    if extension == '.docx':
+        from docx import Document
+        Document(io.BytesIO(content))
+    return True
+
+def shrink_document(content: bytes, filename: str) -> bytes:
+    """The smallest readable version of a CV document for the LLM (content itself if nothing helps)"""
+    extension = Path(filename).suffix.lower()
+    try:
+        if extension == '.pdf':
+            shrunk = _shrink_pdf(content)
+        elif extension == '.docx':
+            shrunk = _shrink_docx(content)
+        elif extension in IMAGE_EXTENSIONS:
+            shrunk = _shrink_image(content, extension)
+        else:
+            return content
+        if len(shrunk) < len(content) and _is_readable(shrunk, extension):
+            return shrunk
+    except Exception as e:
+        logger.warning(f"Could not shrink {filename}, sending it as is: {e}")
+    return content
+
+async def shrink_for_llm(content: bytes, filename: str) -> bytes:
+    """shrink_document in the process pool, logging the bytes saved"""
+    if not config.LLM_PAYLOAD_SHRINK:
+        return content
+    start = time.perf_counter()
+    pool = get_payload_pool()
+    if pool is None:
+        shrunk = await asyncio.to_thread(shrink_document, content, filename)
+    else:
+        shrunk = await asyncio.get_running_loop().run_in_executor(pool, shrink_document, content, filename)
+    logger.info(f"LLM payload for {filename}: {len(content)} -> {len(shrunk)} bytes "
+                f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return shrunk
+
+# Process pool, created on first use (None when LLM_PAYLOAD_WORKERS is 0)
+_payload_pool: Optional[ProcessPoolExecutor] = None
+
+def get_payload_pool() -> Optional[ProcessPoolExecutor]:
+    """Get or create the process pool for payload shrinking"""
+    global _payload_pool
+    if _payload_pool is None and config.LLM_PAYLOAD_WORKERS > 0:
+        # Spawned rather than forked: the server process runs threads (write queue, thread pools)
+        _payload_pool = ProcessPoolExecutor(max_workers=config.LLM_PAYLOAD_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+    return _payload_pool
+
+def close_payload_pool() -> None:
+    """Stop the pool's worker processes"""
+    global _payload_pool
+    if _payload_pool is not None:
+        _payload_pool.shutdown(cancel_futures=True)
+        _payload_pool = None
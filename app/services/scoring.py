@@ -0,0 +1,120 @@
+import logging
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+# Numeric codes for hire recommendations; unknown values count as "maybe"
+HIRE_RECOMMENDATION_CODES = {'strong yes': 2, 'yes': 1, 'maybe': 0, 'no': -1}
+
+# Category weights that can be overridden per re-score; they must sum to 1
+CATEGORY_WEIGHTS = ('technical', 'experience', 'education')
+
+# Weights every analysis was scored with before they became configurable
+LEGACY_WEIGHTS = {'technical': 0.4, 'experience': 0.4, 'education': 0.2,
+                  'strong_yes_floor': 85, 'no_ceiling': 40}
+
+def hire_recommendation_code(hire_recommendation: Optional[str]) -> int:
+    """Numeric code for a hire recommendation string"""
+    if not hire_recommendation:
+        return 0
+    return HIRE_RECOMMENDATION_CODES.get(hire_recommendation.lower().strip(), 0)
+
+def get_scoring_weights() -> Dict[str, float]:
+    """Current scoring weights and hire-recommendation clamps"""
+    return {
+        'technical': config.SCORE_WEIGHT_TECHNICAL,
+        'experience': config.SCORE_WEIGHT_EXPERIENCE,
+        'education': config.SCORE_WEIGHT_EDUCATION,
+        'strong_yes_floor': config.HIRE_STRONG_YES_FLOOR,
+        'no_ceiling': config.HIRE_NO_CEILING
+    }
+
+def resolve_weights(overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Configured weights with the given category weights applied (ValueError when invalid)"""
+    weights = get_scoring_weights()
+    if overrides is None:
+        return weights
+    if not isinstance(overrides, dict):
+        raise ValueError("weights must be an object of category weights")
+
+    unknown = sorted(set(overrides) - set(CATEGORY_WEIGHTS))
+    if unknown:
+        raise ValueError(f"Unknown weights: {', '.join(unknown)} (expected {', '.join(CATEGORY_WEIGHTS)})")
+    for name, value in overrides.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 1:
+            raise ValueError(f"Weight {name} must be a number between 0 and 1")
+        weights[name] = float(value)
+
+    if abs(sum(weights[name] for name in CATEGORY_WEIGHTS) - 1.0) > 1e-6:
+        raise ValueError(f"Weights {', '.join(CATEGORY_WEIGHTS)} must sum to 1")
+    return weights
+
+def overall_scores(technical: np.ndarray, experience: np.ndarray, education: np.ndarray,
+                   hire_codes: np.ndarray, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """
+    Overall suitability scores for many analyses in one vectorized pass
+
+    Args:
+        technical, experience, education: Category scores (0-100)
+        hire_codes: Hire recommendation codes (see HIRE_RECOMMENDATION_CODES)
+        weights: Scoring weights, defaults to the configured ones
+
+    Returns:
+        int64 array of overall scores
+    """
+    weights = weights or get_scoring_weights()
+
+    # Weighted average, truncated like int() for the non-negative inputs we store
+    overall = np.trunc(
+        np.asarray(technical, dtype=np.float64) * weights['technical'] +
+        np.asarray(experience, dtype=np.float64) * weights['experience'] +
+        np.asarray(education, dtype=np.float64) * weights['education']
+    ).astype(np.int64)
+
+    # Adjust based on hire recommendation
+    hire_codes = np.asarray(hire_codes)
+    overall = np.where(hire_codes == HIRE_RECOMMENDATION_CODES['strong yes'],
+                       np.maximum(overall, int(weights['strong_yes_floor'])), overall)
+    overall = np.where(hire_codes == HIRE_RECOMMENDATION_CODES['no'],
+                       np.minimum(overall, int(weights['no_ceiling'])), overall)
+
+    return np.clip(overall, 0, 100)
+
+def overall_score(technical: int, experience: int, education: int,
+                  hire_recommendation: Optional[str]) -> int:
+    """Overall suitability score for a single analysis"""
+    scores = overall_scores(
+        np.array([technical]), np.array([experience]), np.array([education]),
+        np.array([hire_recommendation_code(hire_recommendation)])
+    )
+    return int(scores[0])
+
+def hire_codes_for(values: Sequence[Optional[str]], technical: np.ndarray = None,
+                   experience: np.ndarray = None, education: np.ndarray = None,
+                   current: np.ndarray = None) -> np.ndarray:
+    """
+    Vector of hire recommendation codes
+
+    Analyses saved before the recommendation was stored have None; when the
+    category and current scores are given, their clamp is inferred from the
+    stored score under the legacy weights so re-scoring does not drop it.
+    """
+    codes = np.fromiter((hire_recommendation_code(value) for value in values),
+                        dtype=np.int8, count=len(values))
+    if current is None:
+        return codes
+
+    missing = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    base = overall_scores(technical, experience, education, np.zeros(len(values)), LEGACY_WEIGHTS)
+    current = np.asarray(current)
+    inferred = np.where(
+        (current == LEGACY_WEIGHTS['strong_yes_floor']) & (base < current),
+        HIRE_RECOMMENDATION_CODES['strong yes'],
+        np.where((current == LEGACY_WEIGHTS['no_ceiling']) & (base > current),
+                 HIRE_RECOMMENDATION_CODES['no'], 0)
+    )
+    return np.where(missing, inferred, codes).astype(np.int8)
@@ -0,0 +1,136 @@
+import re
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.models.schemas import Experience
+
+logger = logging.getLogger(__name__)
+
+MONTHS = {
+    'january': 1, 'jan': 1,
+    'february': 2, 'feb': 2,
+    'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4,
+    'may': 5,
+    'june': 6, 'jun': 6,
+    'july': 7, 'jul': 7,
+    'august': 8, 'aug': 8,
+    'september': 9, 'sep': 9, 'sept': 9,
+    'october': 10, 'oct': 10,
+    'november': 11, 'nov': 11,
+    'december': 12, 'dec': 12
+}
+
+PRESENT_WORDS = {'present', 'current', 'currently', 'now', 'today', 'ongoing', 'to date'}
+
+# Common date patterns, most specific first
+_DATE_PATTERNS = [
+    (re.compile(r'^(\d{4})[-/.](\d{1,2})(?:[-/.]\d{1,2})?$'), 'year_month'),  # YYYY-MM, YYYY-MM-DD
+    (re.compile(r'^(\d{1,2})[-/.](\d{4})$'), 'month_year'),  # MM/YYYY
+    (re.compile(r'^([a-z]+)\.?,?\s+(\d{4})$'), 'name_year'),  # Month YYYY, Jun. 2025
+    (re.compile(r'^(\d{4})$'), 'year'),  # Just year
+]
+
+@lru_cache(maxsize=4096)
+def parse_month(date_str: str) -> Optional[Tuple[int, int]]:
+    """Parse a CV date into (year, month); None when it is not a recognizable date"""
+    value = date_str.strip().lower()
+    for pattern, kind in _DATE_PATTERNS:
+        match = pattern.match(value)
+        if not match:
+            continue
+        if kind == 'year_month':
+            year, month = int(match.group(1)), int(match.group(2))
+        elif kind == 'month_year':
+            month, year = int(match.group(1)), int(match.group(2))
+        elif kind == 'name_year':
+            month = MONTHS.get(match.group(1))
+            if month is None:
+                return None
+            year = int(match.group(2))
+        else:
+            year, month = int(match.group(1)), 1
+        if 1 <= month <= 12:
+            return year, month
+        return None
+    return None
+
+def is_present(date_str: Optional[str]) -> bool:
+    """Whether an end date means the role is ongoing"""
+    return bool(date_str) and date_str.strip().lower() in PRESENT_WORDS
+
+def normalize_date(date_str: Optional[str]) -> Optional[str]:
+    """Normalize date strings to YYYY-MM format (returned as-is when unrecognized)"""
+    if not date_str:
+        return None
+    parsed = parse_month(date_str)
+    if parsed is None:
+        return date_str
+    return f"{parsed[0]:04d}-{parsed[1]:02d}"
+
+def _month_index(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+def merged_months(intervals: List[Tuple[int, int]]) -> int:
+    """Months covered by [start, end) month intervals with overlaps merged"""
+    total = 0
+    merged_end = None
+    for start, end in sorted(intervals):
+        if merged_end is None or start > merged_end:
+            total += end - start
+            merged_end = end
+        elif end > merged_end:
+            total += end - merged_end
+            merged_end = end
+    return total
+
+def build_timeline(experiences: List[Experience], today: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Normalize experience dates once and merge overlapping roles
+
+    Returns:
+        Dict with total_months (overlaps merged), per-role durations and the
+        number of roles whose dates could not be parsed (counted as 0 months)
+    """
+    today = today or datetime.now()
+    current = _month_index(today.year, today.month)
+
+    roles = []
+    intervals = []
+    unparsed = 0
+    for exp in experiences:
+        start = parse_month(exp.start_date) if exp.start_date else None
+        ongoing = not exp.end_date or is_present(exp.end_date)
+        if ongoing:
+            end_index = current
+        else:
+            end = parse_month(exp.end_date)
+            end_index = _month_index(*end) if end else None
+
+        if start is None or end_index is None:
+            unparsed += 1
+            months = None
+        else:
+            start_index = _month_index(*start)
+            months = max(0, end_index - start_index)
+            if months:
+                intervals.append((start_index, end_index))
+
+        roles.append({
+            'company': exp.company,
+            'position': exp.position,
+            'start_date': normalize_date(exp.start_date),
+            'end_date': 'Present' if ongoing else normalize_date(exp.end_date),
+            'months': months
+        })
+
+    if unparsed:
+        logger.debug(f"{unparsed} experience entries have unparseable dates")
+
+    return {
+        'total_months': merged_months(intervals),
+        'roles': roles,
+        'unparsed_roles': unparsed
+    }
@@ -0,0 +1,170 @@
+"""
+Reclaims upload storage: files no upload record points at, and files kept past the retention age
+
+Files are examined in batches (one reference query per batch) and the number of
+files examined per second is capped, so a sweep of a large volume does not
+compete with uploads for disk I/O. Upload records are kept; only the stored
+file goes.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import asyncio
+import logging
+import os
+import time
+
+from app.config import config
+from app.services.file_handler import FileHandler
+
+logger = logging.getLogger(__name__)
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+class _Throttle:
+    """Sleeps as needed to keep file operations under a rate (0 for no limit)"""
+
+    def __init__(self, per_second: float):
+        self.per_second = per_second
+        self.start = time.monotonic()
+        self.done = 0
+
+    def wait(self, operations: int) -> None:
+        self.done += operations
+        if self.per_second > 0:
+            delay = self.done / self.per_second - (time.monotonic() - self.start)
+            if delay > 0:
+                time.sleep(delay)
+
+class _Sweep:
+    """State of one sweep: what was deleted and how many bytes it freed"""
+
+    def __init__(self, cutoff: Optional[datetime], files_per_second: float, dry_run: bool):
+        self.cutoff = cutoff
+        self.grace_cutoff = time.time() - config.UPLOAD_BLOB_GRACE_SECONDS
+        self.throttle = _Throttle(files_per_second)
+        self.dry_run = dry_run
+        self.deleted = Counter()
+        self.reclaimed_bytes = 0
+        self.scanned = 0
+
+    def reason(self, upload_date: Optional[datetime], entry: os.DirEntry) -> Optional[str]:
+        """Why a stored file should go, or None to keep it"""
+        if entry.stat().st_mtime >= self.grace_cutoff:
+            return None
+        if upload_date is None:
+            return "orphaned"
+        if self.cutoff is not None and upload_date < self.cutoff:
+            return "expired"
+        return None
+
+    def delete(self, reason: str, entry: os.DirEntry, delete: Callable[[], bool]) -> None:
+        size = entry.stat().st_size
+        if self.dry_run or delete():
+            self.deleted[reason] += 1
+            self.reclaimed_bytes += size
+
+    def end_batch(self, files: int) -> None:
+        self.scanned += files
+        self.throttle.wait(files)
+
+def _unlink(path: str) -> bool:
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+class UploadSweeper:
+    """Deletes orphaned, expired and abandoned upload files"""
+
+    def __init__(self, file_handler: Optional[FileHandler] = None):
+        self.file_handler = file_handler or FileHandler()
+        self.store = self.file_handler.store
+        self.file_repository = self.file_handler.file_repository
+
+    def sweep(self, retention_days: Optional[int] = None, batch_size: Optional[int] = None,
+              files_per_second: Optional[float] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Delete stored files that are no longer needed
+
+        A file is "orphaned" when no upload record references it (e.g. the upload
+        failed after the file was written), "expired" when its newest upload is
+        older than retention_days (0 keeps files forever), and "partial" when it is
+        an interrupted write. Files changed within UPLOAD_BLOB_GRACE_SECONDS are
+        always kept, since an upload in flight may not have committed its record.
+        """
+        retention_days = config.UPLOAD_RETENTION_DAYS if retention_days is None else retention_days
+        batch_size = batch_size or config.UPLOAD_SWEEP_BATCH_SIZE
+        files_per_second = config.UPLOAD_SWEEP_FILES_PER_SECOND if files_per_second is None else files_per_second
+        cutoff = datetime.utcnow() - timedelta(days=retention_days) if retention_days > 0 else None
+
+        start = time.perf_counter()
+        sweep = _Sweep(cutoff, files_per_second, dry_run)
+
+        for batch in _batched(self.store.iter_blobs(), batch_size):
+            upload_dates = self.file_repository.get_latest_upload_dates([sha256 for sha256, _ in batch])
+            for sha256, entry in batch:
+                reason = sweep.reason(upload_dates.get(sha256), entry)
+                if reason:
+                    sweep.delete(reason, entry, lambda: self.store.delete(sha256, config.UPLOAD_BLOB_GRACE_SECONDS))
+            sweep.end_batch(len(batch))
+
+        # Files stored flat under their upload filename, before the blob store
+        partials, legacy = [], []
+        with os.scandir(self.file_handler.upload_folder) as entries:
+            for entry in entries:
+                extension = entry.name.rsplit('.', 1)[-1].lower()
+                if entry.is_file() and extension == 'part':
+                    partials.append(entry)
+                elif entry.is_file() and extension in config.ALLOWED_EXTENSIONS:
+                    legacy.append(entry)
+        for batch in _batched(legacy, batch_size):
+            upload_dates = self.file_repository.get_latest_legacy_upload_dates([entry.name for entry in batch])
+            for entry in batch:
+                reason = sweep.reason(upload_dates.get(entry.name), entry)
+                if reason:
+                    sweep.delete(reason, entry, lambda: _unlink(entry.path))
+            sweep.end_batch(len(batch))
+
+        for batch in _batched([*self.store.iter_partials(), *partials], batch_size):
+            for entry in batch:
+                if entry.stat().st_mtime < sweep.grace_cutoff:
+                    sweep.delete("partial", entry, lambda: _unlink(entry.path))
+            sweep.end_batch(len(batch))
+
+        result = {
+            "scanned": sweep.scanned,
+            "deleted": sum(sweep.deleted.values()),
+            "by_reason": {reason: sweep.deleted[reason] for reason in ("orphaned", "expired", "partial")},
+            "reclaimed_bytes": sweep.reclaimed_bytes,
+            "retention_days": retention_days,
+            "dry_run": dry_run,
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+        logger.info(f"Upload sweep: {result}")
+        return result
+
+async def run_scheduled_upload_sweeps(interval_seconds: int) -> None:
+    """Sweep upload storage periodically, off the event loop"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(get_upload_sweeper().sweep)
+        except Exception as e:
+            logger.warning(f"Scheduled upload sweep failed: {e}")
+
+# Singleton instance, created on first use
+_upload_sweeper: Optional[UploadSweeper] = None
+
+def get_upload_sweeper() -> UploadSweeper:
+    """Get or create the singleton upload sweeper"""
+    global _upload_sweeper
+    if _upload_sweeper is None:
+        _upload_sweeper = UploadSweeper()
+    return _upload_sweeper
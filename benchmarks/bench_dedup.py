@@ -0,0 +1,86 @@
+"""
+Benchmark MinHash/LSH near-duplicate detection over a synthetic CV corpus
+Run with: python -m benchmarks.bench_dedup [--cvs 50000] [--duplicate-rate 0.05]
+"""
+
+import argparse
+import random
+import time
+
+from app.services.dedup import MinHasher, LSHIndex
+
+SECTIONS = ["Summary", "Experience", "Education", "Skills", "Projects", "Certifications"]
+VOCABULARY = (
+    "python java javascript react django flask aws azure gcp docker kubernetes sql postgresql "
+    "mongodb git agile scrum led team delivered built designed implemented migrated improved "
+    "reduced latency revenue customers platform service api pipeline data analytics reporting "
+    "bachelor master university degree computer science engineering certified developer senior "
+    "junior manager analyst consultant banking retail healthcare logistics telecom startup"
+).split()
+
+
+def synthetic_cv(rng: random.Random, words: int = 450) -> str:
+    """Random CV-like text with section headings"""
+    parts = []
+    for section in SECTIONS:
+        parts.append(section)
+        parts.extend(rng.choice(VOCABULARY) for _ in range(words // len(SECTIONS)))
+    return " ".join(parts)
+
+
+def edit(rng: random.Random, text: str, rate: float = 0.01) -> str:
+    """Slightly edited copy - replaces a small share of the words"""
+    tokens = text.split()
+    for i in rng.sample(range(len(tokens)), int(len(tokens) * rate)):
+        tokens[i] = rng.choice(VOCABULARY)
+    return " ".join(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cvs", type=int, default=50000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"Generating {args.cvs} synthetic CVs...")
+    corpus, originals = [], []
+    for i in range(args.cvs):
+        if originals and rng.random() < args.duplicate_rate:
+            source = rng.choice(originals)
+            corpus.append((edit(rng, corpus[source][0]), source))
+        else:
+            originals.append(i)
+            corpus.append((synthetic_cv(rng), None))
+
+    hasher = MinHasher()
+    index = LSHIndex(hasher)
+
+    start = time.perf_counter()
+    signatures = [hasher.signature(text) for text, _ in corpus]
+    sign_seconds = time.perf_counter() - start
+
+    true_positives = false_positives = missed = 0
+    start = time.perf_counter()
+    for key, (signature, (_, duplicate_of)) in enumerate(zip(signatures, corpus)):
+        match = index.query(signature)
+        if duplicate_of is not None:
+            if match:
+                true_positives += 1
+            else:
+                missed += 1
+        elif match:
+            false_positives += 1
+        index.add(key, signature)
+    index_seconds = time.perf_counter() - start
+
+    total = sign_seconds + index_seconds
+    print(f"Signatures:  {sign_seconds:.2f}s ({args.cvs / sign_seconds:,.0f} CVs/s)")
+    print(f"LSH lookups: {index_seconds:.2f}s ({args.cvs / index_seconds:,.0f} CVs/s)")
+    print(f"Total:       {total:.2f}s ({args.cvs / total:,.0f} CVs/s)")
+    print(f"Duplicates found: {true_positives}, missed: {missed}, false positives: {false_positives}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark compressed JSON storage against plain JSON text
+Run with: python -m benchmarks.bench_json_compression [--copies 200] [--cache-mb 2]
+
+Seeds two throwaway databases with the same CV, job and analysis documents (taken
+from cv_analyzer.db when present) and reports their size, the pages each table
+occupies, how much of a table a bounded page cache can hold, and full scan times.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+TABLES = (("cv_records", "parsed_data"), ("job_descriptions", "job_data"), ("analyses", "analysis_data"))
+
+
+def sample_documents(source: str):
+    """Documents of each table from the sample database, or a synthetic set"""
+    if os.path.exists(source):
+        with sqlite3.connect(f"file:{source}?mode=ro", uri=True) as conn:
+            samples = {table: [json.loads(row[0]) for row in conn.execute(f"SELECT {column} FROM {table}")
+                               if isinstance(row[0], str)]
+                       for table, column in TABLES}
+        if all(samples.values()):
+            return samples
+    return {
+        "cv_records": [{"contact_info": {"name": "Ada Lovelace"}, "summary": "Engineer " * 50,
+                        "skills": ["Python", "SQL"] * 10, "experiences": [], "raw_text": "Experience " * 400}],
+        "job_descriptions": [{"job_title": "Engineer", "company": "Acme", "responsibilities": ["Build things"] * 20}],
+        "analyses": [{"suitability_score": 70, "technical_score": 80, "experience_score": 60,
+                      "education_score": 50, "scoring_rationale": "The candidate " * 100,
+                      "matching_skills": ["Python"], "missing_skills": ["Go"]}],
+    }
+
+
+def seed(path: str, samples, copies: int, encode) -> None:
+    """Write `copies` rounds of the sample documents, encoded by `encode`"""
+    from sqlalchemy import create_engine
+    from app.models.database import Base
+
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    with sqlite3.connect(path) as conn:
+        row_id = 0
+        for _ in range(copies):
+            for cv, job, analysis in zip(samples["cv_records"], samples["job_descriptions"] * 50,
+                                         samples["analyses"] * 50):
+                row_id += 1
+                conn.execute("INSERT INTO file_uploads (id, filename, original_filename) VALUES (?, 'f', 'f')",
+                             (row_id,))
+                conn.execute("INSERT INTO cv_records (id, file_upload_id, parsed_data) VALUES (?, ?, ?)",
+                             (row_id, row_id, encode(cv)))
+                conn.execute("INSERT INTO job_descriptions (id, job_title, company, job_data) VALUES (?, 'j', 'c', ?)",
+                             (row_id, encode(job)))
+                conn.execute("INSERT INTO analyses (id, cv_record_id, job_description_id, suitability_score, "
+                             "analysis_data) VALUES (?, ?, ?, 50, ?)", (row_id, row_id, row_id, encode(analysis)))
+        conn.commit()
+        conn.execute("VACUUM")
+
+
+def measure(path: str, cache_mb: int, decode):
+    """Size, per-table pages and scan times of one database"""
+    conn = sqlite3.connect(path)
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    conn.execute(f"PRAGMA cache_size=-{cache_mb * 1024}")
+    cache_pages = cache_mb * 1024 * 1024 // page_size
+    tables = dict(conn.execute("SELECT name, count(*) FROM dbstat GROUP BY name"))
+
+    result = {"file_bytes": os.path.getsize(path), "tables": {}}
+    for table, column in TABLES:
+        timings = []
+        for _ in range(2):  # cold (empty page cache), then warm
+            start = time.perf_counter()
+            for (value,) in conn.execute(f"SELECT {column} FROM {table}"):
+                decode(value)
+            timings.append((time.perf_counter() - start) * 1000)
+        pages = tables.get(table, 0)
+        result["tables"][table] = {
+            "pages": pages,
+            "page_cache_coverage": round(min(1.0, cache_pages / pages), 3) if pages else 1.0,
+            "cold_scan_ms": round(timings[0], 2),
+            "warm_scan_ms": round(timings[1], 2),
+        }
+    conn.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=200)
+    parser.add_argument("--cache-mb", type=int, default=2)
+    parser.add_argument("--source", default="cv_analyzer.db")
+    args = parser.parse_args()
+
+    from app.models.types import compress_json, decompress_json
+
+    samples = sample_documents(args.source)
+    workdir = tempfile.mkdtemp(prefix="bench_json_compression_")
+    plain_path = os.path.join(workdir, "plain.db")
+    compressed_path = os.path.join(workdir, "compressed.db")
+
+    print(f"Seeding {args.copies} copies of the sample documents into {workdir}...")
+    seed(plain_path, samples, args.copies, json.dumps)
+    seed(compressed_path, samples, args.copies, compress_json)
+
+    plain = measure(plain_path, args.cache_mb, json.loads)
+    compressed = measure(compressed_path, args.cache_mb, decompress_json)
+    print(json.dumps({
+        "page_cache_mb": args.cache_mb,
+        "plain_json": plain,
+        "compressed_json": compressed,
+        "size_ratio": round(compressed["file_bytes"] / plain["file_bytes"], 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
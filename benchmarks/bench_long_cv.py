@@ -0,0 +1,115 @@
+"""
+Benchmark parsing long CVs as concurrent page ranges against one call per document
+Run with: python -m benchmarks.bench_long_cv [--pages 12 20] [--base-ms 1500] [--page-ms 900] [--live PATH]
+
+Without --live, Gemini is replaced by a model whose latency grows with the pages
+it is sent (--base-ms + --page-ms per page, about what output generation costs
+for a dense CV page) and which returns one experience per page, so the merge is
+exercised too. With --live PATH, a real PDF is parsed by Gemini both ways.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import re
+import time
+from types import SimpleNamespace
+
+
+def make_pdf(pages: int) -> bytes:
+    """A PDF whose page n reads 'Role n'"""
+    from PyPDF2 import PageObject, PdfWriter
+    from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for number in range(pages):
+        page = PageObject.create_blank_page(None, 612, 792)
+        page[NameObject("/Resources")] = DictionaryObject({NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})})
+        contents = DecodedStreamObject()
+        contents.set_data(f"BT /F1 12 Tf 72 720 Td (Role {number}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(contents)
+        writer.add_page(page)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+class SimulatedModels:
+    """Latency proportional to the pages sent, one experience per page in the answer"""
+
+    def __init__(self, base_ms: float, page_ms: float):
+        self.base_ms = base_ms
+        self.page_ms = page_ms
+
+    def generate_content(self, model, contents):
+        from PyPDF2 import PdfReader
+
+        document = contents[0]["parts"][1]["inline_data"]["data"]
+        pages = PdfReader(io.BytesIO(document)).pages
+        roles = [int(n) for n in re.findall(r"Role (\d+)", "\n".join(page.extract_text() for page in pages))]
+        time.sleep((self.base_ms + self.page_ms * len(pages)) / 1000)
+        return SimpleNamespace(text=json.dumps({
+            "contact_info": {"name": "Ada Lovelace"},
+            "skills": ["Python", "SQL"],
+            "experiences": [{"company": f"Company {n}", "position": "Engineer"} for n in roles],
+        }))
+
+
+async def time_parse(parser, content: bytes, filename: str, threshold: int) -> dict:
+    from app.config import config
+
+    config.LONG_CV_PAGE_THRESHOLD = threshold
+    start = time.perf_counter()
+    structured_cv, _ = await parser.parse_cv_from_bytes(content, filename)
+    return {"ms": round((time.perf_counter() - start) * 1000), "experiences": len(structured_cv.experiences)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[12, 20])
+    parser.add_argument("--base-ms", type=float, default=1500)
+    parser.add_argument("--page-ms", type=float, default=900)
+    parser.add_argument("--live", metavar="PATH", help="Parse this PDF with the real Gemini API")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    from app.config import config
+    from app.services.cv_parser import GeminiCVParser
+
+    config.LLM_PAYLOAD_SHRINK = False
+    if args.live:
+        cv_parser = GeminiCVParser()
+        with open(args.live, "rb") as f:
+            documents = {args.live: f.read()}
+    else:
+        cv_parser = GeminiCVParser.__new__(GeminiCVParser)
+        cv_parser.model = "simulated"
+        cv_parser.client = SimpleNamespace(models=SimulatedModels(args.base_ms, args.page_ms))
+        documents = {f"cv_{pages}_pages.pdf": make_pdf(pages) for pages in args.pages}
+
+    results = {}
+    for filename, content in documents.items():
+        single = asyncio.run(time_parse(cv_parser, content, filename, threshold=0))
+        chunked = asyncio.run(time_parse(cv_parser, content, filename, threshold=1))
+        results[filename] = {
+            "single_call": single,
+            "page_ranges": chunked,
+            "speedup": round(single["ms"] / chunked["ms"], 2),
+        }
+    print(json.dumps({
+        "pages_per_chunk": config.LONG_CV_PAGES_PER_CHUNK,
+        "concurrency": config.LLM_PARSE_CONCURRENCY,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
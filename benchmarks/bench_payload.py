@@ -0,0 +1,186 @@
+"""
+Benchmark LLM payload shrinking: bytes sent per parse and the cost of shrinking
+Run with: python -m benchmarks.bench_payload [--documents 20] [--photo-side 600] [--live]
+
+Builds CV-like PDF and DOCX documents with a photo, a logo and (for the PDF) an
+embedded font, then reports original and shrunk sizes, shrink time in a single
+process, and the throughput of the process pool along with how long the event
+loop stalls meanwhile (a thread shrinking a document holds the GIL). With --live (and a real
+GEMINI_API_KEY) each document is also parsed by Gemini as is and shrunk, to
+compare the parse latency.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import statistics
+import struct
+import time
+import zlib
+
+
+def make_png(side: int) -> bytes:
+    """A noisy RGB PNG (noise does not compress, like a photo)"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + os.urandom(side * 3) for _ in range(side))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", side, side, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+def make_docx(photo_side: int, paragraphs: int = 60) -> bytes:
+    from docx import Document
+    from docx.shared import Inches
+
+    document = Document()
+    document.add_picture(io.BytesIO(make_png(photo_side)), width=Inches(1.5))
+    document.add_heading("Ada Lovelace", 0)
+    for i in range(paragraphs):
+        document.add_paragraph(f"Role {i}: built data pipelines in Python and SQL for client {i * 7919 % 1000}.")
+    document.add_picture(io.BytesIO(make_png(photo_side // 3)), width=Inches(0.5))
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def make_pdf(photo_side: int, pages: int = 2, font_bytes: int = 60_000) -> bytes:
+    from PyPDF2 import PageObject, PdfWriter
+    from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+    def stream(data: bytes, **entries) -> DecodedStreamObject:
+        obj = DecodedStreamObject()
+        obj.set_data(data)
+        obj.update({NameObject(f"/{key}"): value for key, value in entries.items()})
+        return obj
+
+    writer = PdfWriter()
+    photo = writer._add_object(stream(
+        os.urandom(photo_side * photo_side * 3), Type=NameObject("/XObject"), Subtype=NameObject("/Image"),
+        Width=NumberObject(photo_side), Height=NumberObject(photo_side),
+        ColorSpace=NameObject("/DeviceRGB"), BitsPerComponent=NumberObject(8)
+    ))
+    descriptor = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/FontDescriptor"),
+        NameObject("/FontName"): NameObject("/CVSans"),
+        NameObject("/Flags"): NumberObject(32),
+        NameObject("/FontFile2"): writer._add_object(stream(os.urandom(font_bytes))),
+    }))
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/TrueType"),
+        NameObject("/BaseFont"): NameObject("/CVSans"),
+        NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+        NameObject("/FontDescriptor"): descriptor,
+    }))
+    for number in range(pages):
+        page = PageObject.create_blank_page(None, 612, 792)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/XObject"): DictionaryObject({NameObject("/Im0"): photo}),
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        lines = "".join(f"0 -16 Td (Role {i}: built data pipelines in Python and SQL) Tj "
+                        for i in range(number * 40, number * 40 + 40))
+        page[NameObject("/Contents")] = writer._add_object(stream(
+            f"q 120 0 0 120 420 640 cm /Im0 Do Q BT /F1 11 Tf 72 740 Td {lines}ET".encode()
+        ))
+        writer.add_page(page)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def measure_sizes(documents: dict) -> dict:
+    from app.services.payload import shrink_document
+
+    results = {}
+    for filename, content in documents.items():
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            shrunk = shrink_document(content, filename)
+            timings.append((time.perf_counter() - start) * 1000)
+        results[filename] = {
+            "original_bytes": len(content),
+            "sent_bytes": len(shrunk),
+            "saved_pct": round(100 * (1 - len(shrunk) / len(content)), 1),
+            "shrink_median_ms": round(statistics.median(timings), 2),
+        }
+    return results
+
+
+async def loop_lag(stop: asyncio.Event, lags: list) -> None:
+    """Lateness of a 5 ms timer: how long the event loop (and so every request) was held up"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append((time.perf_counter() - start) * 1000 - 5)
+
+
+async def measure_pool(documents: dict, count: int) -> dict:
+    from app.config import config
+    from app.services.payload import shrink_for_llm, close_payload_pool
+
+    batch = [(content, name) for name, content in documents.items()] * (count // len(documents))
+    results = {}
+    for workers in (0, config.LLM_PAYLOAD_WORKERS or 2):
+        config.LLM_PAYLOAD_WORKERS = workers
+        close_payload_pool()
+        await shrink_for_llm(*batch[0])  # Start the pool outside the timing
+        stop, lags = asyncio.Event(), []
+        ticker = asyncio.create_task(loop_lag(stop, lags))
+        start = time.perf_counter()
+        await asyncio.gather(*(shrink_for_llm(content, name) for content, name in batch))
+        seconds = time.perf_counter() - start
+        stop.set()
+        await ticker
+        results["thread" if workers == 0 else f"process_pool_{workers}"] = {
+            "documents": len(batch),
+            "seconds": round(seconds, 3),
+            "loop_lag_p95_ms": round(sorted(lags)[int(len(lags) * 0.95) - 1], 2),
+            "loop_lag_max_ms": round(max(lags), 2),
+        }
+    close_payload_pool()
+    return results
+
+
+async def measure_live(documents: dict) -> dict:
+    from app.services.cv_parser import get_cv_parser
+    from app.services.payload import shrink_document
+
+    parser = get_cv_parser()
+    results = {}
+    for filename, content in documents.items():
+        row = {}
+        for label, payload in (("original", content), ("shrunk", shrink_document(content, filename))):
+            start = time.perf_counter()
+            await parser._parse_with_retry(payload, filename)
+            row[f"{label}_parse_ms"] = round((time.perf_counter() - start) * 1000)
+        results[filename] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=20, help="Documents pushed through the pool")
+    parser.add_argument("--photo-side", type=int, default=600)
+    parser.add_argument("--live", action="store_true", help="Also time real Gemini parses")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    documents = {"cv.pdf": make_pdf(args.photo_side), "cv.docx": make_docx(args.photo_side)}
+    report = {
+        "sizes": measure_sizes(documents),
+        "pool": asyncio.run(measure_pool(documents, args.documents)),
+    }
+    if args.live:
+        report["live"] = asyncio.run(measure_live(documents))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
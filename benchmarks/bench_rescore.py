@@ -0,0 +1,67 @@
+"""
+Benchmark bulk re-scoring of stored analyses after a weight change
+Run with: python -m benchmarks.bench_rescore [--analyses 100000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+
+def seed_database(path: str, count: int, seed: int = 7) -> None:
+    """Create a throwaway database with `count` analyses"""
+    rng = random.Random(seed)
+    hire = ["strong yes", "yes", "maybe", "no", None]
+    rows = []
+    for i in range(count):
+        data = {
+            "technical_score": rng.randint(0, 100),
+            "experience_score": rng.choice([30, 40, 60, 70, 90, 100]),
+            "education_score": rng.choice([30, 50, 80, 100]),
+            "hire_recommendation": rng.choice(hire),
+            "scoring_rationale": "Synthetic analysis " * 20,
+            "matching_skills": ["Python", "SQL", "Docker"],
+            "missing_skills": ["Kubernetes"],
+        }
+        data["suitability_score"] = rng.randint(0, 100)
+        rows.append((i + 1, 1, 1, data["suitability_score"], json.dumps(data)))
+
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO analyses (id, cv_record_id, job_description_id, suitability_score, analysis_data, analysis_date) "
+            "VALUES (?, ?, ?, ?, ?, datetime('now'))",
+            rows
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--analyses", type=int, default=100000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_rescore_")
+    os.environ["DATABASE_NAME"] = os.path.join(workdir, "bench.db")
+
+    # Import after pointing the app at the throwaway database
+    from app.repositories.base_repository import init_db
+    from app.services.analysis_service import get_analysis_service
+
+    init_db()
+
+    print(f"Seeding {args.analyses} analyses into {os.environ['DATABASE_NAME']}...")
+    seed_database(os.environ["DATABASE_NAME"], args.analyses)
+
+    start = time.perf_counter()
+    result = get_analysis_service().rescore_all(weights={"technical": 0.5, "experience": 0.3, "education": 0.2})
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps(result, indent=2))
+    print(f"Re-scored {result['total_analyses']} analyses in {elapsed:.2f}s with zero LLM calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark concurrent reads while analyses are being written, default SQLite settings vs the tuned pragmas
+Run with: python -m benchmarks.bench_sqlite_concurrency [--readers 4] [--seconds 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+
+def run(path: str, tuned: bool, readers: int, seconds: float) -> dict:
+    """Hammer one database with a committing writer and several readers"""
+    from sqlalchemy import create_engine, event, text
+    from app.models.database import Base
+    from app.repositories.base_repository import apply_sqlite_pragmas
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False},
+                           pool_size=readers + 1)
+    if tuned:
+        event.listen(engine, 'connect', apply_sqlite_pragmas)
+    Base.metadata.create_all(bind=engine)
+
+    payload = json.dumps({"technical_score": 70, "scoring_rationale": "Synthetic analysis " * 50})
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO analyses (cv_record_id, job_description_id, suitability_score, analysis_data, analysis_date) "
+            "VALUES (1, 1, :score, :data, datetime('now'))"
+        ), [{"score": i % 100, "data": payload} for i in range(5000)])
+
+    stop = threading.Event()
+    writes = [0]
+    read_latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def writer():
+        while not stop.is_set():
+            try:
+                # One transaction per analysis, like AnalysisRepository.save_analysis
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        "INSERT INTO analyses (cv_record_id, job_description_id, suitability_score, analysis_data, analysis_date) "
+                        "VALUES (1, 1, 50, :data, datetime('now'))"
+                    ), {"data": payload})
+                writes[0] += 1
+            except Exception:
+                with lock:
+                    errors[0] += 1
+
+    def reader():
+        local = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text(
+                        "SELECT id, suitability_score FROM analyses ORDER BY analysis_date DESC LIMIT 20"
+                    )).all()
+                    conn.execute(text("SELECT COUNT(*), AVG(suitability_score) FROM analyses")).one()
+                local.append(time.perf_counter() - start)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            read_latencies.extend(local)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    with engine.connect() as conn:
+        journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+    engine.dispose()
+
+    read_latencies.sort()
+    return {
+        "journal_mode": journal_mode,
+        "writes_per_sec": round(writes[0] / seconds, 1),
+        "reads_per_sec": round(len(read_latencies) / seconds, 1),
+        "read_p50_ms": round(statistics.median(read_latencies) * 1000, 2) if read_latencies else None,
+        "read_p99_ms": round(read_latencies[int(len(read_latencies) * 0.99) - 1] * 1000, 2) if read_latencies else None,
+        "errors": errors[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_sqlite_")
+    os.environ["DATABASE_NAME"] = os.path.join(workdir, "app.db")
+
+    results = {}
+    for name, tuned in (("default", False), ("tuned", True)):
+        results[name] = run(os.path.join(workdir, f"{name}.db"), tuned, args.readers, args.seconds)
+        print(f"{name:>8}: {json.dumps(results[name])}")
+
+    default, tuned = results["default"], results["tuned"]
+    if default["reads_per_sec"] and default["writes_per_sec"]:
+        print(f"Reads/sec x{tuned['reads_per_sec'] / default['reads_per_sec']:.1f}, "
+              f"writes/sec x{tuned['writes_per_sec'] / default['writes_per_sec']:.1f} with the tuned profile")
+
+
+if __name__ == "__main__":
+    main()
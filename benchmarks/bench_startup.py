@@ -0,0 +1,86 @@
+"""
+Benchmark cold start: importing app.main, running the startup hook and serving the first request
+Run with: python -m benchmarks.bench_startup [--runs 5] [--top 10]
+
+Every run is a fresh interpreter against a copy of cv_analyzer.db (or an empty
+database), so nothing is cached between runs apart from the OS file cache.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs in the child interpreter; prints the phase timings as JSON
+CHILD = """
+import json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    started = time.perf_counter()
+    client.get("/api/stats").raise_for_status()
+    first_request = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - imported) * 1000,
+    "first_request_ms": (first_request - started) * 1000,
+    "total_ms": (first_request - start) * 1000,
+    "genai_imported": __import__("sys").modules.get("google.genai") is not None,
+}))
+"""
+
+
+def child_env(database: str) -> dict:
+    env = dict(os.environ, DATABASE_NAME=database, PYTHONWARNINGS="ignore")
+    env.setdefault("GEMINI_API_KEY", "benchmark")
+    return env
+
+
+def slowest_imports(database: str, top: int):
+    """Modules with the largest cumulative import time (python -X importtime)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                            env=child_env(database), capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), module))
+    return [{"module": module, "cumulative_ms": round(us / 1000, 1)} for us, module in sorted(rows, reverse=True)[:top]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--source", default="cv_analyzer.db")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    runs = []
+    for i in range(args.runs):
+        database = os.path.join(workdir, f"run{i}.db")
+        if os.path.exists(args.source):
+            shutil.copy2(args.source, database)
+        output = subprocess.run([sys.executable, "-c", CHILD], env=child_env(database),
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {key: round(statistics.median(run[key] for run in runs), 1)
+               for key in ("import_ms", "startup_ms", "first_request_ms", "total_ms")}
+    summary["genai_imported_at_startup"] = any(run["genai_imported"] for run in runs)
+    print(json.dumps({
+        "runs": args.runs,
+        "median": summary,
+        "slowest_imports": slowest_imports(os.path.join(workdir, "run0.db"), args.top),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
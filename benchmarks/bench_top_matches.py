@@ -0,0 +1,92 @@
+"""
+Benchmark top-K matches for a job with many analyses
+Run with: python -m benchmarks.bench_top_matches [--analyses 20000] [--cvs 5000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+
+def seed_database(path: str, analyses: int, cvs: int, seed: int = 11) -> None:
+    """Create a throwaway database where job 1 has `analyses` analyses over `cvs` CVs"""
+    rng = random.Random(seed)
+    payload = json.dumps({"scoring_rationale": "Synthetic analysis " * 40, "detailed_analysis": {"notes": "x" * 2000}})
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO file_uploads (id, filename, original_filename, file_size, file_type, upload_date) "
+            "VALUES (?, ?, ?, 1000, 'pdf', datetime('now'))",
+            [(i, f"cv_{i}.pdf", f"cv_{i}.pdf") for i in range(1, cvs + 1)]
+        )
+        conn.executemany(
+            "INSERT INTO cv_records (id, file_upload_id, parsed_data, contact_name, parsed_date) "
+            "VALUES (?, ?, '{}', ?, datetime('now'))",
+            [(i, i, f"Candidate {i}") for i in range(1, cvs + 1)]
+        )
+        conn.execute(
+            "INSERT INTO job_descriptions (id, job_title, company, job_data, is_active, created_at) "
+            "VALUES (1, 'Engineer', 'Acme', '{}', 1, datetime('now'))"
+        )
+        conn.executemany(
+            "INSERT INTO analyses (cv_record_id, job_description_id, suitability_score, technical_score, "
+            "experience_score, education_score, analysis_data, analysis_date) "
+            "VALUES (?, 1, ?, 50, 50, 50, ?, datetime('now', ?))",
+            [(rng.randint(1, cvs), rng.randint(0, 100), payload, f"-{rng.randint(0, 100000)} minutes")
+             for _ in range(analyses)]
+        )
+
+
+def timed(fn, repeat: int = 50) -> float:
+    """Best wall time of `repeat` calls in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--analyses", type=int, default=20000)
+    parser.add_argument("--cvs", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_top_matches_")
+    os.environ["DATABASE_NAME"] = os.path.join(workdir, "bench.db")
+
+    # Import after pointing the app at the throwaway database
+    from sqlalchemy import text
+    from app.repositories.analysis_repository import AnalysisRepository, _top_matches_query
+    from app.repositories.base_repository import get_engine, init_db
+
+    init_db()
+    engine = get_engine()
+
+    print(f"Seeding {args.analyses} analyses for one job into {os.environ['DATABASE_NAME']}...")
+    seed_database(os.environ["DATABASE_NAME"], args.analyses, args.cvs)
+
+    repository = AnalysisRepository()
+    with engine.connect() as conn:
+        statement = _top_matches_query(1, args.limit).compile(engine, compile_kwargs={"literal_binds": True})
+        plan = conn.execute(text(f"EXPLAIN QUERY PLAN {statement}")).all()
+    print("Query plan:", "; ".join(row[-1] for row in plan))
+
+    results = {
+        "load_all_then_slice_ms": round(timed(lambda: repository.get_analyses_by_job(1)[:args.limit], repeat=3), 3),
+        "top_k_ms": round(timed(lambda: repository.get_top_matches_for_job(1, args.limit)), 3),
+        "top_k_latest_per_cv_ms": round(timed(lambda: repository.get_top_matches_for_job(1, args.limit, latest_per_cv=True), repeat=10), 3),
+    }
+    with engine.connect() as conn:
+        raw = _top_matches_query(1, args.limit)
+        results["top_k_query_only_ms"] = round(timed(lambda: conn.execute(raw).all()), 3)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
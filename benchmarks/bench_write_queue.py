@@ -0,0 +1,88 @@
+"""
+Benchmark concurrent analysis writes: direct sessions vs the single-writer queue
+Run with: python -m benchmarks.bench_write_queue [--writes 2000] [--threads 32]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def make_response():
+    from app.models.schemas import AnalysisResponse
+
+    return AnalysisResponse(
+        suitability_score=72, technical_score=80, experience_score=65, education_score=60,
+        scoring_rationale="Synthetic analysis " * 30, matching_skills=["Python", "SQL"],
+        missing_skills=["Kubernetes"], hire_recommendation="yes"
+    )
+
+
+def run(label: str, writes: int, threads: int, write) -> dict:
+    """Issue `writes` concurrent writes from `threads` threads and time each one"""
+    latencies, errors = [], []
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            write(i)
+        except Exception as e:
+            errors.append(type(e).__name__ + ": " + str(e).splitlines()[0])
+            return
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(writes)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "mode": label,
+        "writes_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2) if latencies else None,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_write_queue_")
+    os.environ["DATABASE_NAME"] = os.path.join(workdir, "bench.db")
+
+    # Import after pointing the app at the throwaway database
+    from app.repositories.analysis_repository import AnalysisRepository
+    from app.repositories.base_repository import init_db
+    from app.repositories.write_queue import WriteQueue
+
+    init_db()
+
+    repository = AnalysisRepository()
+    response = make_response()
+
+    def save(i):
+        return repository.save_analysis_result(i % 50 + 1, i % 7 + 1, response, analysis_duration=1.0)
+
+    results = [run("direct", args.writes, args.threads, save)]
+
+    write_queue = WriteQueue()
+    results.append(run("write_queue", args.writes, args.threads, lambda i: write_queue.execute(save, i)))
+    write_queue.close()
+    results[-1]["batches"] = write_queue.batches
+    results[-1]["mean_batch_size"] = round(write_queue.writes / max(write_queue.batches, 1), 1)
+
+    print(json.dumps({"writes": args.writes, "threads": args.threads, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
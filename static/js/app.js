@@ -398,7 +398,8 @@ function app() {
                 const result = await response.json();
                 this.recentAnalyses = (result.data || []).map(analysis => {
                     // Extract key information from the analysis record
-                    const analysisData = analysis.analysis_data || {};
+                    // List rows are summaries: scores sit on the row itself
+                    const analysisData = analysis.analysis_data || analysis;
                     const cvRecord = analysis.cv_record || {};
                     const jobRecord = analysis.job_description || {};
                     
@@ -425,9 +426,7 @@ function app() {
                         job_title: jobTitle,
                         cv_name: cvName,
                         score: analysisData.suitability_score || analysis.suitability_score || 0,
-                        analysis_date: analysis.analysis_date || analysis.created_at || new Date().toISOString(),
-                        // Store the full analysis record for later use
-                        _fullRecord: analysis
+                        analysis_date: analysis.analysis_date || analysis.created_at || new Date().toISOString()
                     };
                 });
             } catch (error) {
@@ -461,7 +460,7 @@ function app() {
             if (!file) return;
             
             // Validate file type - hard coded allowed types
-            const allowedTypes = ['.pdf', '.docx'];
+            const allowedTypes = ['.pdf', '.docx', '.png', '.jpg', '.jpeg'];
             const fileExtension = '.' + file.name.split('.').pop().toLowerCase();
             
             if (!allowedTypes.includes(fileExtension)) {
@@ -781,21 +780,12 @@ function app() {
             this.showNotification('Loading previous analysis...', 'info');
             
             try {
-                // First check if we have the analysis in our recent analyses cache
-                const cachedAnalysis = this.recentAnalyses.find(a => a.id === analysisId);
-                let analysisRecord;
+                // List endpoints only return summaries, the full record comes from the detail endpoint
+                const response = await fetch(`/api/analyses/${analysisId}`);
+                if (!response.ok) throw new Error('Failed to load analysis');
                 
-                if (cachedAnalysis && cachedAnalysis._fullRecord) {
-                    // Use cached data if available
-                    analysisRecord = cachedAnalysis._fullRecord;
-                } else {
-                    // Otherwise fetch from API
-                    const response = await fetch(`/api/analyses/${analysisId}`);
-                    if (!response.ok) throw new Error('Failed to load analysis');
-                    
-                    const result = await response.json();
-                    analysisRecord = result.data || result;
-                }
+                const result = await response.json();
+                const analysisRecord = result.data || result;
                 
                 // Extract and set the analysis result from analysis_data field
                 if (analysisRecord.analysis_data) {
@@ -1001,7 +991,8 @@ function app() {
                 
                 const result = await response.json();
                 this.allAnalyses = (result.data || []).map(analysis => {
-                    const analysisData = analysis.analysis_data || {};
+                    // List rows are summaries: scores sit on the row itself
+                    const analysisData = analysis.analysis_data || analysis;
                     const cvRecord = analysis.cv_record || {};
                     const jobRecord = analysis.job_description || {};
                     
@@ -1033,8 +1024,7 @@ function app() {
                         technical_score: analysisData.technical_score || 0,
                         experience_score: analysisData.experience_score || 0,
                         education_score: analysisData.education_score || 0,
-                        analysis_date: analysis.analysis_date || analysis.created_at || new Date().toISOString(),
-                        _fullRecord: analysis
+                        analysis_date: analysis.analysis_date || analysis.created_at || new Date().toISOString()
                     };
                 });
                 
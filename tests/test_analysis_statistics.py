@@ -0,0 +1,103 @@
+"""
+Tests for the incrementally maintained analysis statistics rollup
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Analysis, AnalysisDailyCount, AnalysisStats, CVRecord, FileUpload, JobDescription
+from app.models.schemas import AnalysisResponse
+from app.repositories import analysis_repository, base_repository
+from app.repositories.analysis_repository import AnalysisRepository
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+
+    now = datetime.utcnow()
+    with base_repository.unit_of_work() as db:
+        db.add(FileUpload(id=1, filename='cv.pdf', original_filename='cv.pdf'))
+        db.add(CVRecord(id=1, file_upload_id=1, parsed_data={}))
+        db.add(JobDescription(id=1, job_title='Engineer', company='Acme', job_data={}))
+        for id, score, age_days in ((1, 85, 0), (2, 65, 2), (3, 30, 30)):
+            db.add(Analysis(id=id, cv_record_id=1, job_description_id=1, suitability_score=score,
+                            analysis_data={}, analysis_date=now - timedelta(days=age_days)))
+    return AnalysisRepository()
+
+
+def save_analysis(repository, score):
+    return repository.save_analysis_result(1, 1, AnalysisResponse(
+        suitability_score=score, technical_score=score, experience_score=score, education_score=score,
+        scoring_rationale='', matching_skills=[], missing_skills=[]
+    ))['id']
+
+
+def stored_rollup(repository):
+    with repository.get_db() as db:
+        stats = db.get(AnalysisStats, analysis_repository.STATS_ROW_ID)
+        days = {row.day: row.count for row in db.query(AnalysisDailyCount)}
+        return stats and (stats.total_count, stats.score_sum, stats.excellent, stats.good, stats.fair, stats.poor), days
+
+
+def test_rollup_is_built_on_first_read(repository):
+    assert stored_rollup(repository) == (None, {})
+
+    stats = repository.get_analysis_statistics()
+
+    assert stats == {
+        'total_analyses': 3,
+        'average_score': 60.0,
+        'recent_analyses': 2,
+        'score_distribution': {'excellent': 1, 'good': 1, 'fair': 0, 'poor': 1}
+    }
+    assert stored_rollup(repository)[0] == (3, 180, 1, 1, 0, 1)
+
+
+def test_writes_before_the_first_read_are_counted_once(repository):
+    save_analysis(repository, 50)
+
+    assert repository.get_analysis_statistics()['total_analyses'] == 4
+
+
+def test_saves_and_deletes_keep_the_rollup_in_step(repository):
+    repository.get_analysis_statistics()
+    new_id = save_analysis(repository, 90)
+    save_analysis(repository, 45)
+    assert repository.delete(2)
+    assert repository.delete(new_id)
+    assert not repository.delete(999)
+
+    incremental = stored_rollup(repository)
+    stats = repository.get_analysis_statistics()
+    assert stats['total_analyses'] == 3
+    assert stats['score_distribution'] == {'excellent': 1, 'good': 0, 'fair': 1, 'poor': 1}
+    assert stats['recent_analyses'] == 2
+
+    repository.rebuild_statistics()
+    rebuilt = stored_rollup(repository)
+    assert incremental[0] == rebuilt[0]
+    assert {day: count for day, count in incremental[1].items() if count} == rebuilt[1]
+
+
+def test_daily_count_upsert_per_dialect(repository, monkeypatch):
+    today = date.today()
+    assert 'ON CONFLICT' in str(analysis_repository._daily_count_upsert('postgresql', today, 1)
+                                .compile(dialect=postgresql.dialect()))
+    assert 'ON DUPLICATE KEY UPDATE' in str(analysis_repository._daily_count_upsert('mysql', today, 1)
+                                            .compile(dialect=mysql.dialect()))
+    assert analysis_repository._daily_count_upsert('oracle', today, 1) is None
+
+    # Dialects without an upsert fall back to update-then-insert
+    monkeypatch.setattr(analysis_repository, '_daily_count_upsert', lambda *args: None)
+    day = today - timedelta(days=100)
+    with repository.get_db() as db:
+        analysis_repository._add_to_daily_count(db, day, 2)
+        analysis_repository._add_to_daily_count(db, day, -1)
+    assert stored_rollup(repository)[1] == {day: 1}
@@ -0,0 +1,57 @@
+"""
+Tests for archiving analyses out of the hot table
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Analysis, ArchivedAnalysis, CVRecord, FileUpload, JobDescription
+from app.repositories import base_repository
+from app.repositories.analysis_repository import AnalysisRepository
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+
+    now = datetime.utcnow()
+    with base_repository.unit_of_work() as db:
+        db.add(FileUpload(id=1, filename='cv.pdf', original_filename='cv.pdf'))
+        db.add(CVRecord(id=1, file_upload_id=1, parsed_data={'contact_info': {'name': 'Ada'}}))
+        db.add(JobDescription(id=1, job_title='Open role', company='Acme', job_data={}, is_active=True))
+        db.add(JobDescription(id=2, job_title='Closed role', company='Acme', job_data={}, is_active=False))
+        for id, job_id, score, age_days in ((1, 1, 90, 1), (2, 1, 50, 400), (3, 2, 70, 1)):
+            db.add(Analysis(id=id, cv_record_id=1, job_description_id=job_id, suitability_score=score,
+                            analysis_data={'suitability_score': score}, analysis_date=now - timedelta(days=age_days)))
+    return AnalysisRepository()
+
+
+def test_archiving_moves_old_and_inactive_job_analyses(repository):
+    assert repository.get_analysis_statistics()['total_analyses'] == 3
+
+    archived = repository.archive_analyses(datetime.utcnow() - timedelta(days=365), batch_size=1)
+
+    assert archived == {'age': 1, 'inactive_job': 1}
+    with repository.get_db() as db:
+        assert [analysis.id for analysis in db.query(Analysis)] == [1]
+        assert {row.id: row.archive_reason for row in db.query(ArchivedAnalysis)} == {2: 'age', 3: 'inactive_job'}
+    stats = repository.get_analysis_statistics()
+    assert stats['total_analyses'] == 1
+    assert stats['score_distribution'] == {'excellent': 1, 'good': 0, 'fair': 0, 'poor': 0}
+    assert repository.rebuild_statistics()['total_analyses'] == 1
+
+
+def test_archived_analyses_stay_readable_by_id(repository):
+    repository.archive_analyses(None, inactive_jobs=True)
+
+    details = repository.get_analysis_with_details(3)
+    assert details['archived'] is True
+    assert details['analysis'] == {'suitability_score': 70}
+    assert details['job_details']['title'] == 'Closed role'
+    assert repository.get_analysis_with_details(1)['archived'] is False
+    assert repository.get_analysis_with_details(99) is None
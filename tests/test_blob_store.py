@@ -0,0 +1,45 @@
+"""
+Tests for the content-addressed upload store
+"""
+
+import hashlib
+import os
+import time
+
+import pytest
+
+from app.services.blob_store import BlobStore
+
+
+def test_blobs_are_sharded_by_digest_and_stored_once(tmp_path):
+    store = BlobStore(tmp_path)
+    content = b'%PDF-1.4 cv'
+    sha256 = hashlib.sha256(content).hexdigest()
+
+    path = store.put(content, sha256)
+    assert path == tmp_path / sha256[:2] / sha256[2:4] / sha256
+    assert path.read_bytes() == content
+
+    duplicate = store.temp_path()
+    duplicate.write_bytes(content)
+    assert store.put_file(duplicate, sha256) == path
+    assert not duplicate.exists()
+    assert list(store.tmp.iterdir()) == []
+    assert [p for p in tmp_path.rglob('*') if p.is_file()] == [path]
+
+
+def test_digest_is_validated(tmp_path):
+    with pytest.raises(ValueError):
+        BlobStore(tmp_path).path('../../etc/passwd')
+
+
+def test_recently_stored_blobs_survive_delete(tmp_path):
+    store = BlobStore(tmp_path)
+    sha256 = hashlib.sha256(b'cv').hexdigest()
+    path = store.put(b'cv', sha256)
+
+    assert store.delete(sha256, min_age_seconds=60) is False
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    assert store.delete(sha256, min_age_seconds=60) is True
+    assert not store.exists(sha256)
+    assert store.delete(sha256) is False
@@ -0,0 +1,114 @@
+"""
+Tests for chunked NDJSON imports and resuming them
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app.api.routes import router
+from app.config import config
+from app.models.database import JobDescription
+from app.repositories import base_repository
+from app.repositories.job_description_repository import JobDescriptionRepository
+from app.services.bulk_import import BulkImportService
+
+
+@pytest.fixture(autouse=True)
+def engine(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+    return engine
+
+
+def job_lines(count):
+    return [json.dumps({'job_title': f'Job {n}', 'company': 'Acme'}) for n in range(1, count + 1)]
+
+
+def job_titles(engine):
+    with engine.connect() as conn:
+        return list(conn.execute(select(JobDescription.job_title).order_by(JobDescription.id)).scalars())
+
+
+def test_each_chunk_commits_on_its_own(engine):
+    lines = job_lines(5)
+    lines[2] = '{"company": "no title"}'
+    reports = []
+
+    final = BulkImportService().import_lines('jobs', lines, batch_size=2, on_progress=reports.append)
+
+    assert [report['lines_done'] for report in reports] == [2, 4, 5]
+    assert [report['imported'] for report in reports] == [2, 3, 4]
+    assert final['done'] and final['invalid'] == 1 and final['errors'][0]['line'] == 3
+    assert job_titles(engine) == ['Job 1', 'Job 2', 'Job 4', 'Job 5']
+
+
+def test_interrupted_import_resumes_after_the_last_committed_chunk(engine):
+    service = BulkImportService()
+    lines = job_lines(5)
+    states = []
+
+    def interrupt(report):
+        states.append(report)
+        raise KeyboardInterrupt
+
+    state = service.start_import('jobs')
+    with pytest.raises(KeyboardInterrupt):
+        service.import_lines('jobs', lines, batch_size=2, state=state, on_progress=interrupt)
+    assert state['lines_done'] == 2
+    assert job_titles(engine) == ['Job 1', 'Job 2']
+
+    final = service.import_lines('jobs', lines, batch_size=2, state=state)
+    assert final['lines_done'] == 5 and final['imported'] == 5
+    assert job_titles(engine) == [f'Job {n}' for n in range(1, 6)]
+
+
+def import_client():
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_import_route_skips_committed_lines_and_limits_the_body(engine, monkeypatch):
+    client = import_client()
+    body = '\n'.join(job_lines(5))
+
+    assert client.post('/api/import/jobs?skip=3', content=body).status_code == 400
+    response = client.post('/api/import/jobs?batch_size=2&skip=3&index_from_id=0', content=body)
+    reports = [json.loads(line) for line in response.text.splitlines()]
+    assert [report['lines_done'] for report in reports] == [5, 5]
+    assert reports[-1]['done'] and reports[-1]['imported'] == 2
+    assert job_titles(engine) == ['Job 4', 'Job 5']
+
+    monkeypatch.setattr(config, 'IMPORT_MAX_BODY_MB', 0)
+    response = client.post('/api/import/jobs', content=body)
+    assert response.status_code == 413
+    assert job_titles(engine) == ['Job 4', 'Job 5']
+
+
+def test_resumed_import_indexes_the_rows_of_the_interrupted_run(engine):
+    lines = job_lines(5)
+
+    async def interrupted_run():
+        stream = BulkImportService().import_stream('jobs', iter(lines), batch_size=2)
+        report = await stream.__anext__()
+        await stream.aclose()  # The client went away after the first chunk
+        return report
+
+    report = asyncio.run(interrupted_run())
+    assert report['lines_done'] == 2 and report['index_from_id'] == 0
+
+    response = import_client().post(
+        f"/api/import/jobs?batch_size=2&skip={report['lines_done']}&index_from_id={report['index_from_id']}",
+        content='\n'.join(lines)
+    )
+    assert json.loads(response.text.splitlines()[-1])['imported'] == 3
+
+    found = JobDescriptionRepository().search_jobs('job', limit=10)
+    assert sorted(job['job_title'] for job in found) == [f'Job {n}' for n in range(1, 6)]
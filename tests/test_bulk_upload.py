@@ -0,0 +1,100 @@
+"""
+Tests for bulk CV uploads
+"""
+
+import asyncio
+import io
+import zipfile
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.config import config
+from app.models.schemas import StructuredCV
+from app.repositories import base_repository
+from app.services import cv_processor as cv_processor_module
+from app.services.bulk_upload import BulkUploadService
+from app.services.cv_processor import CVProcessor
+from app.services.file_handler import FileHandler
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+    monkeypatch.setattr(config, 'DEDUP_ENABLED', False)
+    monkeypatch.setattr(config, 'LLM_PARSE_CONCURRENCY', 2)
+
+    in_flight = {'now': 0, 'max': 0}
+
+    async def parse_cv_bytes(content, filename):
+        in_flight['now'] += 1
+        in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        await asyncio.sleep(0.01)
+        in_flight['now'] -= 1
+        if b'corrupt' in content:
+            raise ValueError('Could not parse CV')
+        structured_cv = StructuredCV(contact_info={'name': content.decode()}, skills=['Python'])
+        return structured_cv, structured_cv.dict()
+
+    monkeypatch.setattr(cv_processor_module, 'parse_cv_bytes', parse_cv_bytes)
+    processor = CVProcessor()
+    processor.file_handler = FileHandler(str(tmp_path))
+    service = BulkUploadService(processor)
+    service.in_flight = in_flight
+    return service
+
+
+def _zip(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in entries.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+def _run(service, files):
+    async def collect():
+        return [result async for result in service.upload_stream(files)]
+    return asyncio.run(collect())
+
+
+def test_zip_and_files_are_parsed_with_bounded_concurrency(service):
+    archive = _zip({f'cvs/cv{i}.pdf': f'Candidate {i}' for i in range(5)} | {'__MACOSX/._cv0.pdf': 'x'})
+    files = [UploadFile(archive, filename='batch.zip'), UploadFile(io.BytesIO(b'Single'), filename='single.docx')]
+
+    results = _run(service, files)
+
+    summary = results.pop()
+    assert summary['done'] is True
+    assert (summary['files'], summary['parsed'], summary['failed']) == (6, 6, 0)
+    assert sorted(result['filename'] for result in results) == ['cv0.pdf', 'cv1.pdf', 'cv2.pdf', 'cv3.pdf',
+                                                               'cv4.pdf', 'single.docx']
+    assert len({result['cv_id'] for result in results}) == 6
+    assert service.in_flight['max'] == 2
+
+
+def test_bad_files_do_not_stop_the_batch(service, monkeypatch):
+    monkeypatch.setattr(config, 'MAX_FILE_SIZE_BYTES', 100)
+    files = [
+        UploadFile(io.BytesIO(b'notes'), filename='notes.txt'),
+        UploadFile(io.BytesIO(b'not a zip'), filename='broken.zip'),
+        UploadFile(io.BytesIO(b'corrupt'), filename='corrupt.pdf'),
+        UploadFile(_zip({'huge.pdf': 'x' * 1000}), filename='big.zip'),
+        UploadFile(io.BytesIO(b'Good'), filename='good.pdf'),
+    ]
+
+    results = _run(service, files)
+
+    summary = results.pop()
+    assert (summary['parsed'], summary['failed']) == (1, 4)
+    by_name = {result['filename']: result for result in results}
+    assert by_name['good.pdf']['status'] == 'parsed'
+    assert by_name['broken.zip']['error'] == 'Not a valid ZIP archive'
+    assert by_name['corrupt.pdf']['error'] == 'Could not parse CV'
+    assert by_name['huge.pdf']['error'].startswith('File too large')
+    assert by_name['notes.txt']['status'] == 'failed'
@@ -0,0 +1,26 @@
+"""
+Tests for the maintenance command line
+"""
+
+from app import cli
+from app.config import Config, config
+from app.repositories import base_repository
+
+
+def test_main_opens_the_database_on_the_railway_volume(tmp_path, monkeypatch):
+    local_db = tmp_path / 'cv_analyzer.db'
+    local_db.write_bytes(b'')
+    volume = tmp_path / 'data'
+    volume.mkdir()
+    monkeypatch.setattr(Config, 'IS_RAILWAY', True)
+    monkeypatch.setattr(Config, 'DATA_DIR', str(volume))
+    monkeypatch.setattr(Config, 'DATABASE_NAME', str(local_db.relative_to(tmp_path)))
+    monkeypatch.chdir(tmp_path)
+
+    opened = []
+    monkeypatch.setattr(base_repository, 'init_db', lambda: opened.append(config.DATABASE_NAME))
+    monkeypatch.setattr(cli, '_rebuild_stats', lambda args: 0)
+
+    assert cli.main(['rebuild-stats']) == 0
+    assert opened == [f'{volume}/cv_analyzer.db']
+    assert (volume / 'cv_analyzer.db').exists()
@@ -0,0 +1,21 @@
+"""
+Tests for the compressed JSON column type
+"""
+
+import json
+
+from app.models.types import CURRENT_DICTIONARY_VERSION, compress_json, decompress_json
+
+
+def test_round_trip_is_smaller_than_json_text():
+    document = {"contact_info": {"name": "Ada"}, "skills": ["Python", "SQL"] * 20, "summary": "Engineer " * 30}
+    blob = compress_json(document)
+
+    assert blob[0] == CURRENT_DICTIONARY_VERSION
+    assert len(blob) < len(json.dumps(document)) / 3
+    assert decompress_json(blob) == document
+
+
+def test_legacy_json_text_is_still_readable():
+    assert decompress_json('{"job_title": "Engineer"}') == {"job_title": "Engineer"}
+    assert decompress_json(b'{"job_title": "Engineer"}') == {"job_title": "Engineer"}
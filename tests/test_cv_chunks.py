@@ -0,0 +1,151 @@
+"""
+Tests for parsing long CVs as page ranges
+"""
+
+import asyncio
+import io
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from PyPDF2 import PageObject, PdfReader, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from app.config import config
+from app.services.cv_chunks import merge_parsed_chunks, page_ranges, split_pdf
+from app.services.cv_parser import GeminiCVParser
+
+
+def make_pdf(pages: int) -> bytes:
+    """A PDF whose page n reads 'Role n'"""
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+    }))
+    for number in range(pages):
+        page = PageObject.create_blank_page(None, 612, 792)
+        page[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/Font'): DictionaryObject({NameObject('/F1'): font})
+        })
+        contents = DecodedStreamObject()
+        contents.set_data(f'BT /F1 12 Tf 72 720 Td (Role {number}) Tj ET'.encode())
+        page[NameObject('/Contents')] = writer._add_object(contents)
+        writer.add_page(page)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def test_page_ranges_cover_the_document():
+    assert page_ranges(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    chunks = split_pdf(make_pdf(10), page_ranges(10, 4))
+    assert [len(PdfReader(io.BytesIO(chunk)).pages) for chunk in chunks] == [4, 4, 2]
+
+
+def test_merge_dedupes_entries_and_skills_across_page_boundaries():
+    first = {
+        'contact_info': {'name': 'Ada Lovelace', 'email': None},
+        'summary': 'Engineer',
+        'skills': ['Python', 'SQL'],
+        'technical_skills': {'Languages': ['Python']},
+        'experiences': [{'company': 'Acme', 'position': 'Engineer', 'start_date': 'Jan 2020',
+                         'end_date': None, 'responsibilities': ['Built pipelines']}],
+        'languages': ['English'],
+    }
+    second = {
+        'contact_info': {'name': None, 'email': 'ada@example.com'},
+        'summary': 'Ignored, the first summary wins',
+        'skills': ['python ', 'Rust'],
+        'technical_skills': {'languages': ['Rust', 'PYTHON']},
+        'experiences': [
+            {'company': 'ACME', 'position': 'Engineer', 'end_date': '2023-05',
+             'responsibilities': ['built pipelines', 'Led a team']},
+            {'company': 'Beta', 'position': 'Intern', 'start_date': '2018-06'},
+        ],
+        'languages': ['english', 'French'],
+    }
+
+    merged = merge_parsed_chunks([first, second])
+
+    assert merged['contact_info'] == {'name': 'Ada Lovelace', 'email': 'ada@example.com'}
+    assert merged['summary'] == 'Engineer'
+    assert merged['skills'] == ['Python', 'SQL', 'Rust']
+    assert merged['technical_skills'] == {'Languages': ['Python', 'Rust']}
+    assert merged['experiences'] == [
+        {'company': 'Acme', 'position': 'Engineer', 'start_date': 'Jan 2020', 'end_date': '2023-05',
+         'responsibilities': ['Built pipelines', 'Led a team']},
+        {'company': 'Beta', 'position': 'Intern', 'start_date': '2018-06'},
+    ]
+    assert merged['languages'] == ['English', 'French']
+
+
+class FakeModels:
+    """Stands in for the Gemini client: one experience per page of the document it is sent"""
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, model, contents):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02)
+        document = contents[0]['parts'][1]['inline_data']['data']
+        text = '\n'.join(page.extract_text() for page in PdfReader(io.BytesIO(document)).pages)
+        roles = [int(number) for number in re.findall(r'Role (\d+)', text)]
+        self.calls.append(roles)
+        with self.lock:
+            self.in_flight -= 1
+        return SimpleNamespace(text=json.dumps({
+            'contact_info': {'name': 'Ada Lovelace'} if 0 in roles else {},
+            'skills': ['Python'],
+            'experiences': [{'company': f'Company {number}', 'position': 'Engineer'} for number in roles],
+        }))
+
+
+def test_long_pdfs_are_parsed_as_concurrent_page_ranges(monkeypatch):
+    monkeypatch.setattr(config, 'LONG_CV_PAGE_THRESHOLD', 10)
+    monkeypatch.setattr(config, 'LONG_CV_PAGES_PER_CHUNK', 4)
+    monkeypatch.setattr(config, 'LLM_PARSE_CONCURRENCY', 2)
+    monkeypatch.setattr(config, 'LLM_PAYLOAD_SHRINK', False)
+    parser = GeminiCVParser.__new__(GeminiCVParser)
+    parser.model = 'test'
+    parser.client = SimpleNamespace(models=FakeModels())
+
+    structured_cv, raw = asyncio.run(parser.parse_cv_from_bytes(make_pdf(11), 'cv.pdf'))
+
+    assert sorted(parser.client.models.calls) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10]]
+    assert parser.client.models.max_in_flight == 2
+    assert structured_cv.contact_info.name == 'Ada Lovelace'
+    assert [experience.company for experience in structured_cv.experiences] == [f'Company {n}' for n in range(11)]
+    assert structured_cv.skills == ['Python']
+
+    asyncio.run(parser.parse_cv_from_bytes(make_pdf(3), 'short.pdf'))
+    assert parser.client.models.calls[-1] == [0, 1, 2]
+
+
+def test_concurrent_long_cvs_share_one_limit(monkeypatch):
+    monkeypatch.setattr(config, 'LONG_CV_PAGE_THRESHOLD', 10)
+    monkeypatch.setattr(config, 'LONG_CV_PAGES_PER_CHUNK', 4)
+    monkeypatch.setattr(config, 'LLM_PARSE_CONCURRENCY', 2)
+    monkeypatch.setattr(config, 'LLM_PAYLOAD_SHRINK', False)
+    parser = GeminiCVParser.__new__(GeminiCVParser)
+    parser.model = 'test'
+    parser.client = SimpleNamespace(models=FakeModels())
+
+    # As the bulk upload's parse workers do: several files at once, each fanned out into page ranges
+    async def parse_batch():
+        return await asyncio.gather(*(parser.parse_cv_from_bytes(make_pdf(11), f'cv{n}.pdf') for n in range(3)))
+
+    results = asyncio.run(parse_batch())
+
+    assert len(parser.client.models.calls) == 9
+    assert parser.client.models.max_in_flight == 2
+    assert all(len(structured_cv.experiences) == 11 for structured_cv, _ in results)
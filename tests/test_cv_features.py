@@ -0,0 +1,150 @@
+"""
+Tests for the precomputed CV feature row
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app import cli
+from app.config import config
+from app.models.database import CVFeatures, CVRecord, FileUpload, JobDescription
+from app.models.schemas import Certification, Education, Experience, Project, StructuredCV, StructuredJobDescription
+from app.repositories import base_repository
+from app.repositories.cv_repository import CVFeaturesRepository, CVRepository
+from app.services import cv_processor as cv_processor_module
+from app.services.analysis_service import AnalysisService
+from app.services.analyzer import CVJobAnalyzer
+from app.services.cv_features import (
+    FEATURES_VERSION, build_cv_features, collect_cv_skills, degree_level, normalize_skill, skill_bit, skill_bitmap
+)
+from app.services.cv_processor import CVProcessor
+from app.services.job_profile import skill_requirement
+
+
+def sample_cv():
+    return StructuredCV(
+        skills=['Python', ' JS ', 'k8s'],
+        technical_skills={'Cloud': ['AWS', 'Docker']},
+        experiences=[
+            Experience(company='Acme', position='Engineer', start_date='2018-01', end_date='2020-01',
+                       responsibilities=['Ran SQL reports', 'Kept the Git history tidy']),
+            Experience(company='Initech', position='Lead', start_date='2019-01', end_date='2021-01'),
+        ],
+        education=[
+            Education(institution='UCT', degree='BSc', field_of_study='Computer Science'),
+            Education(institution='MIT', degree='Master of Engineering'),
+        ],
+        projects=[Project(name='Search', technologies=['Elasticsearch'])],
+        certifications=[Certification(name='AWS Solutions Architect')],
+    )
+
+
+def test_skill_aliases_resolve_to_one_name():
+    assert normalize_skill('  Node.JS ') == 'javascript'
+    assert normalize_skill('k8s') == 'kubernetes'
+    assert normalize_skill('Machine   Learning') == 'machine learning'
+
+
+def test_cv_skills_keep_the_written_form_next_to_the_canonical_id():
+    cv = StructuredCV(skills=['AWS', 'Node.js  Express'])
+    assert collect_cv_skills(cv) == {'aws', 'amazon web services', 'node.js express'}
+
+    # A CV listing AWS still satisfies a job asking for AWS Lambda
+    analyzer = CVJobAnalyzer.__new__(CVJobAnalyzer)
+    assert analyzer._skill_present(skill_requirement('AWS Lambda'), collect_cv_skills(cv))
+
+
+def test_skill_bitmap_is_stable_and_fits_sqlite_integers():
+    bitmap = skill_bitmap(['python', 'sql'])
+    assert bitmap == skill_bit('python') | skill_bit('sql')
+    assert bitmap & skill_bit('python')
+    assert 0 < bitmap < 2 ** 63
+    assert skill_bitmap([]) == 0
+
+
+def test_degree_level_takes_the_highest_pattern():
+    assert degree_level('PhD in Physics') == 5
+    assert degree_level('MSc Data Science') == 4
+    assert degree_level('B.Sc (Honours)') == 3
+    assert degree_level('National Diploma') == 1
+    assert degree_level('Bootcamp') == 0
+    assert degree_level(None) == 0
+
+
+def test_build_cv_features():
+    features = build_cv_features(sample_cv())
+
+    assert features['version'] == FEATURES_VERSION
+    assert features['skills'] == sorted({'python', 'js', 'javascript', 'k8s', 'kubernetes', 'aws', 'amazon web services',
+                                         'docker', 'sql', 'git', 'elasticsearch'})
+    assert features['skill_bitmap'] == skill_bitmap(features['skills'])
+    assert features['total_experience_months'] == 36  # 2018-01 to 2021-01, overlap counted once
+    assert [role['months'] for role in features['role_durations']] == [24, 24]
+    assert features['highest_degree_level'] == 4
+    assert features['certifications'] == ['AWS Solutions Architect']
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+    with base_repository.unit_of_work() as db:
+        for id in (1, 2):
+            db.add(FileUpload(id=id, filename=f'cv{id}.pdf', original_filename=f'cv{id}.pdf'))
+            db.add(CVRecord(id=id, file_upload_id=id, parsed_data={}))
+    return CVFeaturesRepository()
+
+
+def test_features_round_trip_and_stale_versions_are_recomputed(repository):
+    features = build_cv_features(sample_cv())
+    row_id = repository.save_features(1, features)
+
+    stored = repository.get_features(1)
+    assert {column: stored[column] for column in repository.FEATURE_COLUMNS} == features
+    assert repository.get_cv_ids_without_features() == [2]
+
+    # Saving again replaces the row rather than adding one
+    assert repository.save_features(1, {**features, 'skills': ['python']}) == row_id
+    assert repository.get_features(1)['skills'] == ['python']
+
+    with base_repository.unit_of_work() as db:
+        db.query(CVFeatures).update({CVFeatures.version: FEATURES_VERSION - 1})
+    assert repository.get_features(1) is None
+    assert repository.get_cv_ids_without_features() == [1, 2]
+
+
+def test_missing_features_are_backfilled_on_first_use(repository, monkeypatch):
+    monkeypatch.setattr(config, 'WRITE_QUEUE_ENABLED', False)
+    processor = CVProcessor.__new__(CVProcessor)
+    processor.feature_repository = repository
+
+    features = asyncio.run(processor.get_cv_features_async(2, sample_cv()))
+
+    assert features == build_cv_features(sample_cv())
+    assert repository.get_features(2)['skills'] == features['skills']
+
+
+def test_backfilled_features_drive_the_candidate_filter(repository, monkeypatch):
+    monkeypatch.setattr(config, 'WRITE_QUEUE_ENABLED', False)
+    with base_repository.unit_of_work() as db:
+        db.get(CVRecord, 1).parsed_data = sample_cv().dict()
+        db.get(CVRecord, 2).parsed_data = StructuredCV(skills=['Kubernetes']).dict()
+        db.add(JobDescription(id=1, job_title='Platform Engineer', company='Acme', job_data=StructuredJobDescription(
+            job_title='Platform Engineer', required_skills=['Kubernetes', 'AWS'], experience_level='Mid'
+        ).dict()))
+    processor = CVProcessor.__new__(CVProcessor)
+    processor.cv_repository = CVRepository()
+    processor.feature_repository = repository
+    monkeypatch.setattr(cv_processor_module, '_cv_processor', processor)
+
+    assert cli.main(['backfill-features', '--batch-size', '1']) == 0
+    assert repository.get_cv_ids_without_features() == []
+    assert processor.backfill_features() == 0
+
+    # Aliases resolve: the CV lists k8s and AWS; three years are required and it has three
+    assert repository.filter_cv_ids(required_skills=['kubernetes']) == [1, 2]
+    assert asyncio.run(AnalysisService().get_candidates_async(1)) == [1]
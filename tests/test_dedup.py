@@ -0,0 +1,43 @@
+"""
+Tests for MinHash near-duplicate detection
+"""
+
+from app.services.dedup import MinHasher, LSHIndex
+
+BASE_CV = (
+    "Jane Doe Senior Software Engineer with eight years of experience building payment "
+    "platforms in Python and Java. Led a team of five engineers migrating services to AWS "
+    "and Kubernetes, reducing deployment time by sixty percent. Bachelor of Science in "
+    "Computer Science from the University of Cape Town. Certified Kubernetes Administrator."
+)
+
+
+def test_near_duplicate_scores_high():
+    hasher = MinHasher(num_perm=128, bands=16)
+    edited = BASE_CV.replace("five engineers", "six engineers")
+    similarity = hasher.similarity(hasher.signature(BASE_CV), hasher.signature(edited))
+    assert similarity > 0.7
+
+
+def test_unrelated_cv_scores_low():
+    hasher = MinHasher(num_perm=128, bands=16)
+    other = (
+        "John Smith Registered nurse with ten years in paediatric care, ward management "
+        "and patient education at regional hospitals. Diploma in Nursing."
+    )
+    similarity = hasher.similarity(hasher.signature(BASE_CV), hasher.signature(other))
+    assert similarity < 0.2
+
+
+def test_index_returns_duplicate_only_for_same_source():
+    hasher = MinHasher(num_perm=128, bands=16)
+    index = LSHIndex(hasher, threshold=0.8)
+    signature = hasher.signature(BASE_CV)
+    index.add(1, signature, source="text")
+
+    assert index.query(signature, source="text")[0] == 1
+    assert index.query(signature, source="parsed") is None
+
+
+def test_empty_text_has_no_signature():
+    assert MinHasher(num_perm=128, bands=16).signature("   ") is None
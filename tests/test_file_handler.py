@@ -0,0 +1,65 @@
+"""
+Tests for streaming uploads to disk
+"""
+
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.config import config
+from app.services.file_handler import FileHandler
+
+
+class CountingStream(io.BytesIO):
+    """BytesIO that records how much was read from it"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_upload_is_streamed_to_disk_and_hashed(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'UPLOAD_CHUNK_SIZE', 1000)
+    content = b'%PDF-1.4 ' + bytes(range(256)) * 40
+    handler = FileHandler(str(tmp_path))
+
+    filename, sha256, size = asyncio.run(handler.save_uploaded_file(UploadFile(io.BytesIO(content), filename='cv.pdf')))
+
+    assert filename.endswith('_cv.pdf')
+    assert sha256 == hashlib.sha256(content).hexdigest()
+    assert handler.get_file_path(sha256).read_bytes() == content
+    assert size == len(content)
+    assert list(handler.store.tmp.iterdir()) == []
+
+
+def test_oversized_upload_stops_at_the_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'UPLOAD_CHUNK_SIZE', 1000)
+    monkeypatch.setattr(config, 'MAX_FILE_SIZE_BYTES', 2500)
+    stream = CountingStream(b'x' * 100_000)
+    handler = FileHandler(str(tmp_path))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(handler.save_uploaded_file(UploadFile(stream, filename='cv.pdf')))
+
+    assert error.value.status_code == 413
+    assert stream.bytes_read == 3000
+    assert [path.name for path in (tmp_path / 'blobs').iterdir()] == ['tmp']
+    assert list(handler.store.tmp.iterdir()) == []
+
+
+def test_declared_size_is_rejected_before_reading(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'MAX_FILE_SIZE_BYTES', 10)
+    stream = CountingStream(b'x' * 100)
+
+    with pytest.raises(HTTPException):
+        asyncio.run(FileHandler(str(tmp_path)).save_uploaded_file(UploadFile(stream, filename='cv.pdf', size=100)))
+
+    assert stream.bytes_read == 0
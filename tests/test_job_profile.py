@@ -0,0 +1,100 @@
+"""
+Tests for the precomputed job requirement profile
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.config import config
+from app.models.database import JobDescription
+from app.models.schemas import JobRequirement, StructuredCV, StructuredJobDescription
+from app.repositories import base_repository
+from app.services.analyzer import CVJobAnalyzer
+from app.services.cv_features import collect_cv_skills
+from app.services.job_description_service import JobDescriptionService
+from app.services.job_profile import (
+    JOB_PROFILE_VERSION, build_job_profile, certification_aliases, extract_required_years, is_current,
+    skill_requirement
+)
+
+
+def sample_job(**overrides):
+    fields = dict(
+        job_title='Backend Engineer',
+        required_skills=['Python', 'Node.js'],
+        preferred_skills=['K8s'],
+        requirements=[JobRequirement(category='Required', requirements=['4+ years building APIs'])],
+        education_requirements=["Bachelor's in Computer Science"],
+        certifications_required=['AWS Certified Developer'],
+    )
+    fields.update(overrides)
+    return StructuredJobDescription(**fields)
+
+
+def test_required_years_prefer_the_experience_level():
+    assert extract_required_years(sample_job()) == 4
+    assert extract_required_years(sample_job(experience_level='Senior')) == 5
+    assert extract_required_years(sample_job(requirements=[])) == 0
+
+
+def test_certification_aliases_expand_known_groups():
+    aliases = certification_aliases('AWS Certified Developer')
+    assert aliases[0] == 'aws certified developer'
+    assert {'aws certified', 'aws', 'amazon web services'} <= set(aliases)
+    assert certification_aliases('PMP') == ['pmp']
+
+
+def test_build_job_profile():
+    profile = build_job_profile(sample_job())
+
+    assert is_current(profile)
+    assert profile['required_skills'] == [
+        {'text': 'python', 'id': 'python', 'aliases': ['python', 'py']},
+        {'text': 'node.js', 'id': 'javascript', 'aliases': ['javascript', 'js', 'node.js', 'nodejs']},
+    ]
+    assert [skill['id'] for skill in profile['preferred_skills']] == ['kubernetes']
+    assert profile['required_years'] == 4
+    assert profile['education'] == [{'requirement': "Bachelor's in Computer Science", 'degree_level': 3,
+                                      'text': "bachelor's in computer science"}]
+    assert profile['certifications'][0]['requirement'] == 'AWS Certified Developer'
+    assert not is_current(None)
+    assert not is_current({**profile, 'version': JOB_PROFILE_VERSION - 1})
+
+
+@pytest.mark.parametrize('job_skill, cv_skill, present', [
+    # Matched by the written requirement before profiles existed, and still
+    ('AWS', 'AWS Lambda', True),
+    ('Node.js', 'Node.js Express', True),
+    ('CI', 'CI pipelines', True),
+    ('k8s', 'k8s operators', True),
+    # Matched through an alias of the requirement's group
+    ('Amazon Web Services', 'AWS Lambda', True),
+    ('Kubernetes', 'K8s', True),
+    ('Python', 'NumPy', False),
+])
+def test_skill_matches_written_text_and_group_aliases(job_skill, cv_skill, present):
+    analyzer = CVJobAnalyzer.__new__(CVJobAnalyzer)
+    cv_skills = collect_cv_skills(StructuredCV(skills=[cv_skill]))
+    assert analyzer._skill_present(skill_requirement(job_skill), cv_skills) is present
+
+
+@pytest.fixture
+def service(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+    monkeypatch.setattr(config, 'WRITE_QUEUE_ENABLED', False)
+    with base_repository.unit_of_work() as db:
+        db.add(JobDescription(id=1, job_title='Backend Engineer', company='Acme', job_data=sample_job().dict(),
+                              job_profile={'version': JOB_PROFILE_VERSION - 1}))
+    return JobDescriptionService()
+
+
+def test_outdated_stored_profile_is_rebuilt_and_saved(service):
+    profile = asyncio.run(service.get_job_profile_async(1))
+
+    assert profile == build_job_profile(sample_job())
+    assert service.repository.get_job_profile(1) == profile
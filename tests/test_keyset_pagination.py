@@ -0,0 +1,76 @@
+"""
+Tests for keyset (cursor) pagination of the listings
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Analysis, CVRecord, FileUpload, JobDescription
+from app.repositories import base_repository
+from app.repositories.base_repository import InvalidCursorError, decode_cursor, encode_cursor, next_cursor
+from app.services.analysis_service import AnalysisService
+
+START = datetime(2025, 3, 1, 9, 30, 15, 123456)
+
+# (id, job id, score, minutes after START); scores and dates tie to exercise the id tie-breaker
+ANALYSES = [(1, 1, 80.0, 0), (2, 1, 92.5, 1), (3, 1, 80.0, 1), (4, 1, 80.0, 2), (5, 1, 41.0, 3),
+            (6, 2, 99.0, 4), (7, 1, 92.5, 4)]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+    with base_repository.unit_of_work() as db:
+        db.add(FileUpload(id=1, filename='cv.pdf', original_filename='cv.pdf'))
+        db.add(CVRecord(id=1, file_upload_id=1, parsed_data={}))
+        for job_id in (1, 2):
+            db.add(JobDescription(id=job_id, job_title=f'Job {job_id}', company='Acme', job_data={}))
+        for id, job_id, score, minutes in ANALYSES:
+            db.add(Analysis(id=id, cv_record_id=1, job_description_id=job_id, suitability_score=score,
+                            analysis_data={}, analysis_date=START + timedelta(minutes=minutes)))
+    return AnalysisService()
+
+
+def walk(fetch, limit, sort_key):
+    """Ids of every page, following next_cursor until it runs out"""
+    ids, cursor = [], None
+    while True:
+        page = fetch(limit=limit, cursor=cursor)
+        ids.extend(item['id'] for item in page)
+        cursor = next_cursor(page, limit, sort_key)
+        if cursor is None:
+            return ids
+
+
+def test_cursor_round_trips_datetimes_and_floats():
+    assert decode_cursor(encode_cursor(START, 7), Analysis.analysis_date) == (START, 7)
+    assert decode_cursor(encode_cursor(92.5, 3), Analysis.suitability_score) == (92.5, 3)
+    assert '=' not in encode_cursor(START, 7)
+
+
+def test_job_analyses_page_by_score_then_id(service):
+    expected = [7, 2, 4, 3, 1, 5]
+    assert [item['id'] for item in service.get_job_analyses(1)] == expected
+    for limit in (1, 2, 4):
+        assert walk(lambda **page: service.get_job_analyses(1, **page), limit, 'suitability_score') == expected
+
+
+def test_cv_analyses_page_by_date_then_id(service):
+    expected = [7, 6, 5, 4, 3, 2, 1]
+    for limit in (1, 3, 10):
+        assert walk(lambda **page: service.get_cv_analyses(1, **page), limit, 'analysis_date') == expected
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', encode_cursor('yesterday', 1), 'WzEsMl0', 'W251bGwsIngiXQ'])
+def test_malformed_cursor_is_a_bad_request(service, cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, Analysis.analysis_date)
+    with pytest.raises(HTTPException) as error:
+        service.get_cv_analyses(1, limit=2, cursor=cursor)
+    assert error.value.status_code == 400
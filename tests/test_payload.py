@@ -0,0 +1,102 @@
+"""
+Tests for shrinking CV documents before they are sent to the LLM
+"""
+
+import io
+import os
+import zipfile
+
+from docx import Document
+from PyPDF2 import PageObject, PdfReader, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+from app.services.dedup import extract_cv_text
+from app.services.payload import shrink_document
+
+
+def _stream(data: bytes, **entries) -> DecodedStreamObject:
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    stream.update({NameObject(f'/{key}'): value for key, value in entries.items()})
+    return stream
+
+
+def make_pdf() -> bytes:
+    """One page with a photo, an embedded font and a line of text"""
+    writer = PdfWriter()
+    page = PageObject.create_blank_page(None, 612, 792)
+    photo = _stream(os.urandom(200 * 200 * 3), Type=NameObject('/XObject'), Subtype=NameObject('/Image'),
+                    Width=NumberObject(200), Height=NumberObject(200),
+                    ColorSpace=NameObject('/DeviceRGB'), BitsPerComponent=NumberObject(8))
+    descriptor = DictionaryObject({
+        NameObject('/Type'): NameObject('/FontDescriptor'),
+        NameObject('/FontName'): NameObject('/CVSans'),
+        NameObject('/Flags'): NumberObject(32),
+        NameObject('/FontFile2'): writer._add_object(_stream(os.urandom(40_000))),
+    })
+    font = DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/TrueType'),
+        NameObject('/BaseFont'): NameObject('/CVSans'),
+        NameObject('/Encoding'): NameObject('/WinAnsiEncoding'),
+        NameObject('/FontDescriptor'): writer._add_object(descriptor),
+    })
+    page[NameObject('/Resources')] = DictionaryObject({
+        NameObject('/XObject'): DictionaryObject({NameObject('/Im0'): writer._add_object(photo)}),
+        NameObject('/Font'): DictionaryObject({NameObject('/F1'): writer._add_object(font)}),
+    })
+    page[NameObject('/Contents')] = writer._add_object(_stream(
+        b'q 120 0 0 120 420 640 cm /Im0 Do Q BT /F1 14 Tf 72 720 Td (Ada Lovelace, Python engineer) Tj ET'
+    ))
+    writer.add_page(page)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def make_docx() -> bytes:
+    """A DOCX with text and a large embedded picture"""
+    document = Document()
+    document.add_paragraph('Ada Lovelace, Python engineer')
+    buffer = io.BytesIO()
+    document.save(buffer)
+    source = zipfile.ZipFile(io.BytesIO(buffer.getvalue()))
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w') as target:
+        for info in source.infolist():
+            data = source.read(info)
+            if info.filename == 'word/_rels/document.xml.rels':
+                data = data.replace(b'</Relationships>', b'<Relationship Id="rId99" Type="http://schemas.openxml'
+                                    b'formats.org/officeDocument/2006/relationships/image" Target="media/photo.png"/>'
+                                    b'</Relationships>')
+            target.writestr(info, data)
+        target.writestr('word/media/photo.png', os.urandom(100_000))
+    return output.getvalue()
+
+
+def test_pdf_images_and_fonts_are_stripped_but_text_remains():
+    original = make_pdf()
+
+    shrunk = shrink_document(original, 'cv.pdf')
+
+    assert len(shrunk) < len(original) / 5
+    assert 'Ada Lovelace' in extract_cv_text('cv.pdf', shrunk)
+    page = PdfReader(io.BytesIO(shrunk)).pages[0]
+    photo = page['/Resources']['/XObject']['/Im0'].get_object()
+    assert (photo['/Width'], photo['/Height']) == (1, 1)
+
+
+def test_docx_media_is_dropped_with_its_relationships():
+    original = make_docx()
+
+    shrunk = shrink_document(original, 'cv.docx')
+
+    assert len(shrunk) < len(original) - 90_000
+    assert 'Ada Lovelace' in extract_cv_text('cv.docx', shrunk)
+    with zipfile.ZipFile(io.BytesIO(shrunk)) as package:
+        assert not any(name.startswith('word/media/') for name in package.namelist())
+        assert b'media/photo.png' not in package.read('word/_rels/document.xml.rels')
+
+
+def test_unreadable_documents_are_sent_unchanged():
+    assert shrink_document(b'not a pdf', 'cv.pdf') == b'not a pdf'
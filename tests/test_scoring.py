@@ -0,0 +1,101 @@
+"""
+Tests for configurable, vectorized suitability scoring
+"""
+
+import numpy as np
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.services.analysis_service import AnalysisService
+from app.services.scoring import get_scoring_weights, overall_score, overall_scores, hire_codes_for, resolve_weights
+
+DEFAULT_WEIGHTS = {'technical': 0.4, 'experience': 0.4, 'education': 0.2,
+                   'strong_yes_floor': 85, 'no_ceiling': 40}
+
+
+def legacy_score(technical, experience, education, hire_rec):
+    """The original hardcoded formula from CVJobAnalyzer._calculate_scores"""
+    score = int(technical * 0.4 + experience * 0.4 + education * 0.2)
+    if hire_rec == 'strong yes':
+        score = max(85, score)
+    elif hire_rec == 'no':
+        score = min(40, score)
+    return score
+
+
+def test_vectorized_matches_legacy_formula():
+    rng = np.random.RandomState(3)
+    technical = rng.randint(0, 101, size=2000)
+    experience = rng.choice([30, 60, 70, 90, 100], size=2000)
+    education = rng.choice([30, 50, 80, 100], size=2000)
+    hire = [['strong yes', 'yes', 'maybe', 'no', None][i] for i in rng.randint(0, 5, size=2000)]
+
+    scores = overall_scores(technical, experience, education, hire_codes_for(hire), DEFAULT_WEIGHTS)
+
+    expected = [legacy_score(*row) for row in zip(technical, experience, education, hire)]
+    assert scores.tolist() == expected
+
+
+def test_legacy_rows_keep_their_inferred_clamp():
+    technical = np.array([37, 37, 90, 50])
+    experience = np.array([100, 100, 90, 60])
+    education = np.array([100, 100, 100, 50])
+    current = np.array([85, 74, 40, 54])
+    codes = hire_codes_for([None, None, None, None], technical, experience, education, current)
+
+    assert codes.tolist() == [2, 0, -1, 0]
+    scores = overall_scores(technical, experience, education, codes, DEFAULT_WEIGHTS)
+    assert scores.tolist() == current.tolist()
+
+
+def test_single_score_uses_configured_weights():
+    assert overall_score(37, 100, 100, 'maybe') == 74
+    assert overall_score(37, 100, 100, 'strong yes') == 85
+    assert overall_score(90, 90, 100, 'no') == 40
+
+
+def test_weight_overrides_are_validated():
+    assert resolve_weights(None) == get_scoring_weights()
+    assert resolve_weights({'technical': 0.5, 'experience': 0.3, 'education': 0.2})['technical'] == 0.5
+
+    for overrides in ({'technical': 'x'}, {'technical': True}, {'technical': 1.5},
+                      {'seniority': 0.1}, {'technical': 0.9}, [0.4, 0.4, 0.2]):
+        with pytest.raises(ValueError):
+            resolve_weights(overrides)
+
+
+def test_rescore_applies_custom_weights_only_as_a_preview():
+    service = AnalysisService.__new__(AnalysisService)
+    weights = {'technical': 0.2, 'experience': 0.2, 'education': 0.6}
+
+    with pytest.raises(HTTPException) as error:
+        service.rescore_all(weights=weights)
+    assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException) as error:
+        service.rescore_all(weights={'technical': 'x'}, dry_run=True)
+    assert error.value.status_code == 400
+
+
+def test_rescore_route_requires_a_boolean_dry_run(monkeypatch):
+    calls = []
+
+    class RecordingService:
+        def rescore_all(self, weights=None, dry_run=False):
+            calls.append(dry_run)
+            return {'dry_run': dry_run}
+
+    monkeypatch.setattr(routes, 'get_analysis_service', RecordingService)
+    app = FastAPI()
+    app.include_router(routes.router)
+    client = TestClient(app)
+
+    for value in ('false', 'true', 0, 1, '', None):
+        assert client.post('/api/analyses/rescore', json={'dry_run': value}).status_code == 400
+    assert calls == []
+
+    assert client.post('/api/analyses/rescore', json={'dry_run': True}).json()['data'] == {'dry_run': True}
+    assert client.post('/api/analyses/rescore', json={}).json()['data'] == {'dry_run': False}
+    assert calls == [True, False]
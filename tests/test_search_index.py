@@ -0,0 +1,107 @@
+"""
+Tests for the FTS5 search index helpers
+"""
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base, CVRecord, FileUpload, JobDescription
+from app.repositories import base_repository, search_index
+from app.repositories.cv_repository import CVRepository
+from app.repositories.job_description_repository import JobDescriptionRepository
+from app.repositories.search_index import (
+    CV_FTS, JOB_FTS, JOB_WEIGHTS, job_fts, create_search_tables, cv_document, fts_query, match, bm25, highlight,
+    search_supported
+)
+
+
+def test_user_input_becomes_a_safe_prefix_query():
+    assert fts_query('senior pyth') == '"senior" "pyth"*'
+    assert fts_query('C++ AND (NEAR') == '"C++" "AND" "NEAR"*'
+    assert fts_query('c# .net') == '"c#" "net"*'
+    assert fts_query('acme', 'company') == 'company : ("acme"*)'
+    assert fts_query(' -- ') is None
+
+
+def test_cv_document_collects_searchable_fields():
+    document = cv_document(None, {
+        'contact_info': {'name': 'Ada Lovelace'},
+        'summary': 'Analyst',
+        'skills': ['Python'],
+        'technical_skills': {'Databases': ['SQLite']},
+        'experiences': [{'position': 'Engineer', 'company': 'Acme'}],
+    })
+    assert document == {'name': 'Ada Lovelace', 'skills': 'Python SQLite',
+                        'positions': 'Engineer Acme', 'summary': 'Analyst'}
+
+
+def test_title_hits_rank_above_body_hits():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    create_search_tables(engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"INSERT INTO {JOB_FTS} (rowid, job_title, company, body) VALUES "
+                          "(1, 'Office Manager', 'Acme', 'Some python scripting helps'), "
+                          "(2, 'Python Developer', 'Initech', 'Build services')"))
+        rank = bm25(job_fts, JOB_WEIGHTS)
+        rows = conn.execute(
+            select(job_fts.c.rowid, highlight(job_fts, 0)).where(match(job_fts, fts_query('python'))).order_by(rank)
+        ).all()
+    assert [row[0] for row in rows] == [2, 1]
+    assert rows[0][1] == '<mark>Python</mark> Developer'
+
+
+def seed(engine, monkeypatch):
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+    with base_repository.unit_of_work() as db:
+        for id, title in ((1, 'Senior C++ Developer'), (2, 'C# Engineer'), (3, 'C Firmware Engineer')):
+            db.add(JobDescription(id=id, job_title=title, company='Acme', job_data={}, is_active=True))
+        db.add(FileUpload(id=1, filename='cv.pdf', original_filename='ada_cv.pdf'))
+        db.add(CVRecord(id=1, file_upload_id=1, contact_name='Ada Lovelace',
+                        parsed_data={'skills': ['C++', 'Python']}))
+    search_index.rebuild_search_index(engine)
+
+
+def test_symbols_in_skill_names_are_searchable(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    seed(engine, monkeypatch)
+
+    jobs = JobDescriptionRepository()
+    assert [job['id'] for job in jobs.search_jobs('c++')] == [1]
+    assert [job['id'] for job in jobs.search_jobs('C#')] == [2]
+    assert [cv['id'] for cv in CVRepository().search_cvs('c++')] == [1]
+
+
+def test_tables_from_an_older_tokenizer_are_rebuilt(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE VIRTUAL TABLE {JOB_FTS} USING fts5(job_title, company, body, "
+                          "tokenize = 'porter unicode61 remove_diacritics 2')"))
+    seed(engine, monkeypatch)
+
+    with engine.connect() as conn:
+        sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = :name"), {'name': JOB_FTS}).scalar()
+    assert search_index.TOKENIZER in sql
+    assert [job['id'] for job in JobDescriptionRepository().search_jobs('c++')] == [1]
+
+
+def test_without_fts5_search_falls_back_to_like(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    monkeypatch.setattr(search_index, 'fts5_available', lambda: False)
+    seed(engine, monkeypatch)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM sqlite_master WHERE name IN (:job, :cv)"),
+                            {'job': JOB_FTS, 'cv': CV_FTS}).scalar() == 0
+    assert [job['id'] for job in JobDescriptionRepository().search_jobs('engineer')] == [2, 3]
+    cvs = CVRepository().search_cvs('lovelace')
+    assert [cv['id'] for cv in cvs] == [1]
+    assert cvs[0]['search']['rank'] is None
+
+
+def test_fts5_is_probed_once():
+    search_index.fts5_available.cache_clear()
+    assert search_supported(create_engine('sqlite://'))
+    assert search_supported(create_engine('sqlite://'))
+    assert search_index.fts5_available.cache_info().misses == 1
@@ -0,0 +1,71 @@
+"""
+Tests for the pragmas applied to every SQLite connection
+"""
+
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.config import config
+from app.repositories import base_repository
+
+
+@pytest.fixture
+def engines(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, 'DATABASE_NAME', str(tmp_path / 'pragmas.db'))
+    for name, value in (('JOURNAL_MODE', 'WAL'), ('SYNCHRONOUS', 'NORMAL'), ('TEMP_STORE', 'MEMORY')):
+        monkeypatch.setattr(config, f'SQLITE_{name}', value)
+    monkeypatch.setattr(base_repository, '_engine', None)
+    monkeypatch.setattr(base_repository, '_async_engine', None)
+    yield base_repository.get_engine(), base_repository.get_async_engine()
+    asyncio.run(base_repository.dispose_engines())
+
+
+def expected_pragmas():
+    return {
+        'journal_mode': 'wal',
+        'synchronous': 1,  # NORMAL
+        'mmap_size': config.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+        'cache_size': -config.SQLITE_CACHE_SIZE_MB * 1024,
+        'busy_timeout': config.SQLITE_BUSY_TIMEOUT_MS,
+        'temp_store': 2,  # MEMORY
+    }
+
+
+def read_pragmas(conn):
+    return {name: conn.execute(text(f'PRAGMA {name}')).scalar() for name in expected_pragmas()}
+
+
+def test_sync_and_async_connections_get_the_pragmas(engines):
+    engine, async_engine = engines
+    with engine.connect() as conn:
+        assert read_pragmas(conn) == expected_pragmas()
+
+    async def read_async():
+        async with async_engine.connect() as conn:
+            return await conn.run_sync(read_pragmas)
+
+    assert asyncio.run(read_async()) == expected_pragmas()
+
+
+def test_wal_checkpoint(engines):
+    engine, _ = engines
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE t (x INTEGER)'))
+        conn.execute(text('INSERT INTO t VALUES (1)'))
+
+    busy, wal_frames, checkpointed = base_repository.checkpoint_wal(engine, 'TRUNCATE')
+    assert busy == 0
+    assert wal_frames == checkpointed
+
+
+def test_unsupported_journal_mode_is_reported(caplog):
+    engine = create_engine('sqlite://')  # In-memory databases cannot use WAL
+    event.listen(engine, 'connect', base_repository.apply_sqlite_pragmas)
+
+    with caplog.at_level(logging.WARNING, logger=base_repository.__name__):
+        with engine.connect() as conn:
+            assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'memory'
+    assert 'journal_mode is memory' in caplog.text
@@ -0,0 +1,19 @@
+"""
+Tests that importing the app stays free of database and Gemini setup work
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+
+def test_importing_the_app_does_not_touch_the_database_or_gemini(tmp_path):
+    database = tmp_path / "startup.db"
+    env = dict(os.environ, DATABASE_NAME=str(database), GEMINI_API_KEY="test", PYTHONWARNINGS="ignore")
+    output = subprocess.run(
+        [sys.executable, "-c", "import json, sys, app.main; print(json.dumps('google.genai' in sys.modules))"],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    assert json.loads(output.strip().splitlines()[-1]) is False
+    assert not database.exists()
@@ -0,0 +1,81 @@
+"""
+Tests for the summary columns behind the CV and analysis list endpoints
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Analysis, CVRecord, FileUpload, JobDescription
+from app.models.schemas import AnalysisResponse
+from app.repositories import base_repository
+from app.repositories.analysis_repository import AnalysisRepository
+from app.repositories.cv_repository import CVRepository
+
+LEGACY_ANALYSIS = {'suitability_score': 72, 'technical_score': 80, 'experience_score': 65,
+                   'education_score': 70, 'hire_recommendation': 'yes', 'scoring_rationale': 'Solid'}
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+
+    with base_repository.unit_of_work() as db:
+        db.add(FileUpload(id=1, filename='cv.pdf', original_filename='ada.pdf', file_size=1234))
+        db.add(CVRecord(id=1, file_upload_id=1, contact_name='Ada', parsed_data={'raw_text': 'x' * 1000},
+                        parsed_date=datetime.utcnow() - timedelta(days=1)))
+        db.add(JobDescription(id=1, job_title='Engineer', company='Acme', job_data={}))
+        # Stored before the summary columns and compression existed: plain JSON text, no summary fields
+        db.execute(text(
+            "INSERT INTO analyses (id, cv_record_id, job_description_id, suitability_score, analysis_data, analysis_date) "
+            "VALUES (1, 1, 1, 72, :data, :date)"
+        ), {'data': json.dumps(LEGACY_ANALYSIS), 'date': datetime.utcnow() - timedelta(days=1)})
+    return AnalysisRepository()
+
+
+def save_analysis(repository):
+    return repository.save_analysis_result(1, 1, AnalysisResponse(
+        suitability_score=55, technical_score=50, experience_score=60, education_score=55,
+        scoring_rationale='Partial fit', matching_skills=['python'], missing_skills=['go'],
+        hire_recommendation='maybe'
+    ))['id']
+
+
+def test_new_analyses_store_their_summary_columns(repository):
+    analysis_id = save_analysis(repository)
+
+    with repository.get_db() as db:
+        analysis = db.get(Analysis, analysis_id)
+        assert (analysis.technical_score, analysis.experience_score, analysis.education_score,
+                analysis.hire_recommendation) == (50, 60, 55, 'maybe')
+
+
+def test_legacy_analyses_are_backfilled_once(repository):
+    assert repository.backfill_summary_columns() == 1
+    assert repository.backfill_summary_columns() == 0
+
+    assert repository.load_scoring_inputs() == {
+        'ids': [1], 'current': [72], 'technical': [80], 'experience': [65], 'education': [70],
+        'hire_recommendation': ['yes']
+    }
+
+
+def test_list_rows_carry_scores_and_names_but_no_documents(repository):
+    repository.backfill_summary_columns()
+    save_analysis(repository)
+
+    rows = repository.get_recent_analyses(limit=10)
+    assert [row['suitability_score'] for row in rows] == [55, 72]
+    assert rows[1]['technical_score'] == 80
+    assert rows[1]['cv_record'] == {'id': 1, 'contact_name': 'Ada', 'file_upload': {'original_filename': 'ada.pdf'}}
+    assert rows[1]['job_description'] == {'id': 1, 'job_title': 'Engineer', 'company': 'Acme'}
+    assert all('analysis' not in row and 'analysis_data' not in row for row in rows)
+
+    cvs = CVRepository().get_recent_cvs(limit=10)
+    assert [(cv['id'], cv['filename'], cv['file_size'], cv['contact_name']) for cv in cvs] == [(1, 'ada.pdf', 1234, 'Ada')]
+    assert 'parsed_data' not in cvs[0]
@@ -0,0 +1,49 @@
+"""
+Tests for the experience timeline engine
+"""
+
+from datetime import datetime
+
+from app.models.schemas import Experience
+from app.services.timeline import build_timeline, normalize_date, parse_month
+
+TODAY = datetime(2025, 7, 15)
+
+
+def role(start, end, company='Acme'):
+    return Experience(company=company, position='Engineer', start_date=start, end_date=end)
+
+
+def test_parses_common_cv_date_formats():
+    assert parse_month('2021-3') == (2021, 3)
+    assert parse_month('2021-03-14') == (2021, 3)
+    assert parse_month('08/2021') == (2021, 8)
+    assert parse_month('Mar 2025') == (2025, 3)
+    assert parse_month('Sept. 2019') == (2019, 9)
+    assert parse_month('2015') == (2015, 1)
+    assert parse_month('Spring 2020') is None
+    assert normalize_date('June 2024') == '2024-06'
+    assert normalize_date('sometime') == 'sometime'
+
+
+def test_overlapping_roles_are_merged():
+    timeline = build_timeline([
+        role('2018-01', '2021-01'),
+        role('Jan 2020', 'Dec 2020', company='Side gig'),  # fully inside the first role
+        role('06/2020', '2022-01', company='Overlap'),
+    ], today=TODAY)
+
+    assert timeline['total_months'] == 48
+    assert [r['months'] for r in timeline['roles']] == [36, 11, 19]
+
+
+def test_present_and_unparseable_dates():
+    timeline = build_timeline([
+        role('2024-07', 'PRESENT'),
+        role('a while ago', '2019'),
+    ], today=TODAY)
+
+    assert timeline['total_months'] == 12
+    assert timeline['roles'][0]['end_date'] == 'Present'
+    assert timeline['roles'][1]['months'] is None
+    assert timeline['unparsed_roles'] == 1
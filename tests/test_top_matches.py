@@ -0,0 +1,71 @@
+"""
+Tests for the top-K matches of a job
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.models.database import Analysis, CVRecord, FileUpload, JobDescription
+from app.repositories import base_repository
+from app.services.analysis_service import AnalysisService
+
+START = datetime(2025, 5, 1)
+
+# (id, cv, job, score, days after START)
+ANALYSES = [
+    (1, 1, 1, 95, 0),  # CV 1 was re-analysed later with a lower score
+    (2, 1, 1, 60, 5),
+    (3, 2, 1, 88, 1),
+    (4, 3, 1, 88, 2),  # Ties with analysis 3, the higher id comes first
+    (5, 4, 1, 40, 3),
+    (6, 2, 2, 99, 4),  # Another job
+    (7, 4, 1, 75, 3),  # Same date as analysis 5, the higher id is the latest
+]
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    url = f'sqlite:///{tmp_path / "matches.db"}'
+    engine = create_engine(url)
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+    monkeypatch.setattr(base_repository, '_async_engine', create_async_engine(url.replace('sqlite', 'sqlite+aiosqlite', 1)))
+
+    with base_repository.unit_of_work() as db:
+        for cv_id in range(1, 5):
+            db.add(FileUpload(id=cv_id, filename=f'cv{cv_id}.pdf', original_filename=f'cv{cv_id}.pdf'))
+            db.add(CVRecord(id=cv_id, file_upload_id=cv_id, contact_name=f'Candidate {cv_id}', parsed_data={}))
+        for job_id in (1, 2):
+            db.add(JobDescription(id=job_id, job_title=f'Job {job_id}', company='Acme', job_data={}))
+        for id, cv_id, job_id, score, days in ANALYSES:
+            db.add(Analysis(id=id, cv_record_id=cv_id, job_description_id=job_id, suitability_score=score,
+                            analysis_data={}, analysis_date=START + timedelta(days=days)))
+    yield AnalysisService()
+    asyncio.run(base_repository.dispose_engines())
+
+
+def test_top_matches_are_best_score_first(service):
+    matches = service.get_top_matches(1, limit=3)
+
+    assert [match['id'] for match in matches] == [1, 4, 3]
+    assert matches[0]['cv_name'] == 'Candidate 1'
+    assert matches[0]['cv_filename'] == 'cv1.pdf'
+    assert [match['id'] for match in service.get_top_matches(1, limit=10)] == [1, 4, 3, 7, 2, 5]
+    assert service.get_top_matches(3) == []
+
+
+def test_latest_per_cv_keeps_each_cvs_most_recent_analysis(service):
+    matches = service.get_top_matches(1, limit=10, latest_per_cv=True)
+
+    assert [(match['cv_id'], match['id']) for match in matches] == [(3, 4), (2, 3), (4, 7), (1, 2)]
+    assert [match['id'] for match in service.get_top_matches(1, limit=2, latest_per_cv=True)] == [4, 3]
+
+
+def test_async_top_matches_agree(service):
+    for latest_per_cv in (False, True):
+        matches = asyncio.run(service.get_top_matches_async(1, limit=3, latest_per_cv=latest_per_cv))
+        assert matches == service.get_top_matches(1, limit=3, latest_per_cv=latest_per_cv)
@@ -0,0 +1,65 @@
+"""
+Tests for running several repository calls as one unit of work
+"""
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import CVFeatures, CVRecord, FileUpload
+from app.models.schemas import ContactInfo, StructuredCV
+from app.repositories import base_repository
+from app.repositories.base_repository import unit_of_work
+from app.repositories.cv_repository import CVFeaturesRepository, CVRepository, FileUploadRepository
+from app.repositories.search_index import CV_FTS
+from app.services.cv_features import build_cv_features
+
+CV = StructuredCV(contact_info=ContactInfo(name='Ada Lovelace'), skills=['Python'])
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+    return engine
+
+
+def store_cv():
+    upload_id = FileUploadRepository().create_upload_record_and_get_id('cv.pdf', 'cv.pdf', 10, 'cv')
+    cv_id = CVRepository().save_cv_and_get_id(upload_id, CV, CV.dict())
+    CVFeaturesRepository().save_features(cv_id, build_cv_features(CV))
+    return cv_id
+
+
+def row_counts(engine):
+    with engine.connect() as conn:
+        counts = [conn.execute(select(func.count()).select_from(model)).scalar()
+                  for model in (FileUpload, CVRecord, CVFeatures)]
+        return counts + [conn.execute(text(f"SELECT count(*) FROM {CV_FTS}")).scalar()]
+
+
+def test_writes_across_repositories_commit_together(engine):
+    with unit_of_work():
+        store_cv()
+
+    assert row_counts(engine) == [1, 1, 1, 1]
+
+
+def test_failure_rolls_back_every_repository(engine):
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            store_cv()
+            with unit_of_work():  # A nested block joins the outer transaction
+                FileUploadRepository().create_upload_record_and_get_id('other.pdf', 'other.pdf', 10, 'cv')
+            raise RuntimeError('parse failed')
+
+    assert row_counts(engine) == [0, 0, 0, 0]
+
+
+def test_repository_calls_outside_a_unit_of_work_commit_on_their_own(engine):
+    with pytest.raises(RuntimeError):
+        FileUploadRepository().create_upload_record_and_get_id('cv.pdf', 'cv.pdf', 10, 'cv')
+        raise RuntimeError('parse failed')
+
+    assert row_counts(engine) == [1, 0, 0, 0]
@@ -0,0 +1,71 @@
+"""
+Tests for the upload retention sweeper
+"""
+
+from datetime import datetime, timedelta
+import hashlib
+import os
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import FileUpload
+from app.repositories import base_repository
+from app.services.file_handler import FileHandler
+from app.services.upload_sweeper import UploadSweeper
+
+
+def _age(path, days):
+    then = time.time() - days * 86400
+    os.utime(path, (then, then))
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    base_repository.init_db(engine)
+    monkeypatch.setattr(base_repository, '_engine', engine)
+    return FileHandler(str(tmp_path))
+
+
+def _store(handler, content, days_old, upload_days_old=None):
+    sha256 = hashlib.sha256(content).hexdigest()
+    path = handler.store.put(content, sha256)
+    _age(path, days_old)
+    if upload_days_old is not None:
+        with base_repository.unit_of_work() as db:
+            db.add(FileUpload(filename='cv.pdf', original_filename='cv.pdf', content_sha256=sha256,
+                              upload_date=datetime.utcnow() - timedelta(days=upload_days_old)))
+    return path
+
+
+def test_sweep_deletes_orphaned_expired_and_partial_files(handler):
+    kept = _store(handler, b'recent upload', days_old=40, upload_days_old=1)
+    expired = _store(handler, b'old upload', days_old=40, upload_days_old=40)
+    orphaned = _store(handler, b'failed upload', days_old=1)
+    in_flight = _store(handler, b'upload in progress', days_old=0)
+    partial = handler.store.temp_path()
+    partial.write_bytes(b'interrupted')
+    _age(partial, 1)
+    legacy = handler.upload_folder / '20240101_000000_cv.pdf'
+    legacy.write_bytes(b'legacy file without a record')
+    _age(legacy, 1)
+
+    result = UploadSweeper(handler).sweep(retention_days=30, batch_size=2, files_per_second=0)
+
+    assert result['by_reason'] == {'orphaned': 2, 'expired': 1, 'partial': 1}
+    assert result['reclaimed_bytes'] == sum(len(content) for content in (
+        b'old upload', b'failed upload', b'interrupted', b'legacy file without a record'))
+    assert kept.exists() and in_flight.exists()
+    assert not (expired.exists() or orphaned.exists() or partial.exists() or legacy.exists())
+
+
+def test_dry_run_only_reports(handler):
+    orphaned = _store(handler, b'failed upload', days_old=1)
+
+    result = UploadSweeper(handler).sweep(retention_days=0, files_per_second=0, dry_run=True)
+
+    assert result['deleted'] == 1 and result['reclaimed_bytes'] == len(b'failed upload')
+    assert orphaned.exists()
@@ -0,0 +1,100 @@
+"""
+Tests for the single-writer queue and its group commits
+"""
+
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+
+from app.models.database import FileUpload
+from app.repositories import base_repository
+from app.repositories.base_repository import create_writer_engine
+from app.repositories.cv_repository import FileUploadRepository
+from app.repositories.write_queue import WriteQueue
+
+
+@pytest.fixture
+def engines(monkeypatch, tmp_path):
+    url = f'sqlite:///{tmp_path / "writes.db"}'
+    reader = create_engine(url)
+    base_repository.init_db(reader)
+    monkeypatch.setattr(base_repository, '_engine', reader)
+    writer = create_writer_engine(url, connect_args={'check_same_thread': False})
+    yield reader, writer
+    writer.dispose()
+    reader.dispose()
+
+
+def filenames(reader):
+    with reader.connect() as conn:
+        return sorted(conn.execute(select(FileUpload.filename)).scalars())
+
+
+def add_upload(filename):
+    return FileUploadRepository().create_upload_record_and_get_id(filename, filename, 1, 'cv')
+
+
+def run_batch(queue, writes):
+    """Submit writes while the writer is held, so they all land in one batch"""
+    release = threading.Event()
+    first = queue.submit(release.wait)
+    futures = [queue.submit(fn, *args) for fn, *args in writes]
+    release.set()
+    first.exception(timeout=10)
+    for future in futures:
+        future.exception(timeout=10)
+    return futures
+
+
+def test_batch_commits_once_and_isolates_failed_writes(engines):
+    reader, writer = engines
+    queue = WriteQueue(writer, max_delay_ms=200)
+    seen_from_outside = []
+
+    def failing_write():
+        add_upload('b.pdf')
+        # a.pdf was released from its savepoint but the batch has not committed yet
+        seen_from_outside.append(filenames(reader))
+        raise ValueError('bad row')
+
+    futures = run_batch(queue, [(add_upload, 'a.pdf'), (failing_write,), (add_upload, 'c.pdf')])
+    queue.close()
+
+    assert queue.batches == 1
+    assert seen_from_outside == [[]]
+    assert isinstance(futures[1].exception(), ValueError)
+    assert futures[0].result() != futures[2].result()
+    assert filenames(reader) == ['a.pdf', 'c.pdf']
+
+
+def test_failed_commit_leaves_nothing_behind(engines):
+    reader, writer = engines
+    queue = WriteQueue(writer, max_delay_ms=200)
+
+    def fail_commit():
+        connection = base_repository._current_session.get().connection()
+        event.listen(connection, 'commit', lambda conn: 1 / 0, once=True)
+
+    futures = run_batch(queue, [(add_upload, 'a.pdf'), (fail_commit,), (add_upload, 'c.pdf')])
+
+    assert all(isinstance(future.exception(), ZeroDivisionError) for future in futures)
+    assert filenames(reader) == []
+
+    # The writer carries on with a fresh connection
+    assert queue.execute(add_upload, 'd.pdf')
+    queue.close()
+    assert filenames(reader) == ['d.pdf']
+
+
+def test_writer_engine_follows_the_main_engine(engines, monkeypatch):
+    reader, _ = engines
+    monkeypatch.setattr(base_repository, '_writer_engine', None)
+    monkeypatch.setattr(base_repository, '_writer_source', None)
+    writer = base_repository.get_writer_engine()
+    assert writer is not reader and writer.url == reader.url
+    assert base_repository.get_writer_engine() is writer
+
+    memory = create_engine('sqlite://')
+    monkeypatch.setattr(base_repository, '_engine', memory)
+    assert base_repository.get_writer_engine() is memory